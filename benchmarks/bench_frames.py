@@ -0,0 +1,144 @@
+"""
+Пропускная способность кодирования и разбора кадров.
+
+Бинарный транспорт (SocketMixin): pack_packet и unpack_packet из
+pymax/utils.py — msgpack, для сжатых кадров ещё и LZ4. JSON-транспорт
+(WebSocketMixin): dumps/loads каждого доступного кодека из pymax/codec.py.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_frames.py
+    python benchmarks/bench_frames.py --number 20000 --repeat 7
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lz4.block  # noqa: E402
+import msgpack  # noqa: E402
+
+from pymax.codec import STDLIB_CODEC, JsonCodec, default_codec  # noqa: E402
+from pymax.utils import HEADER_SIZE, pack_packet, unpack_packet  # noqa: E402
+
+
+def _message(i: int) -> dict[str, Any]:
+    return {
+        "id": 115_000_000_000_000_000 + i,
+        "time": 1_760_000_000_000 + i,
+        "sender": 1000 + i % 50,
+        "text": f"Сообщение номер {i}: " + "lorem ipsum dolor sit amet " * 3,
+        "type": "USER",
+        "attaches": [],
+        "elements": [{"type": "STRONG", "from": 0, "length": 9}],
+    }
+
+
+def _chat(i: int) -> dict[str, Any]:
+    return {
+        "id": -68_000_000_000_000 - i,
+        "type": "CHAT",
+        "title": f"Чат {i}",
+        "owner": 1000 + i,
+        "participants": {str(1000 + j): 1_760_000_000_000 for j in range(20)},
+        "lastMessage": _message(i),
+        "lastEventTime": 1_760_000_000_000 + i,
+        "newMessages": i % 7,
+        "status": "ACTIVE",
+    }
+
+
+# Типичные кадры: пинг, входящее сообщение и ответ синхронизации
+PAYLOADS: dict[str, dict[str, Any]] = {
+    "ping": {"interactive": True},
+    "message": {"chatId": -68_000_000_000_001, "message": _message(1)},
+    "sync-200": {"chats": [_chat(i) for i in range(200)], "marker": 1_760_000_000_000},
+}
+
+
+def _compressed_packet(opcode: int, payload: dict[str, Any]) -> bytes:
+    """Кадр со сжатым телом, как их присылает сервер (флаг сжатия в старшем байте длины)."""
+    body = lz4.block.compress(msgpack.packb(payload), store_size=False)
+    header = (
+        (11).to_bytes(1, "big")
+        + (1).to_bytes(2, "big")
+        + (1).to_bytes(1, "big")
+        + opcode.to_bytes(2, "big")
+        + ((1 << 24) | len(body)).to_bytes(4, "big")
+    )
+    return header + body
+
+
+def _codecs() -> list[JsonCodec]:
+    codecs = [STDLIB_CODEC]
+    fastest = default_codec()
+    if fastest.name != STDLIB_CODEC.name:
+        codecs.append(fastest)
+    return codecs
+
+
+def _bench(func: Any, number: int, repeat: int) -> float:
+    """Лучшее время одного вызова в секундах."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def _report(name: str, seconds: float, size: int) -> None:
+    # MiB/s считается по несжатому кадру, чтобы строки можно было сравнивать
+    print(
+        f"{name:<34} {seconds * 1e6:>10.2f} us {1 / seconds:>12,.0f} ops/s "
+        f"{size / seconds / 2**20:>9.1f} MiB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="вызовов в замере")
+    parser.add_argument("--repeat", type=int, default=5, help="число замеров")
+    args = parser.parse_args()
+    print(f"Python {sys.version.split()[0]}, number={args.number}, repeat={args.repeat}")
+
+    for label, payload in PAYLOADS.items():
+        frame = {"ver": 11, "cmd": 0, "seq": 1, "opcode": 64, "payload": payload}
+        # Большие кадры гоняем реже, чтобы замер не шёл минутами
+        number = max(args.number // (len(msgpack.packb(payload)) // 4096 + 1), 10)
+        print(f"\n[{label}]")
+
+        packet = pack_packet(11, 0, 1, 64, payload)
+        _report(
+            "binary pack (msgpack)",
+            _bench(lambda: pack_packet(11, 0, 1, 64, payload), number, args.repeat),
+            len(packet),
+        )
+        _report(
+            "binary unpack (msgpack)",
+            _bench(lambda: unpack_packet(packet), number, args.repeat),
+            len(packet),
+        )
+        compressed = _compressed_packet(64, payload)
+        assert unpack_packet(compressed)["payload"] == unpack_packet(packet)["payload"]
+        _report(
+            f"binary unpack (lz4, {len(compressed) - HEADER_SIZE} B)",
+            _bench(lambda: unpack_packet(compressed), number, args.repeat),
+            len(packet),
+        )
+
+        for codec in _codecs():
+            raw = codec.dumps(frame)
+            _report(
+                f"json dumps ({codec.name})",
+                _bench(lambda: codec.dumps(frame), number, args.repeat),
+                len(raw),
+            )
+            _report(
+                f"json loads ({codec.name})",
+                _bench(lambda: codec.loads(raw), number, args.repeat),
+                len(raw),
+            )
+
+
+if __name__ == "__main__":
+    main()
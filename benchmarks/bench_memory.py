@@ -0,0 +1,165 @@
+"""
+Память на объект для типов pymax/types.py: __slots__ против __dict__.
+
+Объекты строятся через from_dict из кадров синхронизации. Для каждого типа
+tracemalloc считает, сколько байт занимает N экземпляров со слотами и N
+экземпляров обычного класса (с __dict__) с теми же атрибутами, как до
+перехода на __slots__. Значения атрибутов общие, поэтому в замер попадает
+только сам объект и его __dict__.
+
+По умолчанию используются сгенерированные кадры. Можно передать записанный
+ответ синхронизации (JSON с payload или сам payload, где есть chats):
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sync sync.json --count 20000
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymax.types import Attach, Chat, Dialog, Element, Message, Names, User  # noqa: E402
+
+
+def _raw_message(i: int) -> dict[str, Any]:
+    return {
+        "id": 115_000_000_000_000_000 + i,
+        "time": 1_760_000_000_000 + i,
+        "sender": 1000 + i % 50,
+        "text": f"Сообщение {i}",
+        "type": "USER",
+        "status": None,
+        "attaches": [{"type": "PHOTO", "photoToken": f"token{i}"}],
+        "elements": [{"type": "STRONG", "from": 0, "length": 9}],
+    }
+
+
+def _raw_chat(i: int) -> dict[str, Any]:
+    return {
+        "id": -68_000_000_000_000 - i,
+        "cid": i,
+        "type": "CHAT",
+        "title": f"Чат {i}",
+        "owner": 1000 + i,
+        "access": "PUBLIC",
+        "participants": {str(1000 + j): 1_760_000_000_000 for j in range(5)},
+        "participantsCount": 5,
+        "lastMessage": _raw_message(i),
+        "joinTime": 1_760_000_000_000,
+        "created": 1_760_000_000_000,
+        "modified": 1_760_000_000_000,
+        "lastEventTime": 1_760_000_000_000 + i,
+        "lastFireDelayedErrorTime": 0,
+        "lastDelayedUpdateTime": 0,
+        "options": {},
+        "status": "ACTIVE",
+    }
+
+
+def _raw_user(i: int) -> dict[str, Any]:
+    return {
+        "id": 1000 + i,
+        "accountStatus": 0,
+        "updateTime": 1_760_000_000_000,
+        "names": [{"name": f"User {i}", "firstName": "User", "lastName": str(i), "type": "ONEME"}],
+        "baseUrl": f"https://i.oneme.ru/i?r={i}",
+    }
+
+
+def _load_sync(path: Path) -> dict[str, Any]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get("payload", data)
+
+
+def _samples(sync: dict[str, Any]) -> dict[str, Any]:
+    """По одному образцу каждого типа из кадра синхронизации."""
+    raw_chats = [c for c in sync.get("chats", []) if c.get("lastMessage")]
+    if not raw_chats:
+        raise SystemExit("sync payload has no chats with lastMessage")
+    raw_chat = raw_chats[0]
+    message = Message.from_dict(raw_chat["lastMessage"])
+    raw_users = sync.get("contacts") or [_raw_user(0)]
+    user = User.from_dict(raw_users[0])
+    samples: dict[str, Any] = {
+        "Chat": Chat.from_dict(raw_chat),
+        "Message": message,
+        "User": user,
+    }
+    try:
+        samples["Dialog"] = Dialog.from_dict(raw_chat)
+    except (KeyError, ValueError):
+        pass
+    if message.elements:
+        samples["Element"] = message.elements[0]
+    if message.attaches:
+        try:
+            samples["Attach"] = Attach.from_dict(message.attaches[0])
+        except (KeyError, ValueError):
+            pass
+    if user.names:
+        samples["Names"] = user.names[0]
+    return samples
+
+
+def _attributes(obj: Any) -> dict[str, Any]:
+    slots = [s for cls in type(obj).__mro__ for s in getattr(cls, "__slots__", ())]
+    return {s: getattr(obj, s) for s in slots if hasattr(obj, s)}
+
+
+def _measure(factory: Any, count: int) -> float:
+    """Байт на объект: прирост памяти, пока живы count объектов."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # Сам список тоже в замере — вычитаем его
+    grown -= sys.getsizeof(objects)
+    return grown / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000, help="объектов каждого типа")
+    parser.add_argument("--sync", type=Path, help="записанный ответ синхронизации (JSON)")
+    args = parser.parse_args()
+
+    sync = _load_sync(args.sync) if args.sync else {
+        "chats": [_raw_chat(i) for i in range(10)],
+        "contacts": [_raw_user(i) for i in range(10)],
+    }
+    print(f"Python {sys.version.split()[0]}, count={args.count}\n")
+    print(f"{'type':<10} {'slots':>8} {'__dict__':>10} {'saved':>8}")
+
+    for name, sample in _samples(sync).items():
+        cls = type(sample)
+        attrs = _attributes(sample)
+        # Тот же класс без __slots__ — как до перехода
+        plain = type(f"{cls.__name__}Dict", (), {})
+
+        def slotted() -> Any:
+            obj = object.__new__(cls)
+            for key, value in attrs.items():
+                setattr(obj, key, value)
+            return obj
+
+        def unslotted() -> Any:
+            obj = plain()
+            for key, value in attrs.items():
+                setattr(obj, key, value)
+            return obj
+
+        with_slots = _measure(slotted, args.count)
+        with_dict = _measure(unslotted, args.count)
+        saved = 1 - with_slots / with_dict
+        print(f"{name:<10} {with_slots:>6.0f} B {with_dict:>8.0f} B {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
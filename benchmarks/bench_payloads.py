@@ -0,0 +1,121 @@
+"""
+CamelModel.encode против Model(...).model_dump(by_alias=True).
+
+Собирает payload'ы горячих путей MessageMixin (отправка с ответом и фото,
+правка, история, реакция) обоими способами, проверяет, что результаты
+совпадают, и печатает время одного вызова и ускорение.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_payloads.py
+    python benchmarks/bench_payloads.py --number 50000 --repeat 7
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymax.payloads import (  # noqa: E402
+    AttachPhotoPayload,
+    EditMessagePayload,
+    FetchHistoryPayload,
+    ReactionData,
+    ReplyLink,
+    SendMessagePayload,
+    SendMessagePayloadMessage,
+    SetReactionPayload,
+)
+
+CHAT_ID = -68_000_000_000_001
+MESSAGE_ID = 115_000_000_000_000_001
+ELEMENTS = [{"type": "STRONG", "from": 0, "length": 6}]
+
+
+def _send_encode() -> dict[str, Any]:
+    return SendMessagePayload.encode(
+        chat_id=CHAT_ID,
+        message=SendMessagePayloadMessage.encode(
+            text="Привет, это сообщение",
+            cid=1_760_000_000_000,
+            elements=ELEMENTS,
+            attaches=[AttachPhotoPayload.encode(photo_token="token")],
+            link=ReplyLink.encode(message_id=str(MESSAGE_ID)),
+        ),
+        notify=True,
+    )
+
+
+def _send_dump() -> dict[str, Any]:
+    return SendMessagePayload(
+        chat_id=CHAT_ID,
+        message=SendMessagePayloadMessage(
+            text="Привет, это сообщение",
+            cid=1_760_000_000_000,
+            elements=ELEMENTS,
+            attaches=[AttachPhotoPayload(photo_token="token").model_dump(by_alias=True)],
+            link=ReplyLink(message_id=str(MESSAGE_ID)),
+        ),
+        notify=True,
+    ).model_dump(by_alias=True)
+
+
+EDIT = {
+    "chat_id": CHAT_ID,
+    "message_id": MESSAGE_ID,
+    "text": "Исправленный текст",
+    "elements": ELEMENTS,
+    "attaches": [],
+}
+HISTORY = {"chat_id": CHAT_ID, "from_time": 1_760_000_000_000, "forward": 0, "backward": 30}
+
+CASES: dict[str, tuple[Callable[[], dict[str, Any]], Callable[[], dict[str, Any]]]] = {
+    "send message": (_send_encode, _send_dump),
+    "edit message": (
+        lambda: EditMessagePayload.encode(**EDIT),
+        lambda: EditMessagePayload(**EDIT).model_dump(by_alias=True),
+    ),
+    "fetch history": (
+        lambda: FetchHistoryPayload.encode(**HISTORY),
+        lambda: FetchHistoryPayload(**HISTORY).model_dump(by_alias=True),
+    ),
+    "set reaction": (
+        lambda: SetReactionPayload.encode(
+            chat_id=CHAT_ID,
+            message_id=str(MESSAGE_ID),
+            reaction=ReactionData.encode(reaction_type="EMOJI", id="👍"),
+        ),
+        lambda: SetReactionPayload(
+            chat_id=CHAT_ID,
+            message_id=str(MESSAGE_ID),
+            reaction=ReactionData(reaction_type="EMOJI", id="👍"),
+        ).model_dump(by_alias=True),
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="вызовов в замере")
+    parser.add_argument("--repeat", type=int, default=5, help="число замеров")
+    args = parser.parse_args()
+    print(f"Python {sys.version.split()[0]}, number={args.number}, repeat={args.repeat}\n")
+    print(f"{'payload':<16} {'encode':>10} {'model_dump':>12} {'speedup':>8}")
+
+    for name, (encode, dump) in CASES.items():
+        # Первый вызов encode компилирует кодировщик — он не входит в замер
+        if encode() != dump():
+            raise SystemExit(f"{name}: encode() differs from model_dump()")
+        fast = min(timeit.repeat(encode, number=args.number, repeat=args.repeat))
+        slow = min(timeit.repeat(dump, number=args.number, repeat=args.repeat))
+        print(
+            f"{name:<16} {fast / args.number * 1e6:>7.2f} us "
+            f"{slow / args.number * 1e6:>9.2f} us {slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
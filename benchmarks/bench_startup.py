@@ -0,0 +1,110 @@
+"""
+Время импорта и инициализации при старте клиента.
+
+Каждый замер идёт в отдельном процессе, чтобы модули не брались из
+sys.modules. Импорт считается по python -X importtime (накопленное время
+модуля), инициализация — по perf_counter вокруг Database() и MaxClient()
+на новом (холодный старт) и уже существующем session.db.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --module pymax.crud --module sqlmodel
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ["pymax.crud", "pymax.types", "pymax"]
+
+# Печатает время в мс; workdir передаётся аргументом
+_INIT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+from pymax.crud import Database
+from pymax import MaxClient
+workdir = sys.argv[1]
+start = time.perf_counter()
+db = Database(workdir)
+db_ms = (time.perf_counter() - start) * 1000
+db.close()
+start = time.perf_counter()
+MaxClient(phone="+79990000000", work_dir=workdir)
+print(db_ms, (time.perf_counter() - start) * 1000)
+"""
+
+
+def _import_ms(module: str) -> float | None:
+    """Накопленное время импорта модуля по -X importtime, мс."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return None
+
+
+def _init_ms(workdir: str) -> tuple[float, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", _INIT_SCRIPT.format(root=str(ROOT)), workdir],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    db_ms, client_ms = result.stdout.split()
+    return float(db_ms), float(client_ms)
+
+
+def _summary(samples: list[float]) -> str:
+    return (
+        f"min {min(samples):>8.1f} ms  median {statistics.median(samples):>8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="процессов на замер")
+    parser.add_argument(
+        "--module",
+        action="append",
+        help="модуль для замера импорта (можно несколько); по умолчанию "
+        + ", ".join(MODULES),
+    )
+    args = parser.parse_args()
+    print(f"Python {sys.version.split()[0]}, runs={args.runs}\n")
+
+    for module in args.module or MODULES:
+        samples = [_import_ms(module) for _ in range(args.runs)]
+        if None in samples:
+            print(f"import {module:<24} not available")
+            continue
+        print(f"import {module:<24} {_summary(samples)}")
+
+    print()
+    cold: list[tuple[float, float]] = []
+    warm: list[tuple[float, float]] = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            cold.append(_init_ms(workdir))
+            warm.append(_init_ms(workdir))
+    for label, samples in (("new session.db", cold), ("existing session.db", warm)):
+        print(f"Database()  {label:<20} {_summary([db for db, _ in samples])}")
+        print(f"MaxClient() {label:<20} {_summary([cl for _, cl in samples])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,8 @@ import time
 
 # --- КОНФИГУРАЦИЯ БОТА ---
 BOT_NAME = "Maxli"
-BOT_VERSION = "0.3.3" # Повышаем версию
-BOT_VERSION_CODE = 34
+BOT_VERSION = "0.3.4" # Повышаем версию
+BOT_VERSION_CODE = 35
 MODULES_DIR = Path("modules")
 LOG_BUFFER = []  # Глобальный буфер логов (последние строки)
  
@@ -54,20 +54,26 @@ async def log_critical_error(e, message, client, chat_id=None):
     
     if chat_id:
         try:
-            all_convs = client.dialogs + client.chats
-            target_chat = next((c for c in all_convs if c.id == chat_id), None)
+            target_chat = client._registry.get(chat_id)
             if target_chat:
                 print("--- JSON ЧАТА/ДИАЛОГА ---")
-                print(json.dumps(target_chat.__dict__, indent=2, default=str))
+                print(json.dumps(_object_fields(target_chat), indent=2, default=str))
         except Exception as debug_e:
             print(f"!!! Ошибка при сборе отладочной информации о чате: {debug_e} !!!")
     else:
         print("--- Не удалось определить chat_id для сбора полной информации о чате. ---")
     print("="*50 + "\n")
     
+def _object_fields(obj):
+    """Поля объекта для отладочного вывода (типы pymax используют __slots__)."""
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    names = [n for cls in type(obj).__mro__ for n in getattr(cls, '__slots__', ())]
+    return {n: getattr(obj, n) for n in names if hasattr(obj, n)}
+
 def log_message_json(message, prefix=""):
-    if hasattr(message, '__dict__'):
-        print(prefix + json.dumps(message.__dict__, indent=2, default=str))
+    if hasattr(message, '__dict__') or hasattr(message, '__slots__'):
+        print(prefix + json.dumps(_object_fields(message), indent=2, default=str))
     else:
         print(prefix + str(message))
 
@@ -79,13 +85,22 @@ class API:
         self.config = config_instance
         self.me = None
         self.last_known_chat_id = None # Память ТОЛЬКО для ответов на "Прр"
-        self.message_to_chat_cache = {} # Кэш для связи message_id -> chat_id
+        # Кэш message_id -> chat_id (ограниченный LRU клиента, наполняется
+        # каждым входящим и отправленным сообщением)
+        self.message_to_chat_cache = client_instance._message_chats
+        self._edit_slots = {} # Отложенные правки: (chat_id, message_id) -> состояние
+        self._last_file_error = None # Ошибка сервера при последней отправке файла
         self.BOT_NAME = BOT_NAME
         self.BOT_VERSION = BOT_VERSION
         self.BOT_VERSION_CODE = BOT_VERSION_CODE
         # Доступ к буферу логов из инстанса
         self.LOG_BUFFER = LOG_BUFFER
 
+    @property
+    def http(self):
+        """Общий пул HTTP-соединений клиента (aiohttp.ClientSession). Не закрывайте его."""
+        return self.client.http
+
     def set_me(self, me_instance):
         self.me = me_instance
     
@@ -98,12 +113,11 @@ class API:
                 self.last_known_chat_id = message.chat_id
                 print(f"✅ Обновлен last_known_chat_id: {self.last_known_chat_id}")
             else:
-                # Fallback: ищем по отправителю
-                for dialog in self.client.dialogs:
-                    if str(message.sender) in dialog.participants:
-                        self.last_known_chat_id = dialog.id
-                        print(f"⚠️ Fallback: обновлен last_known_chat_id: {self.last_known_chat_id}")
-                        return
+                # Fallback: ищем диалог с отправителем
+                dialog = self.client._registry.dialog_with(message.sender)
+                if dialog:
+                    self.last_known_chat_id = dialog.id
+                    print(f"⚠️ Fallback: обновлен last_known_chat_id: {self.last_known_chat_id}")
 
     async def await_chat_id(self, message):
         """
@@ -116,43 +130,21 @@ class API:
             print(f"!!! КРИТИЧЕСКАЯ ОШИБКА: ID сообщения не является числом: {message.id} !!!")
             return None
 
-        # 1. Проверяем кэш
-        if message_id_int in self.message_to_chat_cache:
-            cached_chat_id = self.message_to_chat_cache[message_id_int]
+        # 1. Проверяем кэш (чат сообщения не меняется, повторная проверка не нужна)
+        cached_chat_id = self.client.chat_id_for_message(message_id_int)
+        if cached_chat_id is not None:
             print(f"✅ Найден chat_id в кэше: {cached_chat_id}")
-            
-            # Дополнительная проверка: убеждаемся, что это правильный чат
-            for conv in (self.client.dialogs + self.client.chats):
-                if conv.id == cached_chat_id and conv.last_message and conv.last_message.id == message_id_int:
-                    print(f"✅ Подтверждено: чат {cached_chat_id} содержит сообщение {message_id_int}")
-                    return cached_chat_id
-            
-            print(f"⚠️ Кэш устарел, ищем заново...")
-            # Удаляем устаревшую запись из кэша
-            del self.message_to_chat_cache[message_id_int]
+            return cached_chat_id
 
         # 2. Ищем по ID последнего сообщения (самый точный способ)
         print(f"🔍 Ищем чат по ID последнего сообщения {message_id_int}...")
         print(f"📊 Доступно диалогов: {len(self.client.dialogs)}, чатов: {len(self.client.chats)}")
         
-        # Показываем ID последних сообщений для отладки
-        print(f"🔍 Проверяем диалоги:")
-        for dialog in self.client.dialogs:
-            last_msg_id = dialog.last_message.id if dialog.last_message else "None"
-            print(f"   Диалог {dialog.id}: последнее сообщение {last_msg_id}")
-            if dialog.last_message and dialog.last_message.id == message_id_int:
-                print(f"✅ Найден диалог {dialog.id} по ID последнего сообщения")
-                self.message_to_chat_cache[message_id_int] = dialog.id
-                return dialog.id
-        
-        print(f"🔍 Проверяем чаты:")
-        for chat in self.client.chats:
-            last_msg_id = chat.last_message.id if chat.last_message else "None"
-            print(f"   Чат {chat.id}: последнее сообщение {last_msg_id}")
-            if chat.last_message and chat.last_message.id == message_id_int:
-                print(f"✅ Найден чат {chat.id} по ID последнего сообщения")
-                self.message_to_chat_cache[message_id_int] = chat.id
-                return chat.id
+        conv = self.client._registry.by_last_message(message_id_int)
+        if conv:
+            print(f"✅ Найден чат {conv.id} по ID последнего сообщения")
+            self.message_to_chat_cache[message_id_int] = conv.id
+            return conv.id
         
         # 2.5. Специальная проверка для "Избранного" - если сообщение от нас и chat_id = 0
         if hasattr(self, 'me') and self.me and message.sender == self.me.id and hasattr(message, 'chat_id') and message.chat_id == 0:
@@ -186,9 +178,8 @@ class API:
     def clear_message_cache(self, max_size=1000):
         """Очищает кэш сообщений, если он становится слишком большим."""
         if len(self.message_to_chat_cache) > max_size:
-            # Оставляем только последние 500 записей
-            items = list(self.message_to_chat_cache.items())
-            self.message_to_chat_cache = dict(items[-500:])
+            # Оставляем только последние 500 записей (кэш общий с клиентом — чистим на месте)
+            self.message_to_chat_cache.trim(min(500, max_size))
             print(f"🧹 Очищен кэш сообщений, оставлено {len(self.message_to_chat_cache)} записей")
 
     async def get_chat_id_for_message(self, message):
@@ -202,6 +193,79 @@ class API:
         return await self.await_chat_id(message)
 
     async def edit(self, message, text, markdown=False, attaches=None, **kwargs):
+        """Редактирует сообщение с объединением частых правок.
+        Правки одного сообщения уходят не чаще раза в config['edit_interval'] секунд
+        (0 — без ограничения). Правка, для которой интервал уже прошёл (в том числе первая
+        правка сообщения), отправляется сразу, и вызов возвращает её результат. Более ранняя
+        правка откладывается: вызов сразу возвращает asyncio.Future с результатом итоговой
+        правки, а из нескольких отложенных отправляется только последняя.
+        Перед выходом из процесса вызовите await api.flush_edits().
+        """
+        key = (getattr(message, 'chat_id', None), getattr(message, 'id', None))
+        interval = self.config.get('edit_interval', 1.0)
+        if key[1] is None or not interval:
+            return await self._edit_now(message, text, markdown, attaches, **kwargs)
+
+        now = time.monotonic()
+        slot = self._edit_slots.get(key)
+        if slot is None:
+            # Убираем состояние давно не редактировавшихся сообщений
+            for k in [k for k, v in self._edit_slots.items()
+                      if v['task'].done() and now - v['last_sent'] > interval]:
+                del self._edit_slots[k]
+            slot = self._edit_slots[key] = {'pending': None, 'waiter': None, 'last_sent': 0.0, 'task': None}
+
+        slot['pending'] = (message, text, markdown, attaches, kwargs)
+        if slot['waiter'] is None:
+            waiter = slot['waiter'] = asyncio.get_running_loop().create_future()
+            # Результат отложенной правки могут и не забрать — не шумим в лог
+            waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+        waiter = slot['waiter']
+        idle = slot['task'] is None or slot['task'].done()
+        if idle:
+            slot['task'] = asyncio.create_task(self._flush_edits(slot, interval))
+        if idle and now - slot['last_sent'] >= interval:
+            # Интервал прошёл (или это первая правка) — ждём отправки
+            return await asyncio.shield(waiter)
+        # Правка отложена или вытеснила отложенную: не ждём её отправки
+        return waiter
+
+    async def flush_edits(self):
+        """Дожидается отправки всех отложенных правок (например, перед перезапуском)."""
+        tasks = [slot['task'] for slot in self._edit_slots.values()
+                 if slot['task'] is not None and not slot['task'].done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _flush_edits(self, slot, interval):
+        """Отправляет последнюю отложенную правку сообщения, соблюдая интервал."""
+        while slot['pending'] is not None:
+            delay = slot['last_sent'] + interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if slot['pending'] is None:
+                    break  # Сообщение удалено, пока правка ждала
+            message, text, markdown, attaches, kwargs = slot['pending']
+            waiter, slot['pending'], slot['waiter'] = slot['waiter'], None, None
+            slot['last_sent'] = time.monotonic()
+            try:
+                result = await self._edit_now(message, text, markdown, attaches, **kwargs)
+            except Exception as e:
+                if waiter and not waiter.done(): waiter.set_exception(e)
+            else:
+                if waiter and not waiter.done(): waiter.set_result(result)
+        # Правка отменена (сообщение удалено) — ожидающие получают None
+        if slot['waiter'] is not None and not slot['waiter'].done():
+            slot['waiter'].set_result(None)
+        slot['waiter'] = None
+
+    def _drop_pending_edit(self, message):
+        """Отменяет отложенную правку сообщения (например, перед удалением)."""
+        slot = self._edit_slots.get((getattr(message, 'chat_id', None), getattr(message, 'id', None)))
+        if slot and slot['pending'] is not None:
+            slot['pending'] = None
+
+    async def _edit_now(self, message, text, markdown=False, attaches=None, **kwargs):
         """Безопасно редактирует сообщение.
         Если markdown=True — парсим в clean_text + элементы (UTF-16) и:
           1) пробуем edit_message(..., elements=elements)
@@ -362,18 +426,18 @@ class API:
         # Создаем payload для сообщения с элементами
         if attaches is None:
             attaches = []
-        message_payload = SendMessagePayloadMessage(
+        message_payload = SendMessagePayloadMessage.encode(
             text=text,
             cid=int(time.time() * 1000),
             elements=elements,
             attaches=attaches,
             link=None
         )
-        payload = SendMessagePayload(
+        payload = SendMessagePayload.encode(
             chat_id=chat_id,
             message=message_payload,
             notify=notify
-        ).model_dump(by_alias=True)
+        )
         print(f"🔍 Payload для отправки: {payload}")
         data = await self.client._send_and_wait(
             opcode=Opcode.MSG_SEND,
@@ -390,34 +454,63 @@ class API:
         """Отправляет файл в чат."""
         try:
             from pathlib import Path
-            import aiofiles
-            
+            from pymax.files import File
+
             file_path = Path(file_path)
             if not file_path.exists():
                 raise FileNotFoundError(f"Файл {file_path} не найден")
 
-            async with aiofiles.open(file_path, 'rb') as f:
-                file_content = await f.read()
-            
-            # Получаем URL для загрузки
-            upload_url = await self._get_file_upload_url()
-            if not upload_url:
-                raise Exception("Не удалось получить URL для загрузки файла")
-            
-            print(f"✅ Получен URL для загрузки: {upload_url}")
+            # Файл читается по частям прямо во время загрузки
+            file_content = File(path=str(file_path))
             
-            # Загружаем файл на сервер
-            file_token = await self._upload_file_to_server(upload_url, file_content, file_path.name)
-            if not file_token:
-                raise Exception("Не удалось загрузить файл на сервер")
-            
-            print(f"✅ Файл загружен на сервер, токен: {file_token}")
+            # Тот же файл (по SHA-256 содержимого) повторно не загружаем
+            from pymax.static import Constants
+            cache_key = f"file:sha256:{await file_content.digest()}"
+            cached = self.client._database.get_upload(cache_key, Constants.UPLOAD_CACHE_TTL.value)
+            if cached:
+                file_token = cached[0]
+                print(f"✅ Файл уже загружен, токен из кеша: {file_token}")
+            else:
+                file_token = await self._upload_new_file(file_content, file_path.name, cache_key)
             
-            # Добавляем небольшую задержку для обработки файла сервером
-            print(f"⏳ Ожидаем обработки файла сервером...")
-            import asyncio
-            await asyncio.sleep(2)  # Ждем 2 секунды
+            self._last_file_error = None
+            result = await self._send_file_message(chat_id, text, markdown, file_token, file_path.name, **kwargs)
+            if result is None and cached and self.client._is_attachment_error(self._last_file_error):
+                # Токен из кеша мог истечь на сервере: загружаем файл заново
+                print(f"⚠️ Не удалось отправить файл по токену из кеша, загружаем заново")
+                self.client._database.delete_uploads([cache_key])
+                file_token = await self._upload_new_file(file_content, file_path.name, cache_key)
+                result = await self._send_file_message(chat_id, text, markdown, file_token, file_path.name, **kwargs)
+            return result
             
+        except Exception as e:
+            print(f"❌ Ошибка отправки файла: {e}")
+            import traceback
+            print(f"🔍 DEBUG: Traceback: {traceback.format_exc()}")
+            return None
+    
+    async def _upload_new_file(self, file_content, filename, cache_key):
+        """Загружает файл на сервер, запоминает токен в кеше загрузок и возвращает его."""
+        # Получаем URL для загрузки
+        upload_url = await self._get_file_upload_url()
+        if not upload_url:
+            raise Exception("Не удалось получить URL для загрузки файла")
+        
+        print(f"✅ Получен URL для загрузки: {upload_url}")
+        
+        # Загружаем файл на сервер
+        file_token = await self._upload_file_to_server(upload_url, file_content, filename)
+        if not file_token:
+            raise Exception("Не удалось загрузить файл на сервер")
+        
+        print(f"✅ Файл загружен на сервер, токен: {file_token}")
+        self.client._database.save_upload(cache_key, str(file_token))
+        return file_token
+    
+    async def _send_file_message(self, chat_id, text, markdown, file_token, filename, **kwargs):
+        """Отправляет сообщение с уже загруженным файлом."""
+        try:
+            # Готовность файла ждёт client._send_when_ready при отправке сообщения
             # Если включен markdown, парсим текст
             if markdown:
                 from pymax.markdown_parser import get_markdown_parser
@@ -431,12 +524,12 @@ class API:
                     text=clean_text,
                     elements=elements,
                     file_token=file_token,
-                    filename=file_path.name,
+                    filename=filename,
                     **kwargs
                 )
             else:
                 # Отправляем сообщение с файлом
-                return await self._send_message_with_file(chat_id, text, file_token, file_path.name, **kwargs)
+                return await self._send_message_with_file(chat_id, text, file_token, filename, **kwargs)
             
         except Exception as e:
             print(f"❌ Ошибка отправки файла: {e}")
@@ -447,7 +540,6 @@ class API:
     async def _send_file_with_elements(self, chat_id, text, elements, file_token, filename, **kwargs):
         """Отправляет файл с элементами форматирования."""
         try:
-            from pymax.static import Opcode
             from pymax.payloads import SendMessagePayload, SendMessagePayloadMessage
             import time
             
@@ -480,7 +572,7 @@ class API:
                 print(f"🔍 DEBUG: Используем токен: {file_token}")
             
             # Создаем payload для сообщения с элементами и файлом
-            message_payload = SendMessagePayloadMessage(
+            message_payload = SendMessagePayloadMessage.encode(
                 text=text,
                 cid=int(time.time() * 1000),
                 elements=elements,
@@ -488,23 +580,21 @@ class API:
                 link=None
             )
             
-            payload = SendMessagePayload(
+            payload = SendMessagePayload.encode(
                 chat_id=chat_id,
                 message=message_payload,
                 notify=kwargs.get('notify', True)
-            ).model_dump(by_alias=True)
+            )
             
             print(f"🔍 Payload для отправки файла: {payload}")
             
-            data = await self.client._send_and_wait(
-                opcode=Opcode.MSG_SEND,
-                payload=payload
-            )
+            data = await self.client._send_when_ready(payload)
             
             print(f"🔍 Ответ от сервера: {data}")
             
             if error := data.get("payload", {}).get("error"):
                 print(f"❌ Ошибка отправки файла с форматированием: {error}")
+                self._last_file_error = error
                 return None
                 
             print(f"✅ Файл с форматированием успешно отправлен")
@@ -517,54 +607,34 @@ class API:
             return None
     
     async def send_photo(self, chat_id, file_path, text="", markdown=False, **kwargs):
-        """Отправляет фотографию в чат."""
+        """Отправляет фотографию в чат (путь к файлу или http(s)-ссылка)."""
         try:
-            import aiofiles
-            import aiohttp
-            import tempfile
-            import os
             from pathlib import Path
             from pymax.files import Photo
             from pymax.static import AttachType
 
             is_url = isinstance(file_path, str) and (file_path.startswith('http://') or file_path.startswith('https://'))
-            temp_file = None
             if is_url:
-                # Скачиваем файл во временную папку
-                print(f"🌐 Скачиваем изображение из URL: {file_path}")
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(file_path) as resp:
-                        if resp.status != 200:
-                            raise FileNotFoundError(f"Не удалось скачать файл по URL: {file_path}")
-                        suffix = os.path.splitext(file_path)[-1] or '.jpg'
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                            temp_file = tmp.name
-                            content = await resp.read()
-                            tmp.write(content)
-                file_path = Path(temp_file)
+                # Изображение идёт из ответа по URL прямо в загрузку, без временного файла
+                print(f"🌐 Загружаем изображение из URL: {file_path}")
+                photo = Photo(url=file_path)
             else:
                 file_path = Path(file_path)
-            if not file_path.exists():
-                raise FileNotFoundError(f"Файл {file_path} не найден")
-
-            print(f"🔍 DEBUG: Отправляем фотографию {file_path.name} в чат {chat_id}")
+                if not file_path.exists():
+                    raise FileNotFoundError(f"Файл {file_path} не найден")
+                photo = Photo(path=str(file_path))
 
-            # Создаем объект Photo
-            photo = Photo(path=str(file_path))
+            print(f"🔍 DEBUG: Отправляем фотографию {photo.name} в чат {chat_id}")
 
             # Валидируем фотографию
             photo_data = photo.validate_photo()
             if not photo_data:
-                raise ValueError(f"Файл {file_path.name} не является валидной фотографией")
+                raise ValueError(f"Файл {photo.name} не является валидной фотографией")
 
             print(f"✅ Фотография валидна: {photo_data[0]} ({photo_data[1]})")
 
-            # Загружаем фотографию через PyMax
-            attach = await self.client._upload_photo(photo)
-            if not attach:
-                raise Exception("Не удалось загрузить фотографию на сервер")
-
-            print(f"✅ Фотография загружена на сервер")
+            # Фото загружается на сервер при отправке (send_message), один раз;
+            # повторно отправляемые фото берутся из кеша загрузок клиента
 
             # Если включен markdown, парсим текст
             if markdown:
@@ -573,7 +643,7 @@ class API:
                 print(f"📝 Markdown парсинг для фото: '{text}' -> '{clean_text}' с {len(elements)} элементами")
                 
                 # Отправляем сообщение с фотографией и элементами форматирования
-                result = await self._send_photo_with_elements(
+                result = await self.client.send_message(
                     chat_id=chat_id,
                     text=clean_text,
                     elements=elements,
@@ -588,12 +658,6 @@ class API:
                     photo=photo,
                     notify=kwargs.get('notify', True)
                 )
-            # Удаляем временный файл, если был скачан
-            if temp_file:
-                try:
-                    os.remove(temp_file)
-                except Exception as e:
-                    print(f"⚠️ Не удалось удалить временный файл: {temp_file} — {e}")
             return result
 
         except Exception as e:
@@ -606,7 +670,7 @@ class API:
         """Получает URL для загрузки файла."""
         try:
             from pymax.static import Opcode
-            from pymax.payloads import UploadPhotoPayload
+            from pymax.payloads import UPLOAD_PHOTO_PAYLOAD
             
             print("🔍 DEBUG: Запрашиваем URL для загрузки файла...")
             
@@ -622,7 +686,7 @@ class API:
                 
                 try:
                     # Используем тот же payload, что и для фото
-                    payload = UploadPhotoPayload().model_dump(by_alias=True)
+                    payload = UPLOAD_PHOTO_PAYLOAD
                     data = await self.client._send_and_wait(
                         opcode=opcode,
                         payload=payload,
@@ -694,105 +758,114 @@ class API:
             import aiohttp
             import json
             
+            from contextlib import nullcontext
+            from pymax.files import BaseFile
+
             print(f"🔍 DEBUG: Загружаем файл {filename} на сервер...")
             print(f"   URL: {upload_url}")
-            print(f"   Размер: {len(file_content)} байт")
             
-            form = aiohttp.FormData()
-            form.add_field(
-                name="file",
-                value=file_content,
-                filename=filename,
-                content_type="text/plain"
-            )
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(upload_url, data=form) as response:
-                    print(f"🔍 DEBUG: Ответ сервера: HTTP {response.status}")
+            # file_content — байты или pymax.files.BaseFile (тогда файл идёт потоком)
+            session = self.http
+            if isinstance(file_content, BaseFile):
+                body = file_content.open_payload(session, content_type="text/plain", filename=filename)
+            else:
+                print(f"   Размер: {len(file_content)} байт")
+                body = nullcontext(file_content)
+            async with body as value:
+                form = aiohttp.FormData()
+                form.add_field(
+                    name="file",
+                    value=value,
+                    filename=filename,
+                    content_type="text/plain"
+                )
+                response = await session.post(upload_url, data=form)
+            async with response:
+                print(f"🔍 DEBUG: Ответ сервера: HTTP {response.status}")
                     
-                    if response.status == 200:
-                        # Проверяем Content-Type ответа
-                        content_type = response.headers.get('content-type', '').lower()
-                        print(f"🔍 DEBUG: Content-Type ответа: {content_type}")
+                if response.status == 200:
+                    # Проверяем Content-Type ответа
+                    content_type = response.headers.get('content-type', '').lower()
+                    print(f"🔍 DEBUG: Content-Type ответа: {content_type}")
                         
-                        # Пытаемся получить текст ответа
-                        response_text = await response.text()
-                        print(f"🔍 DEBUG: Текст ответа: {response_text[:200]}...")
+                    # Пытаемся получить текст ответа
+                    response_text = await response.text()
+                    print(f"🔍 DEBUG: Текст ответа: {response_text[:200]}...")
                         
-                        # Пытаемся декодировать как JSON только если это JSON
-                        if 'application/json' in content_type or response_text.strip().startswith('{'):
-                            try:
-                                result = json.loads(response_text)
-                                print(f"🔍 DEBUG: JSON ответ сервера: {result}")
+                    # Пытаемся декодировать как JSON только если это JSON
+                    if 'application/json' in content_type or response_text.strip().startswith('{'):
+                        try:
+                            result = json.loads(response_text)
+                            print(f"🔍 DEBUG: JSON ответ сервера: {result}")
                                 
-                                if "files" in result and result["files"]:
-                                    file_data = next(iter(result["files"].values()))
-                                    token = file_data.get("token")
-                                    if token:
-                                        print(f"✅ Получен токен файла: {token}")
-                                        return token
-                                    else:
-                                        print("❌ Токен файла не найден в ответе")
-                                        return None
+                            if "files" in result and result["files"]:
+                                file_data = next(iter(result["files"].values()))
+                                token = file_data.get("token")
+                                if token:
+                                    print(f"✅ Получен токен файла: {token}")
+                                    return token
                                 else:
-                                    print("❌ Файлы не найдены в ответе сервера")
+                                    print("❌ Токен файла не найден в ответе")
                                     return None
-                            except json.JSONDecodeError as json_err:
-                                print(f"❌ Ошибка декодирования JSON: {json_err}")
-                                print(f"   Ответ сервера: {response_text}")
+                            else:
+                                print("❌ Файлы не найдены в ответе сервера")
                                 return None
-                        else:
-                            # Если это не JSON, возможно это простой текст с токеном
-                            print(f"🔍 DEBUG: Не JSON ответ, пытаемся извлечь токен из текста")
+                        except json.JSONDecodeError as json_err:
+                            print(f"❌ Ошибка декодирования JSON: {json_err}")
+                            print(f"   Ответ сервера: {response_text}")
+                            return None
+                    else:
+                        # Если это не JSON, возможно это простой текст с токеном
+                        print(f"🔍 DEBUG: Не JSON ответ, пытаемся извлечь токен из текста")
                             
-                            # Ищем токен в тексте ответа (различные варианты)
-                            if "token" in response_text.lower():
-                                # Пытаемся найти токен в тексте
-                                import re
-                                token_match = re.search(r'"token":\s*"([^"]+)"', response_text)
-                                if token_match:
-                                    token = token_match.group(1)
-                                    print(f"✅ Найден токен в тексте: {token}")
-                                    return token
+                        # Ищем токен в тексте ответа (различные варианты)
+                        if "token" in response_text.lower():
+                            # Пытаемся найти токен в тексте
+                            import re
+                            token_match = re.search(r'"token":\s*"([^"]+)"', response_text)
+                            if token_match:
+                                token = token_match.group(1)
+                                print(f"✅ Найден токен в тексте: {token}")
+                                return token
                             
-                            # Если токен не найден, используем сохраненный токен или токен из URL загрузки
-                            print(f"⚠️ Не удалось извлечь токен из ответа, используем сохраненный токен")
+                        # Если токен не найден, используем сохраненный токен или токен из URL загрузки
+                        print(f"⚠️ Не удалось извлечь токен из ответа, используем сохраненный токен")
                             
-                            # Сначала пробуем использовать сохраненный токен
-                            if hasattr(self, '_last_upload_token') and self._last_upload_token:
-                                print(f"✅ Используем сохраненный токен: {self._last_upload_token}")
-                                return self._last_upload_token
+                        # Сначала пробуем использовать сохраненный токен
+                        if hasattr(self, '_last_upload_token') and self._last_upload_token:
+                            print(f"✅ Используем сохраненный токен: {self._last_upload_token}")
+                            return self._last_upload_token
                             
-                            # Пытаемся извлечь токен из URL загрузки
-                            import re
-                            token_match = re.search(r'token=([^&]+)', upload_url)
+                        # Пытаемся извлечь токен из URL загрузки
+                        import re
+                        token_match = re.search(r'token=([^&]+)', upload_url)
+                        if token_match:
+                            token = token_match.group(1)
+                            print(f"✅ Используем токен из URL: {token}")
+                            return token
+                            
+                        # Также пробуем извлечь токен из исходного ответа сервера
+                        if 'token' in response_text:
+                            token_match = re.search(r'"token":\s*"([^"]+)"', response_text)
                             if token_match:
                                 token = token_match.group(1)
-                                print(f"✅ Используем токен из URL: {token}")
+                                print(f"✅ Используем токен из исходного ответа: {token}")
                                 return token
                             
-                            # Также пробуем извлечь токен из исходного ответа сервера
-                            if 'token' in response_text:
-                                token_match = re.search(r'"token":\s*"([^"]+)"', response_text)
-                                if token_match:
-                                    token = token_match.group(1)
-                                    print(f"✅ Используем токен из исходного ответа: {token}")
-                                    return token
+                        # Fallback: используем fileId из URL
+                        file_id_match = re.search(r'id=(\d+)', upload_url)
+                        if file_id_match:
+                            file_id = file_id_match.group(1)
+                            print(f"⚠️ Fallback: используем fileId из URL: {file_id}")
+                            return file_id
                             
-                            # Fallback: используем fileId из URL
-                            file_id_match = re.search(r'id=(\d+)', upload_url)
-                            if file_id_match:
-                                file_id = file_id_match.group(1)
-                                print(f"⚠️ Fallback: используем fileId из URL: {file_id}")
-                                return file_id
-                            
-                            print(f"❌ Не удалось получить токен или fileId")
-                            return None
-                    else:
-                        response_text = await response.text()
-                        print(f"❌ Ошибка загрузки файла: HTTP {response.status}")
-                        print(f"   Ответ: {response_text}")
+                        print(f"❌ Не удалось получить токен или fileId")
                         return None
+                else:
+                    response_text = await response.text()
+                    print(f"❌ Ошибка загрузки файла: HTTP {response.status}")
+                    print(f"   Ответ: {response_text}")
+                    return None
                         
         except Exception as e:
             print(f"❌ Ошибка при загрузке файла: {e}")
@@ -803,7 +876,6 @@ class API:
     async def _send_message_with_file(self, chat_id, text, file_token, filename, **kwargs):
         """Отправляет сообщение с файлом."""
         try:
-            from pymax.static import Opcode
             from pymax.payloads import SendMessagePayload, SendMessagePayloadMessage
             import time
             
@@ -832,54 +904,30 @@ class API:
                 }
                 print(f"🔍 DEBUG: Используем токен: {file_token}")
             
-            message_payload = SendMessagePayloadMessage(
+            message_payload = SendMessagePayloadMessage.encode(
                 text=text,
                 cid=int(time.time() * 1000),
                 elements=[],
                 attaches=[attach_data]
             )
             
-            payload = SendMessagePayload(
+            payload = SendMessagePayload.encode(
                 chat_id=chat_id,
                 message=message_payload,
                 notify=kwargs.get('notify', True)
-            ).model_dump(by_alias=True)
+            )
             
             print(f"🔍 DEBUG: Payload для отправки: {payload}")
             
-            data = await self.client._send_and_wait(
-                opcode=Opcode.MSG_SEND,
-                payload=payload
-            )
+            # Пока файл обрабатывается сервером, отправка повторяется
+            data = await self.client._send_when_ready(payload)
             
             print(f"🔍 DEBUG: Ответ от сервера: {data}")
             
             if error := data.get("payload", {}).get("error"):
                 print(f"❌ Ошибка отправки сообщения с файлом: {error}")
-                
-                # Если файл еще не готов, пробуем еще раз через некоторое время
-                if error == "attachment.not.ready":
-                    print(f"⏳ Файл еще не готов, ждем еще 3 секунды...")
-                    import asyncio
-                    await asyncio.sleep(3)
-                    
-                    # Пробуем отправить еще раз
-                    print(f"🔄 Повторная попытка отправки...")
-                    data = await self.client._send_and_wait(
-                        opcode=Opcode.MSG_SEND,
-                        payload=payload
-                    )
-                    
-                    print(f"🔍 DEBUG: Ответ от сервера (повторная попытка): {data}")
-                    
-                    if error := data.get("payload", {}).get("error"):
-                        print(f"❌ Ошибка при повторной попытке: {error}")
-                        return None
-                    else:
-                        print(f"✅ Сообщение с файлом успешно отправлено (повторная попытка)")
-                        return data
-                else:
-                    return None
+                self._last_file_error = error
+                return None
                 
             print(f"✅ Сообщение с файлом успешно отправлено")
             return data
@@ -896,6 +944,8 @@ class API:
             await self.send(self.last_known_chat_id, text, **kwargs)
 
     async def delete(self, message, for_me=False, **kwargs):
+        # Отложенная правка не должна пережить удаление и уйти новым сообщением
+        self._drop_pending_edit(message)
         # Используем chat_id из сообщения, если он есть
         chat_id = getattr(message, 'chat_id', None)
         if not chat_id:
@@ -979,22 +1029,22 @@ class API:
             # Проверим доступность URL
             try:
                 import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    # Используем заголовки как в PyMax
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                        'Accept': '*/*',
-                        'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
-                        'Origin': 'https://web.max.ru',
-                        'Referer': 'https://web.max.ru/',
-                    }
+                session = self.http
+                # Используем заголовки как в PyMax
+                headers = {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                    'Accept': '*/*',
+                    'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+                    'Origin': 'https://web.max.ru',
+                    'Referer': 'https://web.max.ru/',
+                }
                     
-                    async with session.head(direct_url, headers=headers) as response:
-                        if response.status == 200:
-                            print(f"✅ Сгенерированный URL работает!")
-                            return direct_url
-                        else:
-                            print(f"❌ Сгенерированный URL не работает: HTTP {response.status}")
+                async with session.head(direct_url, headers=headers) as response:
+                    if response.status == 200:
+                        print(f"✅ Сгенерированный URL работает!")
+                        return direct_url
+                    else:
+                        print(f"❌ Сгенерированный URL не работает: HTTP {response.status}")
             except Exception as e:
                 print(f"❌ Ошибка при проверке URL: {e}")
             
@@ -1023,7 +1073,7 @@ class API:
             if not file_url: await self.client.edit_message(chat_id=chat_id, message_id=message.id, text="❌ Ошибка: Не удалось получить URL."); return
             if not file_name.endswith(".py"): await self.client.edit_message(chat_id=chat_id, message_id=message.id, text="❌ Ошибка: Файл должен быть .py"); return
             
-            async with aiohttp.ClientSession() as session, session.get(file_url) as resp:
+            async with self.http.get(file_url) as resp:
                 if resp.status == 200:
                     from .loader import load_module
                     module_path = MODULES_DIR / file_name
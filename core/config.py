@@ -7,6 +7,11 @@ def _ensure_defaults(conf: Dict[str, Any]) -> Dict[str, Any]:
     if "phone" not in conf or not conf["phone"]:
         conf["phone"] = input(">>> Введите номер телефона (например, +79123456789): ")
     if "prefix" not in conf: conf["prefix"] = "."
+    if "transport" not in conf: conf["transport"] = "websocket"
+    if "edit_interval" not in conf: conf["edit_interval"] = 1.0
+    # Локальный архив сообщений для .search (выключен по умолчанию, хранится archive_days дней)
+    if "archive" not in conf: conf["archive"] = False
+    if "archive_days" not in conf: conf["archive_days"] = 90
     if "aliases" not in conf: conf["aliases"] = {}
     # Устанавливаем полезные алиасы по умолчанию, но не перезаписываем пользовательские
     default_aliases = {
@@ -65,7 +70,7 @@ def register_module_settings(module_name: str, settings_schema: Dict[str, Any]):
     """
     conf = config
     # Зарезервированные системные имена модулей
-    reserved_names = {"info", "management", "ping", "settings", "modules", "restart"}
+    reserved_names = {"info", "management", "ping", "settings", "modules", "restart", "search"}
     normalized_name = module_name
     if module_name in reserved_names:
         normalized_name = f"{module_name}_maxli"
@@ -83,7 +88,7 @@ def register_module_settings(module_name: str, settings_schema: Dict[str, Any]):
 
 def get_module_setting(module_name: str, key: str, default: Any = None) -> Any:
     # С учётом нормализации имён
-    reserved_names = {"info", "management", "ping", "settings", "modules", "restart"}
+    reserved_names = {"info", "management", "ping", "settings", "modules", "restart", "search"}
     normalized_name = f"{module_name}_maxli" if module_name in reserved_names else module_name
     return config.get("external_modules", {}).get(normalized_name, {}).get("settings", {}).get(key, default)
 
@@ -48,6 +48,10 @@ class ModuleAPIWrapper:
         """Редактирует сообщение."""
         return await self._api.edit(message, text, **kwargs)
     
+    async def flush_edits(self):
+        """Дожидается отправки отложенных правок сообщений."""
+        return await self._api.flush_edits()
+    
     async def delete_message(self, message, **kwargs):
         """Удаляет сообщение."""
         return await self._api.delete(message, **kwargs)
@@ -64,6 +68,25 @@ class ModuleAPIWrapper:
         """Отправляет файл в чат."""
         return await self._api.send_file(chat_id, file_path, text, **kwargs)
     
+    @property
+    def http(self):
+        """Общий пул HTTP-соединений (aiohttp.ClientSession) для запросов модуля. Не закрывайте его."""
+        return self._api.http
+
+    def on(self, opcode, **kwargs):
+        """Декоратор обработчика уведомлений сервера (см. MaxClient.on). Снимается при выгрузке модуля."""
+        client = self._api.client
+        def decorator(function):
+            client.on(opcode, **kwargs)(function)
+            if self._module_name not in LOADED_MODULES: LOADED_MODULES[self._module_name] = {'commands': {}, 'watchers': []}
+            LOADED_MODULES[self._module_name].setdefault('events', []).append((client, opcode, function))
+            return function
+        return decorator
+    
+    def events(self, opcodes=None, **kwargs):
+        """Асинхронный поток сырых событий сервера (см. MaxClient.events)."""
+        return self._api.client.events(opcodes=opcodes, **kwargs)
+    
     def get_chat_id(self, message):
         """Получает chat_id из сообщения."""
         return getattr(message, 'chat_id', None)
@@ -284,6 +307,11 @@ async def rollback_module(module_name, was_loaded, original_commands, original_w
                 if cmd in MODULE_COMMANDS:
                     MODULE_COMMANDS[cmd] = {'function': None, 'description': desc}
         
+        # Снимаем обработчики уведомлений, добавленные при неудачной загрузке
+        if module_name in LOADED_MODULES:
+            for client, opcode, function in LOADED_MODULES[module_name].get('events', []):
+                client.remove_handler(opcode, function)
+        
         # Восстанавливаем вотчеры
         if module_name in LOADED_MODULES:
             current_watchers = LOADED_MODULES[module_name].get('watchers', [])
@@ -324,6 +352,9 @@ async def unload_module(module_name: str, remove_file: bool = True):
     watchers_to_remove = LOADED_MODULES[module_name].get('watchers', [])
     for watcher in watchers_to_remove:
         if watcher in WATCHERS: WATCHERS.remove(watcher)
+    # Снимаем обработчики уведомлений
+    for client, opcode, function in LOADED_MODULES[module_name].get('events', []):
+        client.remove_handler(opcode, function)
     
     # Удаляем ID из словаря
     if module_id in MODULE_IDS:
@@ -351,10 +382,11 @@ async def register_system_module(module):
 
 async def load_all_modules(api):
     print("--- Загрузка системных модулей ---")
-    from core_modules import info, management, ping, settings, modules, restart
+    from core_modules import info, management, ping, settings, modules, restart, search
     await register_system_module(info); await register_system_module(management)
     await register_system_module(ping); await register_system_module(settings)
     await register_system_module(modules); await register_system_module(restart)
+    await register_system_module(search)
     MODULES_DIR.mkdir(exist_ok=True)
     print("--- Автозагрузка пользовательских модулей ---")
     loaded_files = set()  # Отслеживаем загруженные файлы
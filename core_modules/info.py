@@ -2,10 +2,6 @@ import platform
 import psutil
 from core.loader import LOADED_MODULES, COMMANDS
 from core.config import PREFIX, config, get_banner_url, save_config
-import aiohttp
-import tempfile
-import os
-from pymax.files import Photo
 
 class InfoModule:
 
@@ -76,12 +72,6 @@ class InfoModule:
         else:
             await api.edit(message, "❌ Первый аргумент должен быть 1 (глобальный) или 2 (внешний) модуль.", markdown=True, notify=True)
             return
-    # Кеш для баннера info: url -> (путь к файлу, file_id/attach)
-    _banner_cache = {
-        'url': None,
-        'file_path': None,
-        'photo_token': None
-    }
     """Модуль информации о боте и системе (по образцу HerokuInfoMod)"""
     def __init__(self):
         # Конфиг для info-модуля (можно расширять)
@@ -137,40 +127,9 @@ class InfoModule:
                 chat_id = await api.await_chat_id(message)
 
             if chat_id:
-                # Проверяем кеш: если url совпадает и файл существует, используем кеш
-                file_path = self._banner_cache.get('file_path')
-                need_download = (
-                    self._banner_cache.get('url') != banner_url or
-                    not file_path or not os.path.exists(file_path)
-                )
-                if need_download:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(banner_url) as resp:
-                            if resp.status != 200:
-                                # Если скачать не удалось, отправляем просто текст
-                                await api.send(chat_id, info_text, notify=True, markdown=True) 
-                                return
-                            suffix = os.path.splitext(banner_url)[-1] or '.jpg'
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                                file_path = tmp.name
-                                content = await resp.read()
-                                tmp.write(content)
-                    self._banner_cache['url'] = banner_url
-                    self._banner_cache['file_path'] = file_path
-                # Отправляем фото через объект Photo (кешированный файл)
-                photo = Photo(path=file_path)
-                photo_data = photo.validate_photo()
-                if not photo_data:
-                    # Если фото невалидно, отправляем просто текст
-                    await api.send(chat_id, info_text, notify=True, markdown=True)
-                    return
-                await api.send_photo(
-                    chat_id=chat_id,
-                    text=info_text,
-                    photo=photo,
-                    markdown=True,
-                    notify=True
-                )
+                # Повторно баннер не скачивается и не загружается: photo_token
+                # берётся из кеша загрузок клиента (по URL с проверкой ETag)
+                await api.send_photo(chat_id, banner_url, info_text, markdown=True, notify=True)
                 return
         
         # Если баннера нет или не удалось отправить, редактируем текущее сообщение
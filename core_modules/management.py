@@ -4,7 +4,6 @@ from core.loader import load_module, unload_module, LOADED_MODULES
 from core.api import MODULES_DIR
 from core_modules.modules import fuzzy_find_module
 import asyncio
-import aiohttp
 import json
 from pathlib import Path
 import subprocess
@@ -120,12 +119,12 @@ async def register(commands):
         try:
             # 1) Получаем удалённый api.py (raw)
             raw_url = "https://raw.githubusercontent.com/Igroshka/Maxli/refs/heads/main/core/api.py"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(raw_url) as resp:
-                    if resp.status != 200:
-                        await api.edit(message, f"❌ Не удалось получить api.py: HTTP {resp.status}")
-                        return
-                    remote_api = await resp.text()
+            session = api.http
+            async with session.get(raw_url) as resp:
+                if resp.status != 200:
+                    await api.edit(message, f"❌ Не удалось получить api.py: HTTP {resp.status}")
+                    return
+                remote_api = await resp.text()
             
             # 2) Извлекаем BOT_VERSION_CODE из удалённого файла
             import re
@@ -485,13 +484,13 @@ async def register(commands):
             except Exception as e:
                 print(f"⚠️ Ошибка получения URL через API: {e}, используем прямой URL")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        await api.edit(message, f"❌ Не удалось скачать файл: HTTP {resp.status}")
-                        return
-                    data = await resp.read()
-                    tmpf.write_bytes(data)
+            session = api.http
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    await api.edit(message, f"❌ Не удалось скачать файл: HTTP {resp.status}")
+                    return
+                data = await resp.read()
+                tmpf.write_bytes(data)
 
             # Прочитаем meta.json
             try:
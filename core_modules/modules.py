@@ -220,34 +220,34 @@ async def load_from_url(api, message, url):
             filename += '.py'
         
         # Скачиваем файл
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    
-                    # Сохраняем файл
-                    module_path = MODULES_DIR / filename
-                    async with aiofiles.open(module_path, 'wb') as f:
-                        await f.write(content)
+        session = api.http
+        async with session.get(url) as response:
+            if response.status == 200:
+                content = await response.read()
                     
-                    # Загружаем модуль
-                    result = await load_module(module_path, api)
+                # Сохраняем файл
+                module_path = MODULES_DIR / filename
+                async with aiofiles.open(module_path, 'wb') as f:
+                    await f.write(content)
                     
-                    # Красивое сообщение о результате
-                    if "успешно загружен" in result:
-                        response = f"✅ Модуль загружен!\n\n"
-                        response += f"📁 Файл: {filename}\n"
-                        response += f"🔗 Источник: {url}\n"
-                        response += f"📊 Статус: {result}"
-                    else:
-                        response = f"❌ Ошибка загрузки\n\n"
-                        response += f"📁 Файл: {filename}\n"
-                        response += f"🔗 Источник: {url}\n"
-                        response += f"⚠️ Ошибка: {result}"
+                # Загружаем модуль
+                result = await load_module(module_path, api)
                     
-                    await api.edit(message, response)
+                # Красивое сообщение о результате
+                if "успешно загружен" in result:
+                    response = f"✅ Модуль загружен!\n\n"
+                    response += f"📁 Файл: {filename}\n"
+                    response += f"🔗 Источник: {url}\n"
+                    response += f"📊 Статус: {result}"
                 else:
-                    await api.edit(message, f"❌ Ошибка скачивания: HTTP {response.status}")
+                    response = f"❌ Ошибка загрузки\n\n"
+                    response += f"📁 Файл: {filename}\n"
+                    response += f"🔗 Источник: {url}\n"
+                    response += f"⚠️ Ошибка: {result}"
+                    
+                await api.edit(message, response)
+            else:
+                await api.edit(message, f"❌ Ошибка скачивания: HTTP {response.status}")
                     
     except Exception as e:
         await api.edit(message, f"❌ Ошибка загрузки модуля: {str(e)}")
@@ -412,85 +412,85 @@ async def load_from_file(api, message):
         # Добавляем таймаут и обработку ошибок сети
         timeout = aiohttp.ClientTimeout(total=30, connect=10)
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            try:
-                async with session.get(file_url, headers=headers) as response:
-                    print(f"🔍 DEBUG: Ответ сервера: HTTP {response.status}")
+        session = api.http
+        try:
+            async with session.get(file_url, headers=headers, timeout=timeout) as response:
+                print(f"🔍 DEBUG: Ответ сервера: HTTP {response.status}")
                     
-                    if response.status == 200:
-                        content = await response.read()
-                        print(f"✅ Файл скачан, размер: {len(content)} байт")
-                        
-                        # Проверяем, что файл не пустой
-                        if len(content) == 0:
-                            error_text = f"❌ Файл пустой\n\n"
-                            error_text += f"📁 Файл: {file_name}\n"
-                            error_text += f"🌐 URL: {file_url}\n"
-                            await api.edit(message, error_text)
-                            return
+                if response.status == 200:
+                    content = await response.read()
+                    print(f"✅ Файл скачан, размер: {len(content)} байт")
                         
-                        # Сохраняем файл
-                        module_path = MODULES_DIR / file_name
-                        async with aiofiles.open(module_path, 'wb') as f:
-                            await f.write(content)
+                    # Проверяем, что файл не пустой
+                    if len(content) == 0:
+                        error_text = f"❌ Файл пустой\n\n"
+                        error_text += f"📁 Файл: {file_name}\n"
+                        error_text += f"🌐 URL: {file_url}\n"
+                        await api.edit(message, error_text)
+                        return
                         
-                        print(f"✅ Файл сохранен: {module_path}")
+                    # Сохраняем файл
+                    module_path = MODULES_DIR / file_name
+                    async with aiofiles.open(module_path, 'wb') as f:
+                        await f.write(content)
                         
-                        # Загружаем модуль
-                        result = await load_module(module_path, api)
+                    print(f"✅ Файл сохранен: {module_path}")
                         
-                        # Красивое сообщение о результате
-                        if "успешно загружен" in result:
-                            response_text = f"✅ Модуль загружен!\n\n"
-                            response_text += f"📁 Файл: {file_name}\n"
-                            response_text += f"📊 Статус: {result}"
-                        else:
-                            response_text = f"❌ Ошибка загрузки\n\n"
-                            response_text += f"📁 Файл: {file_name}\n"
-                            response_text += f"⚠️ Ошибка: {result}"
+                    # Загружаем модуль
+                    result = await load_module(module_path, api)
                         
-                        await api.edit(message, response_text)
+                    # Красивое сообщение о результате
+                    if "успешно загружен" in result:
+                        response_text = f"✅ Модуль загружен!\n\n"
+                        response_text += f"📁 Файл: {file_name}\n"
+                        response_text += f"📊 Статус: {result}"
                     else:
-                        error_text = f"❌ Ошибка скачивания файла\n\n"
-                        error_text += f"📁 Файл: {file_name}\n"
-                        error_text += f"🌐 URL: {file_url}\n"
-                        error_text += f"📊 HTTP статус: {response.status}\n"
+                        response_text = f"❌ Ошибка загрузки\n\n"
+                        response_text += f"📁 Файл: {file_name}\n"
+                        response_text += f"⚠️ Ошибка: {result}"
+                        
+                    await api.edit(message, response_text)
+                else:
+                    error_text = f"❌ Ошибка скачивания файла\n\n"
+                    error_text += f"📁 Файл: {file_name}\n"
+                    error_text += f"🌐 URL: {file_url}\n"
+                    error_text += f"📊 HTTP статус: {response.status}\n"
                         
-                        try:
-                            response_text = await response.text()
-                            error_text += f"📝 Ответ: {response_text[:200]}..."
-                        except:
-                            error_text += f"📝 Ответ: Не удалось прочитать ответ"
+                    try:
+                        response_text = await response.text()
+                        error_text += f"📝 Ответ: {response_text[:200]}..."
+                    except:
+                        error_text += f"📝 Ответ: Не удалось прочитать ответ"
                         
-                        await api.edit(message, error_text)
+                    await api.edit(message, error_text)
                         
-            except aiohttp.ClientConnectorError as e:
-                error_text = f"❌ Ошибка подключения\n\n"
-                error_text += f"📁 Файл: {file_name}\n"
-                error_text += f"🌐 URL: {file_url}\n"
-                error_text += f"⚠️ Ошибка: {str(e)}\n"
-                error_text += f"💡 Возможно, домен недоступен или требует VPN"
+        except aiohttp.ClientConnectorError as e:
+            error_text = f"❌ Ошибка подключения\n\n"
+            error_text += f"📁 Файл: {file_name}\n"
+            error_text += f"🌐 URL: {file_url}\n"
+            error_text += f"⚠️ Ошибка: {str(e)}\n"
+            error_text += f"💡 Возможно, домен недоступен или требует VPN"
                 
-                await api.edit(message, error_text)
-                print(f"❌ Ошибка подключения: {e}")
+            await api.edit(message, error_text)
+            print(f"❌ Ошибка подключения: {e}")
                 
-            except aiohttp.ClientTimeout as e:
-                error_text = f"❌ Таймаут подключения\n\n"
-                error_text += f"📁 Файл: {file_name}\n"
-                error_text += f"🌐 URL: {file_url}\n"
-                error_text += f"⚠️ Ошибка: {str(e)}"
+        except aiohttp.ClientTimeout as e:
+            error_text = f"❌ Таймаут подключения\n\n"
+            error_text += f"📁 Файл: {file_name}\n"
+            error_text += f"🌐 URL: {file_url}\n"
+            error_text += f"⚠️ Ошибка: {str(e)}"
                 
-                await api.edit(message, error_text)
-                print(f"❌ Таймаут: {e}")
+            await api.edit(message, error_text)
+            print(f"❌ Таймаут: {e}")
                 
-            except Exception as e:
-                error_text = f"❌ Неожиданная ошибка\n\n"
-                error_text += f"📁 Файл: {file_name}\n"
-                error_text += f"🌐 URL: {file_url}\n"
-                error_text += f"⚠️ Ошибка: {str(e)}"
+        except Exception as e:
+            error_text = f"❌ Неожиданная ошибка\n\n"
+            error_text += f"📁 Файл: {file_name}\n"
+            error_text += f"🌐 URL: {file_url}\n"
+            error_text += f"⚠️ Ошибка: {str(e)}"
                 
-                await api.edit(message, error_text)
-                print(f"❌ Неожиданная ошибка: {e}")
+            await api.edit(message, error_text)
+            print(f"❌ Неожиданная ошибка: {e}")
                     
     except Exception as e:
         error_text = f"❌ Ошибка загрузки модуля\n\n"
@@ -9,6 +9,9 @@ async def ping_command(api, message, args):
     end_time = time.time()
     ping_ms = round((end_time - start_time) * 1000, 2)
     text = f"🏓 Понг!\n⏱ Задержка: {ping_ms} мс"
+    rtt = api.client.rtt_stats()
+    if rtt["samples"]:
+        text += f"\n📶 RTT: p50 {rtt['p50'] * 1000:.0f} мс, p90 {rtt['p90'] * 1000:.0f} мс, p99 {rtt['p99'] * 1000:.0f} мс"
     banner = get_banner_url("ping")
     if banner:
         chat_id = getattr(message, 'chat_id', None) or await api.await_chat_id(message)
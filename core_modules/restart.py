@@ -34,6 +34,8 @@ async def restart_command(api, message, args):
     
     # Небольшая задержка для красоты
     await asyncio.sleep(1)
+    # Отложенные правки (edit_interval) должны уйти до замены процесса
+    await api.flush_edits()
     
     # Завершаем процесс
     print("🔄 Перезапуск инициирован пользователем")
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+from core.config import config
+
+SEARCH_LIMIT = 10
+
+
+def _chat_title(api, chat_id):
+    conv = api.client._registry.get(chat_id)
+    if conv is not None and getattr(conv, 'title', None):
+        return conv.title
+    return str(chat_id)
+
+
+def _sender_name(api, sender_id):
+    user = api.client.get_cached_user(sender_id) if sender_id else None
+    if user and user.names:
+        return user.names[0].name
+    return str(sender_id)
+
+
+async def search_command(api, message, args):
+    """Поиск по локальному архиву сообщений: search [-here] [текст]"""
+    snippet = getattr(message, 'text', '')
+    api.LOG_BUFFER.append(f"[search] {snippet[:80]}")
+    prefix = config.get('prefix', '.')
+    if not args:
+        await api.edit(message, f"⚠️ **Использование: {prefix}search [-here] текст**", markdown=True)
+        return
+
+    chat_id = None
+    if args[0] == "-here":
+        chat_id = getattr(message, 'chat_id', None) or await api.await_chat_id(message)
+        args = args[1:]
+    query = ' '.join(args)
+    if not query:
+        await api.edit(message, f"⚠️ **Использование: {prefix}search [-here] текст**", markdown=True)
+        return
+
+    start_time = time.perf_counter()
+    # Берём с запасом: сами команды поиска в выдачу не попадают
+    results = await api.client.search_archive(query, chat_id=chat_id, limit=SEARCH_LIMIT * 2)
+    elapsed_ms = round((time.perf_counter() - start_time) * 1000, 1)
+    if results is None:
+        await api.edit(message, "❌ Архив сообщений выключен. Включите `\"archive\": true` в maxli_config.json и перезапустите бота", markdown=True)
+        return
+
+    results = [r for r in results if r.id != int(message.id) and not r.text.startswith(prefix)][:SEARCH_LIMIT]
+    if not results:
+        await api.edit(message, f"🔍 По запросу «{query}» ничего не найдено ({elapsed_ms} мс)")
+        return
+
+    text = f"🔍 **Найдено: {len(results)}** ({elapsed_ms} мс)\n\n"
+    for r in results:
+        date = datetime.fromtimestamp(r.time / 1000).strftime("%d.%m.%y %H:%M")
+        text += f"▫️ {date} | {_chat_title(api, r.chat_id)} | {_sender_name(api, r.sender)}\n"
+        text += f"   {r.snippet}\n"
+    await api.edit(message, text, markdown=True)
+
+
+async def register(commands):
+    commands["search"] = search_command
@@ -3,7 +3,7 @@
 import asyncio
 import json
 import websockets
-from pymax import MaxClient, Message
+from pymax import MaxClient, Message, SocketMaxClient
 
 from core.config import config, ALIASES, PHONE
 from core.loader import load_all_modules, COMMANDS, MODULE_COMMANDS
@@ -14,7 +14,15 @@ if not PHONE:
     print("!!! Номер телефона не найден в 'maxli_config.json'. Завершение работы.")
     exit()
     
-client = MaxClient(phone=PHONE, work_dir="pymax_session")
+# Транспорт: "websocket" (JSON) или "socket" (бинарный msgpack + LZ4)
+client_cls = SocketMaxClient if config.get("transport") == "socket" else MaxClient
+archive_days = config.get("archive_days")
+client = client_cls(
+    phone=PHONE,
+    work_dir="pymax_session",
+    archive=bool(config.get("archive")),
+    archive_max_age=archive_days * 86400 if archive_days else None,
+)
 api = API(client, config)
 
 # --- СТАНДАРТНЫЙ ОБРАБОТЧИК СООБЩЕНИЙ ---
@@ -117,7 +125,11 @@ if __name__ == "__main__":
     async def run_with_reconnect():
         while True:
             try:
-                await client.start()
+                # Первый вызов выполняет полный start(), последующие лишь
+                # восстанавливают сессию без повторного on_start
+                await client.reconnect()
+                log.warning("[reconnect] Соединение потеряно. Переподключение через 2 секунды...")
+                await asyncio.sleep(2)
             except (asyncio.CancelledError, asyncio.TimeoutError) as e:
                 import logging
                 logging.getLogger("maxli.LOG_BUFFER").warning(f"[reconnect] [asyncio error] {type(e).__name__}: {e}. Повтор через 2 секунды...")
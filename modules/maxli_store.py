@@ -1,11 +1,10 @@
 # name: Maxli Store
-# version: 1.4.1
+# version: 1.4.2
 # developer: Kerdik
 # id: maxli_store
 # dependencies: aiohttp
-# min-maxli: 26
+# min-maxli: 35
 
-import aiohttp
 import re
 import os
 
@@ -60,7 +59,7 @@ async def maxlistore_command(api, message, args):
     
     try:
         current_repo = get_current_repo()
-        all_modules = await get_repo_modules(current_repo["path"])
+        all_modules = await get_repo_modules(current_repo["path"], api.http)
         
         if not all_modules:
             await api.edit(message, f"❌ Не удалось загрузить модули из репозитория\n📂 {current_repo['name']}")
@@ -101,7 +100,7 @@ async def maxlistore_s_command(api, message, args):
     
     try:
         current_repo = get_current_repo()
-        all_modules = await get_repo_modules(current_repo["path"])
+        all_modules = await get_repo_modules(current_repo["path"], api.http)
         
         if not all_modules:
             await api.edit(message, f"❌ Не удалось загрузить модули из репозитория\n📂 {current_repo['name']}")
@@ -141,7 +140,7 @@ async def maxlistore_download_command(api, message, args):
     try:
         # Используем текущий выбранный репозиторий
         current_repo = get_current_repo()
-        all_modules = await get_repo_modules(current_repo["path"])
+        all_modules = await get_repo_modules(current_repo["path"], api.http)
         
         if not all_modules:
             await api.edit(message, f"❌ Не удалось загрузить модули из репозитория: {current_repo['name']}")
@@ -173,7 +172,7 @@ async def maxlistore_list_command(api, message, args):
     
     try:
         current_repo = get_current_repo()
-        all_modules = await get_repo_modules(current_repo["path"])
+        all_modules = await get_repo_modules(current_repo["path"], api.http)
         
         if not all_modules:
             await api.edit(message, f"❌ Не удалось загрузить модули из репозитория: {current_repo['name']}")
@@ -316,7 +315,7 @@ async def download_module(api, message, module, repo):
             return
         
         # Скачиваем файл
-        file_content = await download_file(download_url)
+        file_content = await download_file(download_url, api.http)
         
         if not file_content:
             await api.edit(message, "❌ Не удалось скачать файл модуля")
@@ -348,25 +347,24 @@ async def download_module(api, message, module, repo):
     except Exception as e:
         await api.edit(message, f"❌ Ошибка загрузки модуля: {str(e)}")
 
-async def get_repo_modules(repo_path):
+async def get_repo_modules(repo_path, session):
     """Получает все .py файлы из репозитория."""
     try:
         api_url = f"https://api.github.com/repos/{repo_path}/contents/"
         
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "User-Agent": "Maxli-Bot/1.0",
-                "Accept": "application/vnd.github.v3+json"
-            }
+        headers = {
+            "User-Agent": "Maxli-Bot/1.0",
+            "Accept": "application/vnd.github.v3+json"
+        }
             
-            async with session.get(api_url, headers=headers) as response:
-                if response.status == 200:
-                    contents = await response.json()
-                    # Фильтруем только .py файлы
-                    py_files = [item for item in contents if item['type'] == 'file' and item['name'].endswith('.py')]
-                    return py_files
-                else:
-                    return []
+        async with session.get(api_url, headers=headers) as response:
+            if response.status == 200:
+                contents = await response.json()
+                # Фильтруем только .py файлы
+                py_files = [item for item in contents if item['type'] == 'file' and item['name'].endswith('.py')]
+                return py_files
+            else:
+                return []
                     
     except Exception:
         return []
@@ -376,13 +374,12 @@ async def get_raw_download_url(module, repo_path):
     file_path = module['path']
     return f"https://raw.githubusercontent.com/{repo_path}/main/{file_path}"
 
-async def download_file(url):
+async def download_file(url, session):
     """Скачивает содержимое файла."""
-    async with aiohttp.ClientSession() as session:
-        headers = {"User-Agent": "Maxli-Bot/1.0"}
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                return await response.text()
+    headers = {"User-Agent": "Maxli-Bot/1.0"}
+    async with session.get(url, headers=headers) as response:
+        if response.status == 200:
+            return await response.text()
     return None
 
 async def register(api):
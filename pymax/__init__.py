@@ -2,9 +2,11 @@
 Python wrapper для API мессенджера Max
 """
 
+from .archive import ArchivedMessage
 from .core import (
     InvalidPhoneError,
     MaxClient,
+    SocketMaxClient,
     WebSocketNotConnectedError,
 )
 from .static import (
@@ -17,13 +19,17 @@ from .static import (
     MessageStatus,
     MessageType,
     Opcode,
+    OverflowPolicy,
+    PhotoUploadPolicy,
 )
 from .types import (
     Channel,
     Chat,
     Dialog,
     Element,
+    LazyMessage,
     Message,
+    Notification,
     User,
 )
 
@@ -32,6 +38,7 @@ __author__ = "noxzion"
 __all__ = [
     # Перечисления и константы
     "AccessType",
+    "ArchivedMessage",
     "AuthType",
     # Типы данных
     "Channel",
@@ -44,12 +51,17 @@ __all__ = [
     "ElementType",
     # Исключения
     "InvalidPhoneError",
+    "LazyMessage",
     # Клиент
     "MaxClient",
     "Message",
     "MessageStatus",
     "MessageType",
+    "Notification",
     "Opcode",
+    "OverflowPolicy",
+    "PhotoUploadPolicy",
+    "SocketMaxClient",
     "User",
     "WebSocketNotConnectedError",
 ]
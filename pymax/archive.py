@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .static import Constants
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    chat_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    sender INTEGER,
+    time INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (chat_id, id)
+);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (time);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF text ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO messages (chat_id, id, sender, time, text) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (chat_id, id) DO UPDATE SET text = excluded.text
+WHERE text != excluded.text
+"""
+
+
+class ArchivedMessage:
+    """Сообщение из локального архива (см. MessageArchive.search)."""
+
+    __slots__ = ("chat_id", "id", "sender", "time", "text", "snippet")
+
+    def __init__(
+        self,
+        chat_id: int,
+        id: int,
+        sender: int | None,
+        time: int,
+        text: str,
+        snippet: str,
+    ) -> None:
+        self.chat_id = chat_id
+        self.id = id
+        self.sender = sender
+        self.time = time
+        self.text = text
+        self.snippet = snippet
+
+    def __repr__(self) -> str:
+        return (
+            f"ArchivedMessage(chat_id={self.chat_id!r}, id={self.id!r}, "
+            f"sender={self.sender!r}, snippet={self.snippet!r})"
+        )
+
+
+class MessageArchive:
+    """
+    Локальный архив сообщений в SQLite с полнотекстовым индексом FTS5.
+
+    add() только ставит сообщение в очередь и не блокирует цикл приёма:
+    записи копятся и пишутся одной транзакцией в фоновом потоке, когда
+    набирается batch_size или проходит flush_interval секунд. База открыта
+    в режиме WAL, поэтому поиск не ждёт записи.
+
+    Если SQLite собран без FTS5, поиск работает через LIKE (медленнее).
+
+    Args:
+        path (Path): Файл базы архива.
+        max_messages (int | None): Сколько последних сообщений хранить.
+            None — без ограничения.
+        max_age (float | None): Сколько секунд хранить сообщения.
+            None — без ограничения.
+        batch_size (int): Размер пакета записи.
+        flush_interval (float): Максимальная задержка записи, секунды.
+        queue_limit (int): Максимум сообщений в очереди на запись; при
+            переполнении новые сообщения отбрасываются.
+        logger (logging.Logger | None): Логгер.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_messages: int | None = Constants.ARCHIVE_MAX_MESSAGES.value,
+        max_age: float | None = None,
+        batch_size: int = Constants.ARCHIVE_BATCH_SIZE.value,
+        flush_interval: float = Constants.ARCHIVE_FLUSH_INTERVAL.value,
+        queue_limit: int = Constants.ARCHIVE_QUEUE_LIMIT.value,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.path = path
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_limit = queue_limit
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._writer = self._connect()
+        self._writer.executescript(_SCHEMA)
+        try:
+            self._writer.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.logger.warning("SQLite without FTS5, archive search falls back to LIKE")
+            self.fts = False
+        self._reader = self._connect()
+
+        self._rows: list[tuple[int, int, int | None, int, str]] = []
+        self._deletes: list[tuple[int, int]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._flush_task: asyncio.Task[Any] | None = None
+        self._last_prune: float = 0.0
+        self._written: int = 0
+        self._dropped: int = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add(self, chat_id: int, message: Any) -> None:
+        """Ставит сообщение в очередь на запись (текст без изменений не перезаписывается)."""
+        if not message.text:
+            return
+        if len(self._rows) >= self.queue_limit:
+            self._dropped += 1
+            return
+        self._rows.append(
+            (int(chat_id), int(message.id), message.sender, message.time or 0, message.text)
+        )
+        self._schedule(len(self._rows) >= self.batch_size)
+
+    def add_many(self, chat_id: int, messages: Iterable[Any]) -> None:
+        for message in messages:
+            self.add(chat_id, message)
+
+    def delete(self, chat_id: int, message_ids: Iterable[int | str]) -> None:
+        """Удаляет сообщения из архива (вместе с очередной записью)."""
+        self._deletes.extend((int(chat_id), int(i)) for i in message_ids)
+        self._schedule(False)
+
+    def _schedule(self, urgent: bool) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Без цикла событий (например, при завершении) пишем сразу
+            self._write(*self._take())
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if urgent:
+            self._wakeup.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self._rows or self._deletes:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self._write, *self._take())
+            except Exception:
+                self.logger.exception("Archive write failed")
+
+    def _take(
+        self,
+    ) -> tuple[list[tuple[int, int, int | None, int, str]], list[tuple[int, int]]]:
+        # Очереди забираются в потоке цикла событий, пока add() не может вмешаться
+        rows, self._rows = self._rows, []
+        deletes, self._deletes = self._deletes, []
+        return rows, deletes
+
+    def _write(
+        self,
+        rows: list[tuple[int, int, int | None, int, str]],
+        deletes: list[tuple[int, int]],
+    ) -> None:
+        if not rows and not deletes:
+            return
+        with self._writer:
+            self._writer.executemany(_UPSERT, rows)
+            self._writer.executemany(
+                "DELETE FROM messages WHERE chat_id = ? AND id = ?", deletes
+            )
+            now = time.monotonic()
+            if now - self._last_prune >= Constants.ARCHIVE_PRUNE_INTERVAL.value:
+                self._last_prune = now
+                self._prune()
+        self._written += len(rows)
+        self.logger.debug("Archived %d messages, deleted %d", len(rows), len(deletes))
+
+    def _prune(self) -> None:
+        if self.max_age is not None:
+            cutoff = int((time.time() - self.max_age) * 1000)
+            self._writer.execute("DELETE FROM messages WHERE time < ?", (cutoff,))
+        if self.max_messages is not None:
+            self._writer.execute(
+                "DELETE FROM messages WHERE rowid IN ("
+                "SELECT rowid FROM messages ORDER BY time DESC LIMIT -1 OFFSET ?)",
+                (self.max_messages,),
+            )
+
+    async def search(
+        self, query: str, chat_id: int | None = None, limit: int = 20
+    ) -> list[ArchivedMessage]:
+        """
+        Ищет сообщения по словам запроса (все слова, по префиксу), новые
+        первыми. Сообщения из очереди на запись в поиск ещё не попадают.
+
+        Args:
+            query (str): Поисковый запрос.
+            chat_id (int | None): Искать только в этом чате.
+            limit (int): Максимум результатов.
+        """
+        return await asyncio.to_thread(self._search, query, chat_id, limit)
+
+    def _search(
+        self, query: str, chat_id: int | None, limit: int
+    ) -> list[ArchivedMessage]:
+        words = query.split()
+        if not words:
+            return []
+        params: list[Any]
+        if self.fts:
+            match = " ".join('"%s"*' % w.replace('"', '""') for w in words)
+            sql = (
+                "SELECT m.chat_id, m.id, m.sender, m.time, m.text, "
+                "snippet(messages_fts, 0, '', '', '…', 12) "
+                "FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+                "WHERE messages_fts MATCH ?"
+            )
+            params = [match]
+        else:
+            sql = "SELECT chat_id, id, sender, time, text, text FROM messages m WHERE 1"
+            params = []
+            for w in words:
+                sql += " AND m.text LIKE ? ESCAPE '\\'"
+                escaped = w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params.append(f"%{escaped}%")
+        if chat_id is not None:
+            sql += " AND m.chat_id = ?"
+            params.append(int(chat_id))
+        sql += " ORDER BY m.time DESC LIMIT ?"
+        params.append(limit)
+        return [ArchivedMessage(*row) for row in self._reader.execute(sql, params)]
+
+    def stats(self) -> dict[str, int | bool]:
+        (stored,) = self._reader.execute("SELECT count(*) FROM messages").fetchone()
+        return {
+            "stored": stored,
+            "queued": len(self._rows),
+            "written": self._written,
+            "dropped": self._dropped,
+            "fts": self.fts,
+        }
+
+    async def flush(self) -> None:
+        """Дописывает очередь на запись, не дожидаясь flush_interval."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._wakeup.set()
+            await self._flush_task
+        await asyncio.to_thread(self._write, *self._take())
+
+    async def close(self) -> None:
+        """Дописывает очередь и закрывает базу."""
+        await self.flush()
+        self._reader.close()
+        self._writer.close()
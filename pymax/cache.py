@@ -0,0 +1,165 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Ограниченный LRU-кэш с временем жизни записей.
+
+    Поддерживает ту часть интерфейса dict, которой пользуется клиент:
+    get, in, [], []=, pop, len, clear и итерацию по ключам.
+
+    Args:
+        maxsize (int): Максимальное число записей; при переполнении
+            вытесняется давно не использованная.
+        ttl (float): Время жизни записи в секундах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def _lookup(self, key: K) -> tuple[float, V] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self._lookup(key)
+        return entry[1] if entry is not None else default
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __getitem__(self, key: K) -> V:
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Сохраняет значение; ttl задаёт оставшееся время жизни (по умолчанию self.ttl)."""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def expire(self) -> None:
+        """Удаляет записи с истёкшим временем жизни."""
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._data.items() if expires < now]:
+            del self._data[key]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return self._lookup(key) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        self.expire()
+        return iter(list(self._data))
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Ограниченный LRU-кэш со счётчиками попаданий и промахов.
+    Вставка, чтение и вытеснение — O(1).
+
+    Args:
+        maxsize (int): Максимальное число записей.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def trim(self, size: int) -> int:
+        """Вытесняет самые старые записи, пока их не останется size. Возвращает число удалённых."""
+        removed = 0
+        while len(self._data) > max(size, 0):
+            self._data.popitem(last=False)
+            removed += 1
+        return removed
+
+    def keys(self) -> list[K]:
+        return list(self._data.keys())
+
+    def values(self) -> list[V]:
+        return list(self._data.values())
+
+    def items(self) -> list[tuple[K, V]]:
+        return list(self._data.items())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
@@ -0,0 +1,56 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonCodec:
+    """
+    Кодек JSON-кадров WebSocket.
+
+    Args:
+        name (str): Имя реализации (для логов и статистики).
+        dumps (Callable[[Any], bytes | str]): Сериализация кадра.
+        loads (Callable[[bytes | str], Any]): Разбор кадра.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes | str],
+        loads: Callable[[bytes | str], Any],
+    ) -> None:
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"JsonCodec(name={self.name!r})"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+STDLIB_CODEC = JsonCodec("json", _stdlib_dumps, json.loads)
+
+
+def default_codec() -> JsonCodec:
+    """Самый быстрый доступный кодек: orjson, затем msgspec, затем stdlib json."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        return JsonCodec(
+            "orjson", lambda obj: orjson.dumps(obj, option=option), orjson.loads
+        )
+    if msgspec is not None:
+        return JsonCodec("msgspec", msgspec.json.encode, msgspec.json.decode)
+    return STDLIB_CODEC
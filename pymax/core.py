@@ -7,16 +7,24 @@ from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+import aiohttp
 import websockets
 
+from .archive import MessageArchive
+from .cache import LRUCache, TTLCache
 from .crud import Database
+from .dispatcher import Dispatcher
+from .events import EventQueue
 from .exceptions import InvalidPhoneError, WebSocketNotConnectedError
-from .mixins import ApiMixin, WebSocketMixin
+from .mixins import ApiMixin, SocketMixin, WebSocketMixin
 from .payloads import (
     BaseWebSocketMessage,
     SyncPayload,
 )
-from .static import ChatType, Constants, Opcode
+from .registry import ChatRegistry
+from .rtt import RttEstimator
+from .scheduler import SendScheduler
+from .static import ChatType, Constants, Opcode, OverflowPolicy
 from .types import Channel, Chat, Dialog, Me, Message, User, override
 
 if TYPE_CHECKING:
@@ -36,6 +44,32 @@ class MaxClient(ApiMixin, WebSocketMixin):
         work_dir (str, optional): Рабочая директория для хранения базы данных. По умолчанию ".".
         logger (logging.Logger | None): Пользовательский логгер. Если не передан — используется
             логгер модуля с именем f"{__name__}.MaxClient".
+        event_queue_size (int, optional): Размер очереди каждого подписчика events().
+            По умолчанию Constants.EVENT_QUEUE_SIZE.value.
+        event_overflow (OverflowPolicy, optional): Политика переполнения очередей
+            событий: DROP_OLDEST (по умолчанию) или DROP_NEWEST.
+        handler_workers (int, optional): Сколько обработчиков сообщений может
+            выполняться одновременно. По умолчанию Constants.HANDLER_WORKERS.value.
+        chat_queue_size (int, optional): Максимум необработанных сообщений
+            одного чата. По умолчанию Constants.CHAT_QUEUE_SIZE.value.
+        chat_queue_overflow (OverflowPolicy, optional): Политика переполнения
+            очереди чата: DROP_OLDEST (по умолчанию) или DROP_NEWEST.
+        send_rate (float, optional): Общий лимит изменяющих запросов (отправка,
+            редактирование, удаление, реакции) в секунду. По умолчанию
+            Constants.SEND_RATE.value.
+        send_burst (int, optional): Допустимый всплеск таких запросов.
+            По умолчанию Constants.SEND_BURST.value.
+        chat_send_rate (float, optional): Лимит изменяющих запросов в один чат
+            в секунду. По умолчанию Constants.CHAT_SEND_RATE.value.
+        chat_send_burst (int, optional): Допустимый всплеск в один чат.
+            По умолчанию Constants.CHAT_SEND_BURST.value.
+        archive (bool, optional): Сохранять входящие сообщения и загруженную
+            историю в локальный архив work_dir/archive.db с полнотекстовым
+            поиском (см. search_archive). По умолчанию False.
+        archive_max_messages (int | None, optional): Сколько последних сообщений
+            хранить в архиве. По умолчанию Constants.ARCHIVE_MAX_MESSAGES.value.
+        archive_max_age (float | None, optional): Сколько секунд хранить
+            сообщения в архиве. По умолчанию без ограничения.
     Raises:
         InvalidPhoneError: Если формат номера телефона неверный.
     """
@@ -48,15 +82,40 @@ class MaxClient(ApiMixin, WebSocketMixin):
         token: str | None = None,
         work_dir: str = ".",
         logger: logging.Logger | None = None,
+        event_queue_size: int = Constants.EVENT_QUEUE_SIZE.value,
+        event_overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        handler_workers: int = Constants.HANDLER_WORKERS.value,
+        chat_queue_size: int = Constants.CHAT_QUEUE_SIZE.value,
+        chat_queue_overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        send_rate: float = Constants.SEND_RATE.value,
+        send_burst: int = Constants.SEND_BURST.value,
+        chat_send_rate: float = Constants.CHAT_SEND_RATE.value,
+        chat_send_burst: int = Constants.CHAT_SEND_BURST.value,
+        archive: bool = False,
+        archive_max_messages: int | None = Constants.ARCHIVE_MAX_MESSAGES.value,
+        archive_max_age: float | None = None,
     ) -> None:
         self.uri: str = uri
         self.is_connected: bool = False
+        self.is_started: bool = False
         self.phone: str = phone
         self.chats: list[Chat] = []
         self.dialogs: list[Dialog] = []
         self.channels: list[Channel] = []
+        self._registry: ChatRegistry = ChatRegistry(
+            self.dialogs, self.chats, self.channels
+        )
         self.me: Me | None = None
-        self._users: dict[int, User] = {}
+        self._users: TTLCache[int, User] = TTLCache(
+            maxsize=Constants.USER_CACHE_SIZE.value, ttl=Constants.USER_CACHE_TTL.value
+        )
+        self._users_inflight: dict[int, asyncio.Future[User | None]] = {}
+        self._users_batch: list[int] = []
+        self._users_flush_task: asyncio.Task[Any] | None = None
+        self._message_chats: LRUCache[int, int] = LRUCache(
+            Constants.MESSAGE_CHAT_CACHE_SIZE.value
+        )
+        self._attach_ready: asyncio.Event = asyncio.Event()
         if not self._check_phone():
             raise InvalidPhoneError(self.phone)
         self._work_dir: str = work_dir
@@ -68,16 +127,52 @@ class MaxClient(ApiMixin, WebSocketMixin):
         self._seq: int = 0
         self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
         self._recv_task: asyncio.Task[Any] | None = None
-        self._incoming: asyncio.Queue[dict[str, Any]] | None = None
+        self._event_queue_size: int = event_queue_size
+        if event_overflow is OverflowPolicy.BLOCK:
+            raise ValueError("OverflowPolicy.BLOCK is not supported for event queues")
+        self._event_overflow: OverflowPolicy = event_overflow
+        self._event_queues: set[EventQueue] = set()
+        self._events_retired: dict[str, int] = {"delivered": 0, "dropped": 0}
         self._device_id = self._database.get_device_id()
         self._token = self._database.get_auth_token() or token
         self.user_agent = headers
         self._on_message_handlers: list[
             tuple[Callable[[Message], Any], Filter | None]
         ] = []
+        self._notif_handlers: dict[
+            int, list[tuple[Callable[[Any], Any], Filter | None]]
+        ] = {}
         self._on_start_handler: Callable[[], Any | Awaitable[Any]] | None = None
         self._background_tasks: set[asyncio.Task[Any]] = set()
+        self._ping_task: asyncio.Task[Any] | None = None
+        self._sync_markers: dict[str, int] = {}
+        self._rtt: RttEstimator = RttEstimator()
+        self._ping_wakeup: asyncio.Event = asyncio.Event()
+        self._send_scheduler: SendScheduler = SendScheduler(
+            rate=send_rate,
+            burst=send_burst,
+            chat_rate=chat_send_rate,
+            chat_burst=chat_send_burst,
+        )
         self.logger = logger or logging.getLogger(f"{__name__}.MaxClient")
+        self._dispatcher: Dispatcher = Dispatcher(
+            workers=handler_workers,
+            queue_limit=chat_queue_size,
+            overflow=chat_queue_overflow,
+            logger=self.logger,
+        )
+        self._http: aiohttp.ClientSession | None = None
+        self._archive_options: dict[str, Any] | None = (
+            {
+                "path": Path(work_dir) / "archive.db",
+                "max_messages": archive_max_messages,
+                "max_age": archive_max_age,
+            }
+            if archive
+            else None
+        )
+        self._archive: MessageArchive | None = None
+        self._open_archive()
         self._setup_logger()
 
         self.logger.debug(
@@ -95,6 +190,34 @@ class MaxClient(ApiMixin, WebSocketMixin):
             handler.setFormatter(formatter)
             logger.addHandler(handler)
 
+    @property
+    @override
+    def http(self) -> aiohttp.ClientSession:
+        """
+        Общий пул HTTP-соединений клиента для загрузки и скачивания файлов:
+        keep-alive, кеш DNS, лимит соединений на хост и таймауты по умолчанию.
+        Создаётся при первом обращении, закрывается в close().
+        """
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=Constants.HTTP_POOL_SIZE.value,
+                    limit_per_host=Constants.HTTP_POOL_PER_HOST.value,
+                    ttl_dns_cache=Constants.HTTP_DNS_CACHE_TTL.value,
+                    keepalive_timeout=Constants.HTTP_KEEPALIVE.value,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    connect=Constants.HTTP_CONNECT_TIMEOUT.value,
+                    sock_read=Constants.HTTP_READ_TIMEOUT.value,
+                ),
+            )
+        return self._http
+
+    def _open_archive(self) -> None:
+        if self._archive is None and self._archive_options is not None:
+            self._archive = MessageArchive(**self._archive_options, logger=self.logger)
+
     async def close(self) -> None:
         try:
             self.logger.info("Closing client")
@@ -104,8 +227,16 @@ class MaxClient(ApiMixin, WebSocketMixin):
                     await self._recv_task
                 except asyncio.CancelledError:
                     self.logger.debug("recv_task cancelled")
-            if self._ws:
-                await self._ws.close()
+            await self._close_transport()
+            if self._users_flush_task:
+                self._users_flush_task.cancel()
+            await self._dispatcher.stop()
+            if self._archive:
+                # Архив открывается заново при следующем start()/reconnect()
+                archive, self._archive = self._archive, None
+                await archive.close()
+            if self._http and not self._http.closed:
+                await self._http.close()
             self.is_connected = False
             self.logger.info("Client closed")
         except Exception:
@@ -118,15 +249,20 @@ class MaxClient(ApiMixin, WebSocketMixin):
         """
         try:
             self.logger.info("Запуск клиента")
+            self._open_archive()
+            if self._token is not None:
+                # Состояние прошлого запуска: синхронизация догрузит только изменения
+                self._load_cache()
             await self._connect(self.user_agent)
 
             if self._token and self._database.get_auth_token() is None:
                 self._database.update_auth_token(self._device_id, self._token)
 
             if self._token is None:
+                self._database.clear_cache()
                 await self._login()
             else:
-                await self._sync()
+                await self._sync(incremental=bool(self._sync_markers))
 
             if self._on_start_handler:
                 self.logger.debug("Calling on_start handler")
@@ -134,23 +270,72 @@ class MaxClient(ApiMixin, WebSocketMixin):
                 if asyncio.iscoroutine(result):
                     await result
 
-            if self._ws:
-                ping_task = asyncio.create_task(self._send_interactive_ping())
-                self._background_tasks.add(ping_task)
-                ping_task.add_done_callback(
-                    lambda t: self._background_tasks.discard(t)
-                    or self._log_task_exception(t)
-                )
-
-                try:
-                    await self._ws.wait_closed()
-                except asyncio.CancelledError:
-                    self.logger.debug("wait_closed cancelled")
+            self.is_started = True
+            await self._serve()
         except Exception:
             self.logger.exception("Ошибка запуска клиента")
 
+    async def reconnect(self) -> None:
+        """
+        Восстанавливает сессию после обрыва соединения: повторяет handshake
+        и догружает только изменения с момента прошлой синхронизации.
+        on_start при этом не вызывается. Если клиент ещё ни разу не был
+        запущен, выполняет обычный start().
+        """
+        if not self.is_started:
+            await self.start()
+            return
+
+        try:
+            self.logger.info("Reconnecting")
+            self._open_archive()
+            await self._connect(self.user_agent)
+            await self._sync(incremental=True)
+            await self._serve()
+        except Exception:
+            self.logger.exception("Ошибка переподключения клиента")
+
+    async def _serve(self) -> None:
+        if not self.is_connected:
+            return
+
+        if self._ping_task and not self._ping_task.done():
+            self._ping_task.cancel()
+        self._ping_task = asyncio.create_task(self._send_interactive_ping())
+        self._background_tasks.add(self._ping_task)
+        self._ping_task.add_done_callback(
+            lambda t: self._background_tasks.discard(t) or self._log_task_exception(t)
+        )
+
+        try:
+            await self._wait_closed()
+        except asyncio.CancelledError:
+            self.logger.debug("wait_closed cancelled")
+
+
+class SocketMaxClient(SocketMixin, MaxClient):
+    """
+    Клиент Max, работающий через бинарный протокол (TCP + TLS, msgpack + LZ4)
+    вместо JSON поверх WebSocket. Ответы сервера заметно компактнее,
+    особенно для CHAT_HISTORY и синхронизации.
+
+    Args:
+        phone (str): Номер телефона для авторизации.
+        host (str, optional): Хост API. По умолчанию Constants.HOST.value.
+        port (int, optional): Порт API. По умолчанию Constants.PORT.value.
+        **kwargs: Остальные аргументы MaxClient.
+    """
 
-class SocketMaxClient:
-    pass  # нокс займись
-    # нет не займусь 
-    # хмм шо тут должно быть - Rooni
\ No newline at end of file
+    def __init__(
+        self,
+        phone: str,
+        host: str = Constants.HOST.value,
+        port: int = Constants.PORT.value,
+        **kwargs: Any,
+    ) -> None:
+        self.host: str = host
+        self.port: int = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        kwargs.setdefault("uri", f"tcp://{host}:{port}")
+        super().__init__(phone, **kwargs)
@@ -1,99 +1,233 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy.engine.base import Engine
-from sqlmodel import Session, SQLModel, create_engine, select
-
 from .models import Auth
-from .static import DeviceType
+
+# Схема совпадает с прежней (SQLModel), поэтому существующие session.db
+# открываются без переноса данных; user_version отмечает проверенную схему.
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS auth (
+    token VARCHAR,
+    device_id CHAR(32) NOT NULL,
+    PRIMARY KEY (device_id)
+);
+CREATE TABLE IF NOT EXISTS cachedchat (
+    id INTEGER NOT NULL,
+    data VARCHAR NOT NULL,
+    updated_at FLOAT NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS cacheduser (
+    id INTEGER NOT NULL,
+    data VARCHAR NOT NULL,
+    updated_at FLOAT NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS sessionstate (
+    "key" VARCHAR NOT NULL,
+    value VARCHAR NOT NULL,
+    PRIMARY KEY ("key")
+);
+CREATE TABLE IF NOT EXISTS cachedupload (
+    "key" VARCHAR NOT NULL,
+    token VARCHAR NOT NULL,
+    etag VARCHAR,
+    last_modified VARCHAR,
+    updated_at FLOAT NOT NULL,
+    PRIMARY KEY ("key")
+);
+"""
 
 
 class Database:
-    def __init__(self, workdir: str) -> None:
-        self.workdir = workdir
-        self.engine = self.get_engine(workdir)
-        self.create_all()
-        self._ensure_single_auth()
+    """
+    Хранилище сессии (session.db) на sqlite3: одно соединение на всё время
+    работы клиента, режим WAL.
+
+    Args:
+        workdir (str): Каталог, в котором лежит session.db.
+    """
 
+    def __init__(self, workdir: str) -> None:
         self.workdir = workdir
-        self.engine = self.get_engine(workdir)
-        self.create_all()
+        self.path = Path(workdir) / "session.db"
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
         self._ensure_single_auth()
 
-    def create_all(self) -> None:
-        SQLModel.metadata.create_all(self.engine)
-
-    def get_engine(self, workdir: str) -> Engine:
-        return create_engine(f"sqlite:///{workdir}/session.db")
-
-    def get_session(self) -> Session:
-        return Session(bind=self.engine)
+    def _migrate(self) -> None:
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            # Идентификаторы устройства в старых базах могли быть записаны с дефисами
+            for (device_id,) in self._conn.execute("SELECT device_id FROM auth").fetchall():
+                normalized = UUID(str(device_id)).hex
+                if normalized != device_id:
+                    self._conn.execute(
+                        "UPDATE auth SET device_id = ? WHERE device_id = ?",
+                        (normalized, device_id),
+                    )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self._conn.close()
 
     def get_auth_token(self) -> str | None:
-        with self.get_session() as session:
-            return session.exec(select(Auth.token)).first()
+        row = self._conn.execute("SELECT token FROM auth LIMIT 1").fetchone()
+        return row[0] if row else None
 
     def get_device_id(self) -> UUID:
-        with self.get_session() as session:
-            device_id = session.exec(select(Auth.device_id)).first()
-            if device_id is None:
-                auth = Auth()
-                session.add(auth)
-                session.commit()
-                session.refresh(auth)
-                return auth.device_id
-            return device_id
+        row = self._conn.execute("SELECT device_id FROM auth LIMIT 1").fetchone()
+        if row is None:
+            return self.insert_auth(Auth()).device_id
+        return UUID(row[0])
 
     def insert_auth(self, auth: Auth) -> Auth:
-        with self.get_session() as session:
-            session.add(auth)
-            session.commit()
-            session.refresh(auth)
-            return auth
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO auth (token, device_id) VALUES (?, ?)",
+                (auth.token, auth.device_id.hex),
+            )
+        return auth
 
     def update_auth_token(self, device_id: UUID, token: str) -> None:
-        with self.get_session() as session:
-            auth = session.exec(select(Auth).where(Auth.device_id == device_id)).first()
-            if auth:
-                auth.token = token
-                session.add(auth)
-                session.commit()
-                session.refresh(auth)
+        with self._conn:
+            cur = self._conn.execute(
+                "UPDATE auth SET token = ? WHERE device_id = ?", (token, device_id.hex)
+            )
+            if cur.rowcount:
                 return
-
-            existing = session.exec(select(Auth)).first()
-            if existing:
-                existing.device_id = device_id
-                existing.token = token
-                session.add(existing)
-                session.commit()
-                session.refresh(existing)
+            # Запись одна (см. _ensure_single_auth): переписываем её под новое устройство
+            cur = self._conn.execute(
+                "UPDATE auth SET token = ?, device_id = ?", (token, device_id.hex)
+            )
+            if cur.rowcount:
                 return
-
-            new_auth = Auth(device_id=device_id, token=token)
-            session.add(new_auth)
-            session.commit()
-            session.refresh(new_auth)
+            self._conn.execute(
+                "INSERT INTO auth (token, device_id) VALUES (?, ?)",
+                (token, device_id.hex),
+            )
 
     def update(self, auth: Auth) -> Auth:
-        with self.get_session() as session:
-            session.add(auth)
-            session.commit()
-            session.refresh(auth)
-            return auth
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO auth (token, device_id) VALUES (?, ?) "
+                "ON CONFLICT (device_id) DO UPDATE SET token = excluded.token",
+                (auth.token, auth.device_id.hex),
+            )
+        return auth
+
+    def save_chats(self, raw_chats: list[dict[str, Any]]) -> None:
+        self._save_rows("cachedchat", raw_chats)
+
+    def load_chats(self) -> list[dict[str, Any]]:
+        return [
+            json.loads(data)
+            for (data,) in self._conn.execute("SELECT data FROM cachedchat")
+        ]
+
+    def save_users(self, raw_users: list[dict[str, Any]]) -> None:
+        self._save_rows("cacheduser", raw_users)
+
+    def load_users(self, max_age: float) -> list[tuple[dict[str, Any], float]]:
+        """
+        Возвращает пользователей, сохранённых не раньше max_age секунд назад,
+        вместе со временем сохранения (time.time()).
+        """
+        cutoff = time.time() - max_age
+        with self._conn:
+            self._conn.execute("DELETE FROM cacheduser WHERE updated_at < ?", (cutoff,))
+        return [
+            (json.loads(data), updated_at)
+            for data, updated_at in self._conn.execute(
+                "SELECT data, updated_at FROM cacheduser"
+            )
+        ]
+
+    def _save_rows(self, table: str, raws: list[dict[str, Any]]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} (id, data, updated_at) VALUES (?, ?, ?)",
+                [(raw["id"], json.dumps(raw), now) for raw in raws if "id" in raw],
+            )
+
+    def get_state(self, key: str) -> Any:
+        row = self._conn.execute(
+            'SELECT value FROM sessionstate WHERE "key" = ?', (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_state(self, key: str, value: Any) -> None:
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessionstate ("key", value) VALUES (?, ?)',
+                (key, json.dumps(value)),
+            )
+
+    def get_upload(
+        self, key: str, max_age: float
+    ) -> tuple[str, str | None, str | None] | None:
+        """
+        Возвращает (token, etag, last_modified) загруженного ранее файла,
+        если запись не старше max_age секунд.
+        """
+        row = self._conn.execute(
+            'SELECT token, etag, last_modified, updated_at FROM cachedupload WHERE "key" = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[3] < time.time() - max_age:
+            self.delete_uploads([key])
+            return None
+        return row[0], row[1], row[2]
+
+    def save_upload(
+        self,
+        key: str,
+        token: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cachedupload "
+                '("key", token, etag, last_modified, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (key, token, etag, last_modified, time.time()),
+            )
+
+    def delete_uploads(self, keys: list[str]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                'DELETE FROM cachedupload WHERE "key" = ?', [(key,) for key in keys]
+            )
+
+    def clear_cache(self) -> None:
+        """Удаляет кэш чатов, пользователей и состояние синхронизации."""
+        with self._conn:
+            self._conn.execute("DELETE FROM cachedchat")
+            self._conn.execute("DELETE FROM cacheduser")
+            self._conn.execute("DELETE FROM sessionstate")
 
     def _ensure_single_auth(self) -> None:
-        with self.get_session() as session:
-            rows = session.exec(select(Auth)).all()
-            if not rows:
-                # Create default Auth with device type from enum
-                auth = Auth(device_type=DeviceType.WEB.value)
-                session.add(auth)
-                session.commit()
-                session.refresh(auth)
-                return
-
-            if len(rows) > 1:
-                _ = rows[0]
-                for extra in rows[1:]:
-                    session.delete(extra)
-                session.commit()
+        rows = self._conn.execute("SELECT rowid FROM auth ORDER BY rowid").fetchall()
+        if not rows:
+            self.insert_auth(Auth())
+            return
+
+        if len(rows) > 1:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM auth WHERE rowid = ?", rows[1:]
+                )
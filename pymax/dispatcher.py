@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from .static import OverflowPolicy
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class Dispatcher:
+    """
+    Выполняет обработчики событий пулом воркеров фиксированного размера.
+
+    Задачи одного ключа (обычно chat_id) выполняются строго по очереди,
+    а ключи обслуживаются по кругу, поэтому загруженный чат не может
+    занять все воркеры.
+
+    Args:
+        workers (int): Число одновременно работающих обработчиков.
+        queue_limit (int): Максимальная длина очереди одного ключа.
+        overflow (OverflowPolicy): Что делать при переполнении очереди ключа.
+            BLOCK не поддерживается: submit вызывается из цикла приёма, и
+            ожидание в нём не дало бы обработчикам получить ответы сервера.
+        logger (logging.Logger): Логгер клиента.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_limit: int,
+        overflow: OverflowPolicy,
+        logger: logging.Logger,
+    ) -> None:
+        if overflow is OverflowPolicy.BLOCK:
+            raise ValueError("OverflowPolicy.BLOCK is not supported for handler queues")
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.overflow = overflow
+        self.logger = logger
+        self._queues: dict[Hashable, deque[tuple[float, Job]]] = {}
+        self._scheduled: set[Hashable] = set()
+        self._ready: asyncio.Queue[Hashable] | None = None
+        self._tasks: list[asyncio.Task[Any]] = []
+        self._busy: int = 0
+        self._submitted: int = 0
+        self._processed: int = 0
+        self._dropped: int = 0
+        self._max_depth: int = 0
+        self._wait_total: float = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def submit(self, key: Hashable, job: Job) -> None:
+        self._ensure_started()
+        queue = self._queues.setdefault(key, deque())
+
+        if len(queue) >= self.queue_limit:
+            if self.overflow is OverflowPolicy.DROP_NEWEST:
+                self._dropped += 1
+                self.logger.warning("Handler queue for %s is full, dropping event", key)
+                return
+            queue.popleft()
+            self._dropped += 1
+            self.logger.warning("Handler queue for %s is full, dropping oldest event", key)
+
+        queue.append((time.monotonic(), job))
+        self._submitted += 1
+        self._max_depth = max(self._max_depth, len(queue))
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._ready.put_nowait(key)
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            queue = self._queues[key]
+            enqueued_at, job = queue.popleft()
+            self._wait_total += time.monotonic() - enqueued_at
+            self._busy += 1
+            try:
+                await job()
+            except asyncio.CancelledError:
+                # Останавливаемся, только если отменяют сам воркер, а не
+                # задачу, которую ждал обработчик
+                if asyncio.current_task().cancelling():
+                    raise
+                self.logger.exception("Handler cancelled (key=%s)", key)
+            except Exception:
+                self.logger.exception("Error in dispatched handler (key=%s)", key)
+            finally:
+                self._busy -= 1
+                self._processed += 1
+                if queue:
+                    # Ключ встаёт в конец очереди: остальные чаты не ждут
+                    self._ready.put_nowait(key)
+                else:
+                    del self._queues[key]
+                    self._scheduled.discard(key)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues.clear()
+        self._scheduled.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        depths = [len(q) for q in self._queues.values()]
+        return {
+            "workers": self.workers,
+            "busy": self._busy,
+            "chats": len(depths),
+            "queued": sum(depths),
+            "deepest": max(depths, default=0),
+            "max_depth": self._max_depth,
+            "submitted": self._submitted,
+            "processed": self._processed,
+            "dropped": self._dropped,
+            "avg_wait": self._wait_total / self._processed if self._processed else 0.0,
+        }
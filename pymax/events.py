@@ -0,0 +1,57 @@
+import asyncio
+from collections.abc import Iterable
+from typing import Any
+
+from .static import OverflowPolicy
+
+
+class EventQueue:
+    """
+    Ограниченная очередь событий одного подписчика.
+
+    Args:
+        maxsize (int): Максимальное число событий в очереди.
+        policy (OverflowPolicy): Что делать при переполнении: выбросить самое
+            старое событие или отбросить новое. BLOCK не поддерживается: события
+            кладутся из цикла приёма, и ожидание в нём остановило бы приём
+            ответов сервера, в том числе тех, которых ждёт сам подписчик.
+        opcodes (Iterable[int] | None): Какие опкоды принимать. None — все.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: OverflowPolicy,
+        opcodes: Iterable[int] | None = None,
+    ) -> None:
+        if policy is OverflowPolicy.BLOCK:
+            raise ValueError("OverflowPolicy.BLOCK is not supported for event queues")
+        self.policy = policy
+        self.opcodes: frozenset[int] | None = (
+            frozenset(int(op) for op in opcodes) if opcodes is not None else None
+        )
+        self.delivered: int = 0
+        self.dropped: int = 0
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+
+    def accepts(self, opcode: int | None) -> bool:
+        return self.opcodes is None or opcode in self.opcodes
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def put_nowait(self, event: dict[str, Any]) -> None:
+        """Кладёт событие без ожидания, при переполнении применяя политику."""
+        if not self._queue.full():
+            self._queue.put_nowait(event)
+            self.delivered += 1
+            return
+
+        if self.policy is OverflowPolicy.DROP_OLDEST:
+            self._queue.get_nowait()
+            self._queue.put_nowait(event)
+            self.delivered += 1
+        self.dropped += 1
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
@@ -1,10 +1,26 @@
+import asyncio
+import hashlib
 import mimetypes
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import ClassVar, override
+from typing import Any, ClassVar, override
+from urllib.parse import urlparse
 
 from aiofiles import open as aio_open
 from aiohttp import ClientSession
+from aiohttp.payload import AsyncIterablePayload, BufferedReaderPayload, Payload
+
+from .static import Constants
+
+
+class _SizedStreamPayload(AsyncIterablePayload):
+    """Поток чанков с известной длиной: запрос уходит с Content-Length."""
+
+    def __init__(self, value: Any, size: int | None, **kwargs: Any) -> None:
+        super().__init__(value, **kwargs)
+        self._size = size
 
 
 class BaseFile(ABC):
@@ -18,10 +34,86 @@ class BaseFile(ABC):
         if self.url and self.path:
             raise ValueError("Only one of url or path must be provided.")
 
+        # Валидаторы ответа по url (заполняет open_payload) для кеша загрузок
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+
+    @property
+    def name(self) -> str:
+        """Имя файла (последний сегмент пути или URL)."""
+        if self.path:
+            return Path(self.path).name
+        return Path(urlparse(self.url or "").path).name or "file"
+
+    @asynccontextmanager
+    async def open_payload(
+        self,
+        session: ClientSession,
+        content_type: str | None = None,
+        filename: str | None = None,
+    ) -> AsyncIterator[Payload]:
+        """
+        Тело для multipart-загрузки, которое читается по частям: файл с
+        диска — чанками в пуле потоков, файл по URL — прямо из ответа
+        сервера, без временного файла и без чтения целиком в память.
+
+        Args:
+            session (ClientSession): Сессия для скачивания файла по URL.
+            content_type (str | None): Content-Type части.
+            filename (str | None): Имя файла в форме. По умолчанию self.name.
+        """
+        filename = filename or self.name
+        if self.path:
+            with open(self.path, "rb") as f:
+                yield BufferedReaderPayload(
+                    f, content_type=content_type, filename=filename
+                )
+        elif self.url:
+            async with session.get(self.url) as response:
+                response.raise_for_status()
+                self.etag = response.headers.get("ETag")
+                self.last_modified = response.headers.get("Last-Modified")
+                # aiohttp распаковывает сжатый ответ: Content-Length тогда
+                # меньше отдаваемых байт, и тело уходит chunked
+                encoding = response.headers.get("Content-Encoding", "identity")
+                identity = encoding.strip().lower() in ("", "identity")
+                yield _SizedStreamPayload(
+                    response.content.iter_chunked(Constants.UPLOAD_CHUNK_SIZE.value),
+                    size=response.content_length if identity else None,
+                    content_type=content_type,
+                    filename=filename,
+                )
+        else:
+            raise ValueError("Either url or path must be provided.")
+
+    async def digest(self) -> str:
+        """SHA-256 содержимого локального файла (считается в пуле потоков)."""
+        if not self.path:
+            raise ValueError("Digest is only available for local files.")
+        return await asyncio.to_thread(self._digest_path, self.path)
+
+    @staticmethod
+    def _digest_path(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(Constants.UPLOAD_CHUNK_SIZE.value):
+                sha.update(chunk)
+        return sha.hexdigest()
+
     @abstractmethod
-    async def read(self) -> bytes:
+    async def read(self, session: ClientSession | None = None) -> bytes:
+        """
+        Читает файл целиком. Для загрузки на сервер используйте open_payload.
+
+        Args:
+            session (ClientSession | None): Сессия для файла по URL (например,
+                client.http). Без неё создаётся временная.
+        """
         if self.url:
-            async with ClientSession() as session, session.get(self.url) as response:
+            if session is None:
+                async with ClientSession() as own_session:
+                    return await self.read(own_session)
+            async with session.get(self.url) as response:
                 response.raise_for_status()
                 return await response.read()
         elif self.path:
@@ -54,13 +146,14 @@ class Photo(BaseFile):
 
             return (extension[1:], ("image/" + extension[1:]).lower())
         elif self.url:
-            extension = Path(self.url).suffix.lower()
-            if extension in self.ALLOWED_EXTENSIONS:
+            # У ссылок без расширения (…/image?id=1) считаем фото JPEG
+            extension = Path(urlparse(self.url).path).suffix.lower() or ".jpg"
+            if extension not in self.ALLOWED_EXTENSIONS:
                 raise ValueError(
                     f"Invalid photo extension in URL: {extension}. Allowed: {self.ALLOWED_EXTENSIONS}"
                 )
 
-            mime_type = mimetypes.guess_type(self.url)[0]
+            mime_type = mimetypes.guess_type(f"image{extension}")[0]
 
             if not mime_type or not mime_type.startswith("image/"):
                 raise ValueError(f"URL does not appear to be an image: {self.url}")
@@ -69,17 +162,17 @@ class Photo(BaseFile):
         return None
 
     @override
-    async def read(self) -> bytes:
-        return await super().read()
+    async def read(self, session: ClientSession | None = None) -> bytes:
+        return await super().read(session)
 
 
 class Video(BaseFile):
     @override
-    async def read(self) -> bytes:
-        return await super().read()
+    async def read(self, session: ClientSession | None = None) -> bytes:
+        return await super().read(session)
 
 
 class File(BaseFile):
     @override
-    async def read(self) -> bytes:
-        return await super().read()
+    async def read(self, session: ClientSession | None = None) -> bytes:
+        return await super().read(session)
@@ -8,21 +8,29 @@ from typing import TYPE_CHECKING, Any
 
 import websockets
 
+from .cache import LRUCache, TTLCache
 from .filters import Filter
-from .static import Constants
+from .rtt import RttEstimator
+from .static import Constants, OverflowPolicy
 from .types import Channel, Chat, Dialog, Me, Message, User
 
 if TYPE_CHECKING:
     from uuid import UUID
 
+    from aiohttp import ClientSession
+
+    from .archive import MessageArchive
     from .crud import Database
+    from .dispatcher import Dispatcher
+    from .events import EventQueue
+    from .registry import ChatRegistry
+    from .scheduler import SendScheduler
 
 
 class ClientProtocol(ABC):
     def __init__(self, logger: Logger) -> None:
         super().__init__()
         self.logger = logger
-        self._users: dict[int, User] = {}
         self.chats: list[Chat] = []
         self.phone: str = ""
         self._database: Database
@@ -37,20 +45,43 @@ class ClientProtocol(ABC):
         self.dialogs: list[Dialog] = []
         self.channels: list[Channel] = []
         self.me: Me | None = None
-        self._users: dict[int, User] = {}
+        self._users: TTLCache[int, User] = TTLCache(
+            maxsize=Constants.USER_CACHE_SIZE.value, ttl=Constants.USER_CACHE_TTL.value
+        )
+        self._users_inflight: dict[int, asyncio.Future[User | None]] = {}
+        self._users_batch: list[int] = []
+        self._users_flush_task: asyncio.Task[Any] | None = None
+        self._message_chats: LRUCache[int, int] = LRUCache(
+            Constants.MESSAGE_CHAT_CACHE_SIZE.value
+        )
+        self._attach_ready: asyncio.Event = asyncio.Event()
         self._work_dir: str
         self._database_path: Path
         self._ws: websockets.ClientConnection | None = None
         self._seq: int = 0
         self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
         self._recv_task: asyncio.Task[Any] | None = None
-        self._incoming: asyncio.Queue[dict[str, Any]] | None = None
+        self._event_queue_size: int = Constants.EVENT_QUEUE_SIZE.value
+        self._event_overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+        self._event_queues: set[EventQueue] = set()
+        self._events_retired: dict[str, int] = {"delivered": 0, "dropped": 0}
         self.user_agent = Constants.DEFAULT_USER_AGENT.value
         self._on_message_handlers: list[
             tuple[Callable[[Message], Any], Filter | None]
         ] = []
+        self._notif_handlers: dict[
+            int, list[tuple[Callable[[Any], Any], Filter | None]]
+        ] = {}
         self._on_start_handler: Callable[[], Any | Awaitable[Any]] | None = None
         self._background_tasks: set[asyncio.Task[Any]] = set()
+        self._sync_markers: dict[str, int] = {}
+        self._rtt: RttEstimator = RttEstimator()
+        self._ping_wakeup: asyncio.Event = asyncio.Event()
+        self._dispatcher: Dispatcher
+        self._send_scheduler: SendScheduler
+        self._registry: ChatRegistry
+        self._archive: MessageArchive | None = None
+        self._http: ClientSession | None = None
 
     @abstractmethod
     async def _send_and_wait(
@@ -58,10 +89,19 @@ class ClientProtocol(ABC):
         opcode: int,
         payload: dict[str, Any],
         cmd: int = 0,
-        timeout: float = Constants.DEFAULT_TIMEOUT.value,
+        timeout: float | None = None,
     ) -> dict[str, Any]:
         pass
 
+    @property
+    @abstractmethod
+    def http(self) -> "ClientSession":
+        pass
+
     @abstractmethod
     async def _get_chat(self, chat_id: int) -> Chat | None:
         pass
+
+    @abstractmethod
+    def _merge_chats(self, raw_chats: list[dict[str, Any]]) -> None:
+        pass
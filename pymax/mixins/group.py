@@ -54,12 +54,7 @@ class GroupMixin(ClientProtocol):
             message = Message.from_dict(data["payload"]["message"])
 
             if chat:
-                cached_chat = await self._get_chat(chat.id)
-                if cached_chat is None:
-                    self.chats.append(chat)
-                else:
-                    idx = self.chats.index(cached_chat)
-                    self.chats[idx] = chat
+                self._registry.upsert(chat)
 
             return chat, message
 
@@ -101,12 +96,7 @@ class GroupMixin(ClientProtocol):
 
             chat = Chat.from_dict(data["payload"]["chat"])
             if chat:
-                cached_chat = await self._get_chat(chat.id)
-                if cached_chat is None:
-                    self.chats.append(chat)
-                else:
-                    idx = self.chats.index(cached_chat)
-                    self.chats[idx] = chat
+                self._registry.upsert(chat)
 
             return True
 
@@ -137,12 +127,7 @@ class GroupMixin(ClientProtocol):
 
             chat = Chat.from_dict(data["payload"]["chat"])
             if chat:
-                cached_chat = await self._get_chat(chat.id)
-                if cached_chat is None:
-                    self.chats.append(chat)
-                else:
-                    idx = self.chats.index(cached_chat)
-                    self.chats[idx] = chat
+                self._registry.upsert(chat)
 
             return True
         except Exception:
@@ -178,12 +163,7 @@ class GroupMixin(ClientProtocol):
 
             chat = Chat.from_dict(data["payload"]["chat"])
             if chat:
-                cached_chat = await self._get_chat(chat.id)
-                if cached_chat is None:
-                    self.chats.append(chat)
-                else:
-                    idx = self.chats.index(cached_chat)
-                    self.chats[idx] = chat
+                self._registry.upsert(chat)
 
         except Exception:
             self.logger.exception("Change group settings failed")
@@ -209,12 +189,7 @@ class GroupMixin(ClientProtocol):
 
             chat = Chat.from_dict(data["payload"]["chat"])
             if chat:
-                cached_chat = await self._get_chat(chat.id)
-                if cached_chat is None:
-                    self.chats.append(chat)
-                else:
-                    idx = self.chats.index(cached_chat)
-                    self.chats[idx] = chat
+                self._registry.upsert(chat)
 
         except Exception:
             self.logger.exception("Change group profile failed")
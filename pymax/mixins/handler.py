@@ -1,7 +1,11 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable
 from typing import Any, Awaitable, Callable
 
+from pymax.events import EventQueue
 from pymax.interfaces import ClientProtocol, Filter
-from pymax.types import Message
+from pymax.static import Opcode, OverflowPolicy
+from pymax.types import Chat, Dialog, LazyMessage, Me, Message, Notification, User
 
 
 class HandlerMixin(ClientProtocol):
@@ -13,6 +17,9 @@ class HandlerMixin(ClientProtocol):
         """
         Декоратор для установки обработчика входящих сообщений.
 
+        Изменения и удаления сообщений (Message.status) сюда не приходят:
+        для них есть on(Opcode.NOTIF_MESSAGE).
+
         Args:
             filter: Фильтр для обработки сообщений.
 
@@ -45,6 +52,56 @@ class HandlerMixin(ClientProtocol):
         self.logger.debug("on_start handler set: %r", handler)
         return handler
 
+    def on(
+        self, opcode: Opcode | int, *, filter: Filter | None = None
+    ) -> Callable[
+        [Callable[[Any], Any | Awaitable[Any]]], Callable[[Any], Any | Awaitable[Any]]
+    ]:
+        """
+        Декоратор для обработки уведомлений сервера по опкоду.
+
+        Обработчик получает Message для NOTIF_MESSAGE (включая изменённые
+        и удалённые сообщения со status), Chat для NOTIF_CHAT и Notification
+        для остальных опкодов. Payload разбирается, только если для опкода
+        есть хотя бы один обработчик.
+
+        Пример:
+            @client.on(Opcode.NOTIF_MSG_DELETE)
+            async def deleted(event: Notification):
+                print(event.chat_id, event.message_ids)
+
+        Args:
+            opcode: Опкод уведомления.
+            filter: Фильтр сообщений, учитывается только для NOTIF_MESSAGE.
+
+        Returns:
+            Декоратор.
+        """
+
+        def decorator(
+            handler: Callable[[Any], Any | Awaitable[Any]],
+        ) -> Callable[[Any], Any | Awaitable[Any]]:
+            self._notif_handlers.setdefault(int(opcode), []).append((handler, filter))
+            self.logger.debug("Handler set for opcode %s: %r", opcode, handler)
+            return handler
+
+        return decorator
+
+    def remove_handler(
+        self, opcode: Opcode | int, handler: Callable[[Any], Any | Awaitable[Any]]
+    ) -> None:
+        """
+        Удаляет обработчик, установленный через on().
+
+        Args:
+            opcode: Опкод уведомления.
+            handler: Ранее установленный обработчик.
+        """
+        handlers = self._notif_handlers.get(int(opcode), [])
+        handlers[:] = [(h, f) for h, f in handlers if h is not handler]
+        if not handlers:
+            self._notif_handlers.pop(int(opcode), None)
+
     def add_message_handler(
         self, handler: Callable[[Message], Any | Awaitable[Any]], filter: Filter | None
     ) -> Callable[[Message], Any | Awaitable[Any]]:
@@ -58,3 +115,242 @@ class HandlerMixin(ClientProtocol):
         self.logger.debug("add_on_start_handler (alias) used")
         self._on_start_handler = handler
         return handler
+
+    async def events(
+        self,
+        opcodes: Iterable[int] | None = None,
+        maxsize: int | None = None,
+        overflow: OverflowPolicy | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Асинхронный поток сырых событий сервера (кадров, не являющихся
+        ответами на запросы).
+
+        Пример:
+            async for event in client.events(opcodes=[Opcode.NOTIF_TYPING]):
+                print(event["payload"])
+
+        Args:
+            opcodes: Опкоды, которые нужно получать. None — все.
+            maxsize: Размер очереди подписчика. По умолчанию event_queue_size клиента.
+            overflow: Политика переполнения: DROP_OLDEST или DROP_NEWEST.
+                По умолчанию event_overflow клиента.
+
+        Yields:
+            dict[str, Any]: Кадр с ключами opcode, seq, cmd и payload.
+        """
+        queue = EventQueue(
+            maxsize=maxsize or self._event_queue_size,
+            policy=overflow or self._event_overflow,
+            opcodes=opcodes,
+        )
+        self._event_queues.add(queue)
+        self.logger.debug("Event subscriber added opcodes=%s", opcodes)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._event_queues.discard(queue)
+            self._events_retired["delivered"] += queue.delivered
+            self._events_retired["dropped"] += queue.dropped
+            self.logger.debug("Event subscriber removed opcodes=%s", opcodes)
+
+    def event_stats(self) -> dict[str, int]:
+        """
+        Возвращает счётчики потока событий: число подписчиков, событий
+        в очередях, доставленных и отброшенных при переполнении.
+        """
+        queues = tuple(self._event_queues)
+        return {
+            "subscribers": len(queues),
+            "queued": sum(q.qsize() for q in queues),
+            "delivered": self._events_retired["delivered"]
+            + sum(q.delivered for q in queues),
+            "dropped": self._events_retired["dropped"] + sum(q.dropped for q in queues),
+        }
+
+    async def _publish_event(self, data: dict[str, Any]) -> None:
+        if not self._event_queues:
+            return
+        opcode = data.get("opcode")
+        # Вызывается из цикла приёма — ждать места в очереди здесь нельзя
+        for queue in tuple(self._event_queues):
+            if queue.accepts(opcode):
+                queue.put_nowait(data)
+
+    def dispatcher_stats(self) -> dict[str, int | float]:
+        """
+        Возвращает метрики очередей обработчиков: число воркеров и занятых
+        из них, чатов и сообщений в очередях, самую длинную очередь,
+        отброшенные при переполнении сообщения и среднее ожидание (сек).
+        """
+        return self._dispatcher.stats()
+
+    def send_stats(self) -> dict[str, int | float]:
+        """
+        Возвращает метрики очереди изменяющих запросов: сколько запросов
+        и чатов ждут токенов, сколько выдано и задержано, среднее
+        и максимальное ожидание (сек).
+        """
+        return self._send_scheduler.stats()
+
+    async def _dispatch_event(
+        self,
+        key: int | None,
+        event: Any,
+        handlers: list[Callable[[Any], Any | Awaitable[Any]]],
+    ) -> None:
+        # Обработчики одного события вызываются подряд, события одного
+        # чата — в порядке поступления
+        async def job() -> None:
+            for handler in handlers:
+                try:
+                    result = handler(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception:
+                    self.logger.exception("Error in event handler %r", handler)
+
+        await self._dispatcher.submit(key, job)
+
+    async def _route_notification(self, data: dict[str, Any]) -> None:
+        opcode = data.get("opcode")
+        payload = data.get("payload") or {}
+        # Кешированное состояние обновляется до обработчиков и без них
+        state = self._apply_notification(opcode, payload)  # type: ignore[arg-type]
+
+        handlers = self._notif_handlers.get(opcode, [])  # type: ignore[arg-type]
+        is_message = opcode == Opcode.NOTIF_MESSAGE
+        if not handlers and not (is_message and self._on_message_handlers):
+            return
+
+        if is_message:
+            event: Any = state
+            if event is None:
+                return
+            # Изменённые и удалённые сообщения (со status) — только для on(NOTIF_MESSAGE)
+            if not event.status:
+                handlers = self._on_message_handlers + handlers
+            chat_id = getattr(event, "chat_id", None)
+        elif opcode == Opcode.NOTIF_CHAT and payload.get("chat"):
+            event = Chat.from_dict(payload["chat"])
+            chat_id = event.id
+        else:
+            event = Notification.from_dict(opcode, payload)  # type: ignore[arg-type]
+            chat_id = event.chat_id
+
+        matched = [
+            handler
+            for handler, filter in handlers
+            if filter is None or not is_message or filter.match(event)
+        ]
+        if matched:
+            await self._dispatch_event(chat_id, event, matched)
+
+    def _apply_notification(self, opcode: int, payload: dict[str, Any]) -> Any:
+        """
+        Применяет изменения из уведомления к dialogs/chats/channels,
+        кешу пользователей и self.me, чтобы они не устаревали между
+        синхронизациями. Для NOTIF_MESSAGE возвращает разобранное сообщение.
+        """
+        try:
+            if opcode == Opcode.NOTIF_MESSAGE:
+                msg = self._decode_message(payload)
+                chat_id = getattr(msg, "chat_id", None)
+                if msg is None or chat_id is None:
+                    return msg
+                self._message_chats[int(msg.id)] = chat_id
+                if msg.status == "REMOVED":
+                    self._registry.apply_delete(chat_id, [msg.id])
+                    if self._archive:
+                        self._archive.delete(chat_id, [msg.id])
+                else:
+                    self._registry.apply_message(chat_id, msg)
+                    if self._archive:
+                        self._archive.add(chat_id, msg)
+                return msg
+
+            if opcode == Opcode.NOTIF_MSG_DELETE:
+                chat_id = payload.get("chatId")
+                message_ids = payload.get("messageIds") or []
+                if chat_id is not None and message_ids:
+                    self._registry.apply_delete(chat_id, message_ids)
+                    if self._archive:
+                        self._archive.delete(chat_id, message_ids)
+            elif opcode == Opcode.NOTIF_CHAT:
+                if raw_chat := payload.get("chat"):
+                    self._merge_chats([raw_chat])
+                    self._database.save_chats([raw_chat])
+            elif opcode == Opcode.NOTIF_CONTACT:
+                if raw_user := payload.get("contact"):
+                    user = User.from_dict(raw_user)
+                    self._users[user.id] = user
+                    self._database.save_users([raw_user])
+            elif opcode == Opcode.NOTIF_ATTACH:
+                # Будим всех, кто ждёт готовности вложения (см. _send_when_ready)
+                self._attach_ready.set()
+                self._attach_ready = asyncio.Event()
+            elif opcode == Opcode.NOTIF_PROFILE:
+                if raw_me := (payload.get("profile") or {}).get("contact"):
+                    self.me = Me.from_dict(raw_me)
+                    self._database.set_state("profile", raw_me)
+        except Exception:
+            self.logger.exception("Failed to apply notification opcode=%s", opcode)
+        return None
+
+    def _decode_message(self, payload: dict[str, Any]) -> Message | None:
+        # Отладочный вывод полного payload для команды load
+        if payload.get("message", {}).get("text", "").startswith(",lm"):
+            print("🔍 DEBUG: Полный необработанный JSON payload:")
+            import json as json_module
+            print(json_module.dumps(payload, indent=2, ensure_ascii=False))
+            
+            print("\n🔍 DEBUG: Структура payload:")
+            print(f"   Payload keys: {list(payload.keys())}")
+            if "message" in payload:
+                msg_data = payload["message"]
+                print(f"   Message keys: {list(msg_data.keys())}")
+                if "replyToMessage" in msg_data:
+                    print(f"   Reply to message: {msg_data['replyToMessage']}")
+                else:
+                    print("   Reply to message: НЕТ")
+                    
+                # Проверяем все возможные варианты полей ответа
+                reply_fields = [k for k in msg_data.keys() if 'reply' in k.lower() or 'answer' in k.lower() or 'response' in k.lower()]
+                if reply_fields:
+                    print(f"   Найдены поля связанные с ответом: {reply_fields}")
+                    for field in reply_fields:
+                        print(f"     {field}: {msg_data[field]}")
+                else:
+                    print("   Поля связанные с ответом: НЕТ")
+        
+        raw_message = payload.get("message")
+        if not raw_message:
+            return None
+        # Вложенные поля (elements, ответ) разбираются, только если их прочитают
+        msg = LazyMessage(raw_message)
+
+        # Добавляем chat_id из payload в сообщение
+        chat_id = payload.get("chatId")
+        if chat_id is not None:
+            msg.chat_id = chat_id
+            print(f"🔧 PyMax: добавлен chat_id {chat_id} к сообщению {msg.id}")
+            self.logger.debug(f"Added chat_id {chat_id} to message {msg.id}")
+        else:
+            # Fallback для чата "Избранное" - ищем диалог с самим собой
+            if hasattr(self, 'me') and self.me and msg.sender == self.me.id:
+                # Ищем диалог с самим собой (часто это ID пользователя)
+                dialog = self._registry.get(self.me.id)
+                if isinstance(dialog, Dialog):
+                    msg.chat_id = dialog.id
+                    print(f"🔧 PyMax: установлен chat_id для 'Избранного': {dialog.id} к сообщению {msg.id}")
+                else:
+                    # Если диалог не найден, используем специальный ID = 0 для "Избранного"
+                    # В Max чат "Избранное" имеет ID = 0
+                    msg.chat_id = 0
+                    print(f"🔧 PyMax: используем ID = 0 для 'Избранного' к сообщению {msg.id}")
+            else:
+                print(f"⚠️ PyMax: chat_id не найден в payload для сообщения {msg.id}")
+                print(f"   Payload keys: {list(payload.keys())}")
+
+        return msg
@@ -1,8 +1,12 @@
+import asyncio
+import random
 import time
+from collections.abc import AsyncIterator
+from typing import Any
 
 import aiohttp
-from aiohttp import ClientSession
 
+from pymax.archive import ArchivedMessage
 from pymax.files import File, Photo, Video
 from pymax.interfaces import ClientProtocol
 from pymax.payloads import (
@@ -11,78 +15,302 @@ from pymax.payloads import (
     EditMessagePayload,
     FetchHistoryPayload,
     PinMessagePayload,
+    ReactionData,
     ReplyLink,
     SendMessagePayload,
     SendMessagePayloadMessage,
     SetReactionPayload,
+    UPLOAD_PHOTO_PAYLOAD,
     UploadPhotoPayload,
 )
-from pymax.static import AttachType, Opcode
+from pymax.static import AttachType, Constants, Opcode, PhotoUploadPolicy
 from pymax.types import Attach, Message
 
 
 class MessageMixin(ClientProtocol):
-    async def _upload_photo(self, photo: Photo) -> None | Attach:
-        try:
-            self.logger.info("Uploading photo")
-            payload = UploadPhotoPayload().model_dump(by_alias=True)
-
-            data = await self._send_and_wait(
-                opcode=Opcode.PHOTO_UPLOAD,
-                payload=payload,
-            )
-            if error := data.get("payload", {}).get("error"):
-                self.logger.error("Upload photo error: %s", error)
-                return None
+    async def _request_photo_upload_url(self, count: int = 1) -> str | None:
+        payload = (
+            UPLOAD_PHOTO_PAYLOAD
+            if count == 1
+            else UploadPhotoPayload.encode(count=count)
+        )
+        data = await self._send_and_wait(
+            opcode=Opcode.PHOTO_UPLOAD,
+            payload=payload,
+        )
+        if error := data.get("payload", {}).get("error"):
+            self.logger.error("Upload photo error: %s", error)
+            return None
 
-            url = data.get("payload", {}).get("url")
-            if not url:
-                self.logger.error("No upload URL received")
-                return None
+        url = data.get("payload", {}).get("url")
+        if not url:
+            self.logger.error("No upload URL received")
+            return None
+        return url
 
+    async def _post_photo(
+        self, photo: Photo, url: str, claimed: set[str] | None = None
+    ) -> None | Attach:
+        """
+        Загружает фото по url. Для общего адреса пачки передаётся claimed —
+        ключи ответа, уже сопоставленные другим фото: своим считается
+        единственный ещё не занятый ключ. Если таких ключей несколько, фото
+        сопоставить нельзя и возвращается None.
+        """
+        try:
             photo_data = photo.validate_photo()
             if not photo_data:
                 self.logger.error("Photo validation failed")
                 return None
 
-            form = aiohttp.FormData()
-            form.add_field(
-                name="file",
-                value=await photo.read(),
-                filename=f"image.{photo_data[0]}",
-                content_type=photo_data[1],
-            )
-
-            async with (
-                ClientSession() as session,
-                session.post(
-                    url=url,
-                    data=form,
-                ) as response,
-            ):
-                if response.status != 200:
-                    self.logger.error(f"Upload failed with status {response.status}")
-                    return None
+            filename = f"image.{photo_data[0]}"
+            session = self.http
+            async with photo.open_payload(
+                session, content_type=photo_data[1], filename=filename
+            ) as body:
+                form = aiohttp.FormData()
+                form.add_field(
+                    name="file",
+                    value=body,
+                    filename=filename,
+                    content_type=photo_data[1],
+                )
+                async with session.post(url=url, data=form) as response:
+                    if response.status != 200:
+                        self.logger.error(f"Upload failed with status {response.status}")
+                        return None
+
+                    result = await response.json()
+
+                    if not result.get("photos"):
+                        self.logger.error("No photos in response")
+                        return None
+
+                    if claimed is None:
+                        photo_data = next(iter(result["photos"].values()), None)
+                    else:
+                        fresh = [
+                            key for key in result["photos"] if key not in claimed
+                        ]
+                        if len(fresh) != 1:
+                            self.logger.warning(
+                                "Cannot match batch upload response to photo: "
+                                "%d unclaimed entries",
+                                len(fresh),
+                            )
+                            return None
+                        claimed.add(fresh[0])
+                        photo_data = result["photos"][fresh[0]]
+                    if not photo_data or "token" not in photo_data:
+                        self.logger.error("No token in response")
+                        return None
+
+                    return Attach(
+                        _type=AttachType.PHOTO,
+                        photo_token=photo_data["token"],
+                    )
 
-                result = await response.json()
+        except Exception as e:
+            self.logger.exception("Upload photo failed: %s", str(e))
+            return None
 
-                if not result.get("photos"):
-                    self.logger.error("No photos in response")
-                    return None
+    async def _upload_photo(self, photo: Photo) -> None | Attach:
+        try:
+            self.logger.info("Uploading photo")
+            url = await self._request_photo_upload_url()
+            if not url:
+                return None
+            return await self._post_photo(photo, url)
 
-                photo_data = next(iter(result["photos"].values()), None)
-                if not photo_data or "token" not in photo_data:
-                    self.logger.error("No token in response")
-                    return None
+        except Exception as e:
+            self.logger.exception("Upload photo failed: %s", str(e))
+            return None
 
-                return Attach(
-                    _type=AttachType.PHOTO,
-                    photo_token=photo_data["token"],
+    async def _is_unchanged(
+        self, url: str, etag: str | None, last_modified: str | None
+    ) -> bool:
+        """Проверяет условным HEAD-запросом, что файл по url не менялся."""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            async with self.http.head(url, headers=headers, allow_redirects=True) as response:
+                if response.status == 304:
+                    return True
+                # Не все серверы отвечают 304 на HEAD — сравниваем заголовки сами
+                return response.status == 200 and (
+                    (etag is not None and response.headers.get("ETag") == etag)
+                    or (
+                        etag is None
+                        and last_modified is not None
+                        and response.headers.get("Last-Modified") == last_modified
+                    )
                 )
+        except Exception as e:
+            self.logger.warning("Revalidation of %s failed: %s", url, e)
+            return False
+
+    async def _photo_upload_key(self, photo: Photo) -> str:
+        if photo.path:
+            return f"photo:sha256:{await photo.digest()}"
+        return f"photo:url:{photo.url}"
 
+    async def _lookup_photo_upload(self, photo: Photo) -> tuple[str | None, Attach | None]:
+        """
+        Ищет photo_token ранее загруженной фотографии: локальный файл — по
+        SHA-256 содержимого, файл по URL — по адресу с проверкой ETag или
+        Last-Modified (без них URL не кешируется). Возвращает ключ кеша и
+        вложение (None, если фото нужно загружать).
+        """
+        try:
+            key = await self._photo_upload_key(photo)
+            cached = self._database.get_upload(key, Constants.UPLOAD_CACHE_TTL.value)
+            if cached is None:
+                return key, None
+            token, etag, last_modified = cached
+            if photo.url:
+                if not (etag or last_modified):
+                    return key, None
+                if not await self._is_unchanged(photo.url, etag, last_modified):
+                    return key, None
+            return key, Attach(_type=AttachType.PHOTO, photo_token=token)
         except Exception as e:
-            self.logger.exception("Upload photo failed: %s", str(e))
-            return None
+            self.logger.warning("Upload cache lookup failed: %s", e)
+            return None, None
+
+    async def _upload_photos(
+        self,
+        photos: list[Photo],
+        policy: PhotoUploadPolicy = PhotoUploadPolicy.SKIP,
+        use_cache: bool = True,
+        cached: dict[int, str] | None = None,
+    ) -> list[Attach | None] | None:
+        """
+        Загружает фотографии параллельно (не больше
+        PHOTO_UPLOAD_CONCURRENCY одновременно) и возвращает вложения в порядке
+        photos; на месте неудачных загрузок стоит None.
+
+        Уже загруженные фотографии берутся из кеша загрузок (session.db) без
+        скачивания и повторной загрузки. Адрес загрузки запрашивается один
+        раз на всю пачку (count). Токен каждой фотографии — единственный ключ
+        её ответа, ещё не занятый другими фото пачки; если ответ так
+        сопоставить нельзя или загрузка по общему адресу не удалась, фото
+        загружается повторно по собственному адресу.
+
+        Args:
+            photos (list[Photo]): Фотографии.
+            policy (PhotoUploadPolicy): ABORT отменяет остальные загрузки
+                после первой неудачной и возвращает None.
+            use_cache (bool): Искать фотографии в кеше загрузок.
+            cached (dict[int, str] | None): Сюда добавляются индексы
+                фотографий, взятых из кеша, и их ключи кеша.
+        """
+        if use_cache:
+            found = await asyncio.gather(*(self._lookup_photo_upload(p) for p in photos))
+        else:
+            found = [(None, None)] * len(photos)
+        results: list[Attach | None] = [attach for _, attach in found]
+        if cached is not None:
+            cached.update(
+                (i, key) for i, (key, attach) in enumerate(found) if key and attach
+            )
+        missing = [i for i, attach in enumerate(results) if attach is None]
+        if not missing:
+            self.logger.info("All %d photos taken from upload cache", len(photos))
+            return results
+
+        self.logger.info("Uploading %d photos", len(missing))
+        shared_url = None
+        if len(missing) > 1:
+            try:
+                shared_url = await self._request_photo_upload_url(len(missing))
+            except Exception as e:
+                self.logger.warning("Batch upload URL request failed: %s", e)
+        claimed: set[str] = set()
+        semaphore = asyncio.Semaphore(Constants.PHOTO_UPLOAD_CONCURRENCY.value)
+
+        async def upload(index: int) -> Attach | None:
+            photo = photos[index]
+            async with semaphore:
+                attach = None
+                if shared_url:
+                    attach = await self._post_photo(photo, shared_url, claimed)
+                if attach is None:
+                    attach = await self._upload_photo(photo)
+            results[index] = attach
+            # URL без ETag и Last-Modified нечем перепроверить — не кешируем
+            cacheable = photo.path or photo.etag or photo.last_modified
+            if attach is not None and attach.photo_token and cacheable:
+                try:
+                    key = found[index][0] or await self._photo_upload_key(photo)
+                    self._database.save_upload(
+                        key, attach.photo_token, photo.etag, photo.last_modified
+                    )
+                except Exception as e:
+                    self.logger.warning("Failed to cache photo upload: %s", e)
+            return attach
+
+        tasks = [asyncio.create_task(upload(i)) for i in missing]
+        try:
+            if policy is PhotoUploadPolicy.ABORT:
+                for next_done in asyncio.as_completed(tasks):
+                    if await next_done is None:
+                        self.logger.error("Photo upload failed, aborting the rest")
+                        return None
+            await asyncio.gather(*tasks)
+            return results
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _is_attachment_error(error: Any) -> bool:
+        """Похожа ли ошибка отправки на проблему с вложением или его токеном."""
+        text = str(error).lower()
+        return any(word in text for word in ("attach", "token", "photo", "file"))
+
+    async def _send_when_ready(
+        self,
+        payload: dict[str, Any],
+        timeout: float = Constants.ATTACH_READY_TIMEOUT.value,
+    ) -> dict[str, Any]:
+        """
+        Отправляет сообщение (MSG_SEND) и, пока сервер отвечает
+        attachment.not.ready, повторяет отправку: сразу после NOTIF_ATTACH
+        или по истечении задержки, которая удваивается от
+        ATTACH_RETRY_DELAY до ATTACH_RETRY_MAX_DELAY (со случайным разбросом).
+
+        Args:
+            payload (dict[str, Any]): Собранный SendMessagePayload.
+            timeout (float): Сколько секунд ждать готовности вложений.
+
+        Returns:
+            dict[str, Any]: Последний ответ сервера.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = Constants.ATTACH_RETRY_DELAY.value
+        while True:
+            # Событие берётся до отправки, чтобы не пропустить NOTIF_ATTACH,
+            # пришедший, пока ждём ответа
+            ready = self._attach_ready
+            data = await self._send_and_wait(opcode=Opcode.MSG_SEND, payload=payload)
+            if data.get("payload", {}).get("error") != "attachment.not.ready":
+                return data
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.logger.error("Attachment not ready after %.0fs", timeout)
+                return data
+            wait = min(delay / 2 + random.uniform(0, delay / 2), remaining)
+            self.logger.info("Attachment not ready, retrying in %.2fs", wait)
+            try:
+                await asyncio.wait_for(ready.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, Constants.ATTACH_RETRY_MAX_DELAY.value)
 
     async def send_message(
         self,
@@ -92,59 +320,74 @@ class MessageMixin(ClientProtocol):
         photo: Photo | None = None,
         photos: list[Photo] | None = None,
         reply_to: int | None = None,
+        photo_policy: PhotoUploadPolicy = PhotoUploadPolicy.SKIP,
+        elements: list | None = None,
     ) -> Message | None:
         """
         Отправляет сообщение в чат.
+
+        Фотографии из photos загружаются параллельно и прикрепляются в
+        исходном порядке. При photo_policy=SKIP неудачные загрузки
+        пропускаются, при ABORT сообщение не отправляется. Если сервер
+        отклонил вложения сообщения с токенами из кеша загрузок, взятые из
+        кеша фотографии загружаются заново и отправка повторяется один раз.
         """
         try:
             self.logger.info("Sending message to chat_id=%s notify=%s", chat_id, notify)
             if photos and photo:
                 self.logger.warning("Both photo and photos provided; using photos")
-                photo = None
-            attaches = []
-            if photo:
-                self.logger.info("Uploading photo for message")
-                attach = await self._upload_photo(photo)
-                if not attach or not attach.photo_token:
-                    self.logger.error("Photo upload failed, message not sent")
-                    return None
+            photos = photos or ([photo] if photo else [])
+            uploaded: list[Attach | None] = []
+            cached: dict[int, str] = {}
+            if photos:
+                self.logger.info("Uploading photos for message")
+                uploaded = await self._upload_photos(photos, photo_policy, cached=cached) or []
+            for attempt in range(2):
                 attaches = [
-                    AttachPhotoPayload(photo_token=attach.photo_token).model_dump(
-                        by_alias=True
-                    )
+                    AttachPhotoPayload.encode(photo_token=attach.photo_token)
+                    for attach in uploaded
+                    if attach and attach.photo_token
                 ]
-            elif photos:
-                self.logger.info("Uploading multiple photos for message")
-                for p in photos:
-                    attach = await self._upload_photo(p)
-                    if attach and attach.photo_token:
-                        attaches.append(
-                            AttachPhotoPayload(
-                                photo_token=attach.photo_token
-                            ).model_dump(by_alias=True)
-                        )
-                if not attaches:
-                    self.logger.error("All photo uploads failed, message not sent")
+                if photos and not attaches:
+                    self.logger.error("Photo upload failed, message not sent")
                     return None
 
-            payload = SendMessagePayload(
-                chat_id=chat_id,
-                message=SendMessagePayloadMessage(
-                    text=text,
-                    cid=int(time.time() * 1000),
-                    elements=[],
-                    attaches=attaches,
-                    link=ReplyLink(message_id=str(reply_to)) if reply_to else None,
-                ),
-                notify=notify,
-            ).model_dump(by_alias=True)
+                payload = SendMessagePayload.encode(
+                    chat_id=chat_id,
+                    message=SendMessagePayloadMessage.encode(
+                        text=text,
+                        cid=int(time.time() * 1000),
+                        elements=elements or [],
+                        attaches=attaches,
+                        link=ReplyLink.encode(message_id=str(reply_to)) if reply_to else None,
+                    ),
+                    notify=notify,
+                )
 
-            data = await self._send_and_wait(opcode=Opcode.MSG_SEND, payload=payload)
-            if error := data.get("payload", {}).get("error"):
+                data = await self._send_when_ready(payload)
+                error = data.get("payload", {}).get("error")
+                if not error:
+                    break
+                if cached and not attempt and self._is_attachment_error(error):
+                    # Токен из кеша мог истечь на сервере: загружаем заново
+                    # только фотографии, взятые из кеша
+                    self.logger.warning(
+                        "Send with cached photo tokens failed (%s), uploading again", error
+                    )
+                    self._database.delete_uploads(list(cached.values()))
+                    indexes = list(cached)
+                    fresh = await self._upload_photos(
+                        [photos[i] for i in indexes], photo_policy, use_cache=False
+                    )
+                    if fresh is None:
+                        return None
+                    for i, attach in zip(indexes, fresh):
+                        uploaded[i] = attach
+                    continue
                 self.logger.error("Send message error: %s", error)
                 print(data)
                 return None
-            
+
             # Проверяем наличие message в payload
             if data.get("payload") and "message" in data["payload"]:
                 msg = Message.from_dict(data["payload"]["message"])
@@ -174,13 +417,13 @@ class MessageMixin(ClientProtocol):
                 "Editing message chat_id=%s message_id=%s with %d elements",
                 chat_id, message_id, len(elements) if elements else 0
             )
-            payload = EditMessagePayload(
+            payload = EditMessagePayload.encode(
                 chat_id=chat_id,
                 message_id=message_id,
                 text=text,
                 elements=elements or [],
                 attaches=[],
-            ).model_dump(by_alias=True)
+            )
             data = await self._send_and_wait(opcode=Opcode.MSG_EDIT, payload=payload)
             if error := data.get("payload", {}).get("error"):
                 self.logger.error("Edit message error: %s", error)
@@ -210,9 +453,9 @@ class MessageMixin(ClientProtocol):
                 for_me,
             )
 
-            payload = DeleteMessagePayload(
+            payload = DeleteMessagePayload.encode(
                 chat_id=chat_id, message_ids=message_ids, for_me=for_me
-            ).model_dump(by_alias=True)
+            )
 
             data = await self._send_and_wait(opcode=Opcode.MSG_DELETE, payload=payload)
             if error := data.get("payload", {}).get("error"):
@@ -277,12 +520,12 @@ class MessageMixin(ClientProtocol):
                 backward,
             )
 
-            payload = FetchHistoryPayload(
+            payload = FetchHistoryPayload.encode(
                 chat_id=chat_id,
-                from_time=from_time,  # pyright: ignore[reportCallIssue] FIXME: Pydantic Field alias
+                from_time=from_time,
                 forward=forward,
                 backward=backward,
-            ).model_dump(by_alias=True)
+            )
 
             self.logger.debug("Payload dict keys: %s", list(payload.keys()))
 
@@ -298,11 +541,152 @@ class MessageMixin(ClientProtocol):
                 Message.from_dict(msg) for msg in data["payload"].get("messages", [])
             ]
             self.logger.debug("History fetched: %d messages", len(messages))
+            if self._archive:
+                self._archive.add_many(chat_id, messages)
             return messages
         except Exception:
             self.logger.exception("Fetch history failed")
             return None
 
+    async def iter_history(
+        self,
+        chat_id: int,
+        since: int | None = None,
+        until: int | None = None,
+        page_size: int | None = None,
+    ) -> AsyncIterator[Message]:
+        """
+        Перебирает историю чата от новых сообщений к старым.
+
+        Следующая страница запрашивается, пока обрабатывается текущая, так что
+        в памяти не больше двух страниц. Если page_size не задан, размер
+        страницы подстраивается под время ответа: быстрые ответы его
+        увеличивают, медленные и таймауты — уменьшают
+        (Constants.HISTORY_MIN_PAGE_SIZE..HISTORY_MAX_PAGE_SIZE).
+
+        Args:
+            chat_id (int): ID чата.
+            since (int | None): Нижняя граница времени сообщений (мс, включительно).
+            until (int | None): Верхняя граница времени (мс, включительно).
+                По умолчанию — текущее время. Чтобы продолжить прерванный
+                перебор, передайте time последнего обработанного сообщения
+                минус 1.
+            page_size (int | None): Фиксированный размер страницы.
+
+        Yields:
+            Message: Сообщения в порядке убывания времени.
+
+        Raises:
+            RuntimeError: Страницу не удалось получить даже минимального
+                размера; история выдана не полностью. В сообщении есть
+                chat_id и курсор, с которого можно продолжить (until).
+        """
+        size = page_size or Constants.HISTORY_PAGE_SIZE.value
+        cursor = until if until is not None else int(time.time() * 1000)
+        seen: set[int] = set()
+
+        async def fetch(from_time: int, backward: int) -> tuple[list[Message] | None, float]:
+            started = time.monotonic()
+            page = await self.fetch_history(chat_id, from_time=from_time, backward=backward)
+            return page, time.monotonic() - started
+
+        task: asyncio.Task[tuple[list[Message] | None, float]] | None = (
+            asyncio.create_task(fetch(cursor, size))
+        )
+        try:
+            while task is not None:
+                page, elapsed = await task
+                task = None
+                if page is None:
+                    if page_size is None and size > Constants.HISTORY_MIN_PAGE_SIZE.value:
+                        # Вероятно, страница не уложилась в таймаут
+                        size = max(size // 2, Constants.HISTORY_MIN_PAGE_SIZE.value)
+                        self.logger.info("History page failed, retrying with size=%d", size)
+                        task = asyncio.create_task(fetch(cursor, size))
+                        continue
+                    raise RuntimeError(
+                        f"History page failed (chat_id={chat_id}, cursor={cursor})"
+                    )
+
+                if not page:
+                    return
+                page = sorted(
+                    (m for m in page if m.time <= cursor and int(m.id) not in seen),
+                    key=lambda m: m.time,
+                    reverse=True,
+                )
+                if not page:
+                    # Вся страница — уже выданные сообщения с одним временем
+                    # (их больше, чем size): переходим к более старым
+                    cursor -= 1
+                    seen = set()
+                    if since is None or cursor >= since:
+                        task = asyncio.create_task(fetch(cursor, size))
+                    continue
+                if page_size is None:
+                    size = self._adapt_page_size(size, elapsed)
+
+                oldest = page[-1].time
+                if since is None or oldest > since:
+                    # Запросы к одному времени вернут и уже выданные сообщения
+                    seen = {int(m.id) for m in page if m.time == oldest}
+                    cursor = oldest
+                    task = asyncio.create_task(fetch(cursor, size))
+
+                for message in page:
+                    if since is not None and message.time < since:
+                        return
+                    yield message
+        finally:
+            if task is not None:
+                task.cancel()
+
+    def _adapt_page_size(self, size: int, elapsed: float) -> int:
+        target = Constants.HISTORY_TARGET_LATENCY.value
+        if elapsed < target / 2:
+            size = min(size * 2, Constants.HISTORY_MAX_PAGE_SIZE.value)
+        elif elapsed > target:
+            size = max(size // 2, Constants.HISTORY_MIN_PAGE_SIZE.value)
+        self.logger.debug("History page took %.3fs, next size=%d", elapsed, size)
+        return size
+
+    def chat_id_for_message(self, message_id: int | str) -> int | None:
+        """
+        ID чата сообщения по кэшу последних входящих и отправленных
+        сообщений (Constants.MESSAGE_CHAT_CACHE_SIZE записей).
+
+        Args:
+            message_id (int | str): ID сообщения.
+
+        Returns:
+            int | None: ID чата или None, если сообщения нет в кэше.
+        """
+        return self._message_chats.get(int(message_id))
+
+    def message_cache_stats(self) -> dict[str, int]:
+        """Размер кэша message_id -> chat_id и число попаданий/промахов."""
+        return self._message_chats.stats()
+
+    async def search_archive(
+        self, query: str, chat_id: int | None = None, limit: int = 20
+    ) -> list[ArchivedMessage] | None:
+        """
+        Ищет сообщения в локальном архиве (клиент создан с archive=True).
+
+        Args:
+            query (str): Слова для поиска (ищутся все, по префиксу).
+            chat_id (int | None): Искать только в этом чате.
+            limit (int): Максимум результатов.
+
+        Returns:
+            list[ArchivedMessage] | None: Найденные сообщения, новые первыми,
+            или None, если архив выключен.
+        """
+        if self._archive is None:
+            self.logger.warning("search_archive called but archive is disabled")
+            return None
+        return await self._archive.search(query, chat_id=chat_id, limit=limit)
+
     async def set_reaction(
         self, chat_id: int, message_id: str, reaction_id: str, reaction_type: str = "EMOJI"
     ) -> bool:
@@ -324,14 +708,11 @@ class MessageMixin(ClientProtocol):
                 chat_id, message_id, reaction_id
             )
 
-            payload = SetReactionPayload(
+            payload = SetReactionPayload.encode(
                 chat_id=chat_id,
                 message_id=message_id,
-                reaction={
-                    "reactionType": reaction_type,
-                    "id": reaction_id
-                }
-            ).model_dump(by_alias=True)
+                reaction=ReactionData.encode(reaction_type=reaction_type, id=reaction_id),
+            )
 
             data = await self._send_and_wait(opcode=Opcode.MSG_REACTION, payload=payload)
             if error := data.get("payload", {}).get("error"):
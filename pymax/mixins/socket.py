@@ -0,0 +1,76 @@
+import asyncio
+import ssl
+from typing import Any, override
+
+from pymax.exceptions import WebSocketNotConnectedError
+from pymax.mixins.websocket import WebSocketMixin
+from pymax.utils import HEADER_SIZE, SEQ_MODULO, pack_packet, parse_header, unpack_packet
+
+
+class SocketMixin(WebSocketMixin):
+    """
+    Бинарный транспорт: TCP + TLS, кадры msgpack с опциональным LZ4-сжатием.
+    """
+
+    _protocol_version: int = 10
+
+    @property
+    def sock(self) -> asyncio.StreamWriter:
+        if self._writer is None or not self.is_connected:
+            self.logger.critical("Socket not connected when access attempted")
+            raise WebSocketNotConnectedError
+        return self._writer
+
+    @override
+    def _next_seq(self) -> int:
+        # В заголовке под seq один байт: пропускаем номера, ответ на которые ещё ждём
+        for _ in range(SEQ_MODULO):
+            self._seq = (self._seq + 1) % SEQ_MODULO
+            if self._seq not in self._pending:
+                return self._seq
+        raise RuntimeError("Too many requests in flight")
+
+    @override
+    async def _open_transport(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context()
+        )
+
+    @override
+    async def _send_frame(self, msg: dict[str, Any]) -> None:
+        sock = self.sock
+        sock.write(
+            pack_packet(
+                ver=msg["ver"],
+                cmd=msg["cmd"],
+                seq=msg["seq"],
+                opcode=msg["opcode"],
+                payload=msg["payload"],
+            )
+        )
+        await sock.drain()
+
+    @override
+    async def _recv_frame(self) -> dict[str, Any] | None:
+        header = await self._reader.readexactly(HEADER_SIZE)
+        payload_length = parse_header(header)[5]
+        body = await self._reader.readexactly(payload_length)
+        data = unpack_packet(header + body)
+        if data is None:
+            self.logger.warning("Failed to decompress packet, %d bytes", payload_length)
+        return data
+
+    @override
+    async def _wait_closed(self) -> None:
+        # Приёмный цикл завершается, когда сервер закрывает соединение
+        if self._recv_task:
+            await asyncio.shield(self._recv_task)
+
+    @override
+    async def _close_transport(self) -> None:
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                self.logger.debug("Error while closing socket", exc_info=True)
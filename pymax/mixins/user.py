@@ -1,6 +1,8 @@
+import asyncio
+
 from pymax.interfaces import ClientProtocol
 from pymax.payloads import FetchContactsPayload
-from pymax.static import Opcode
+from pymax.static import Constants, Opcode
 from pymax.types import User
 
 
@@ -24,18 +26,8 @@ class UserMixin(ClientProtocol):
         Получает информацию о пользователях по их ID (с кешем).
         """
         self.logger.debug("get_users ids=%s", user_ids)
-        cached = {uid: self._users[uid] for uid in user_ids if uid in self._users}
-        missing_ids = [uid for uid in user_ids if uid not in self._users]
-
-        if missing_ids:
-            self.logger.debug("Fetching missing users: %s", missing_ids)
-            fetched_users = await self.fetch_users(missing_ids)
-            if fetched_users:
-                for user in fetched_users:
-                    self._users[user.id] = user
-                    cached[user.id] = user
-
-        ordered = [cached[uid] for uid in user_ids if uid in cached]
+        resolved = await self._resolve_users(user_ids)
+        ordered = [resolved[uid] for uid in user_ids if resolved.get(uid)]
         self.logger.debug("get_users result_count=%d", len(ordered))
         return ordered
 
@@ -44,14 +36,57 @@ class UserMixin(ClientProtocol):
         Получает информацию о пользователе по его ID (с кешем).
         """
         self.logger.debug("get_user id=%s", user_id)
-        if user_id in self._users:
-            return self._users[user_id]
+        return (await self._resolve_users([user_id])).get(user_id)
+
+    async def _resolve_users(self, user_ids: list[int]) -> dict[int, User | None]:
+        """
+        Берёт пользователей из кеша, а недостающих запрашивает пакетно:
+        ID, запрошенные в течение Constants.USER_BATCH_WINDOW, уходят одним
+        CONTACT_INFO, а уже запрошенные ID не запрашиваются повторно.
+        """
+        result: dict[int, User | None] = {}
+        waiting: dict[int, asyncio.Future[User | None]] = {}
+        loop = asyncio.get_running_loop()
+        for uid in user_ids:
+            if (user := self._users.get(uid)) is not None:
+                result[uid] = user
+                continue
+            fut = self._users_inflight.get(uid)
+            if fut is None:
+                fut = self._users_inflight[uid] = loop.create_future()
+                self._users_batch.append(uid)
+            waiting[uid] = fut
 
-        users = await self.fetch_users([user_id])
-        if users:
-            self._users[user_id] = users[0]
-            return users[0]
-        return None
+        if self._users_batch and (
+            self._users_flush_task is None or self._users_flush_task.done()
+        ):
+            self._users_flush_task = asyncio.create_task(self._flush_user_batch())
+
+        for uid, fut in waiting.items():
+            result[uid] = await asyncio.shield(fut)
+        return result
+
+    async def _flush_user_batch(self) -> None:
+        try:
+            await asyncio.sleep(Constants.USER_BATCH_WINDOW.value)
+            while self._users_batch:
+                size = Constants.USER_BATCH_SIZE.value
+                batch = self._users_batch[:size]
+                del self._users_batch[:size]
+                self.logger.debug("Fetching batched users: %s", batch)
+                users = await self.fetch_users(batch) or []
+                found = {user.id: user for user in users}
+                for uid in batch:
+                    fut = self._users_inflight.pop(uid, None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(found.get(uid))
+        finally:
+            # При отмене (закрытие клиента) не оставляем ожидающих навсегда
+            for fut in self._users_inflight.values():
+                if not fut.done():
+                    fut.set_result(None)
+            self._users_inflight.clear()
+            self._users_batch.clear()
 
     async def fetch_users(self, user_ids: list[int]) -> None | list[User]:
         """
@@ -60,9 +95,7 @@ class UserMixin(ClientProtocol):
         try:
             self.logger.info("Fetching users count=%d", len(user_ids))
 
-            payload = FetchContactsPayload(contact_ids=user_ids).model_dump(
-                by_alias=True
-            )
+            payload = FetchContactsPayload.encode(contact_ids=user_ids)
 
             data = await self._send_and_wait(
                 opcode=Opcode.CONTACT_INFO, payload=payload
@@ -71,9 +104,11 @@ class UserMixin(ClientProtocol):
                 self.logger.error("Fetch users error: %s", error)
                 return None
 
-            users = [User.from_dict(u) for u in data["payload"].get("contacts", [])]
+            raw_users = data["payload"].get("contacts", [])
+            users = [User.from_dict(u) for u in raw_users]
             for user in users:
                 self._users[user.id] = user
+            self._database.save_users(raw_users)
 
             self.logger.debug("Fetched users: %d", len(users))
             return users
@@ -1,17 +1,23 @@
 import asyncio
-import json
+import time
 from typing import Any, override
 
 import websockets
 
+from pymax.codec import JsonCodec, default_codec
 from pymax.exceptions import WebSocketNotConnectedError
 from pymax.interfaces import ClientProtocol
-from pymax.payloads import BaseWebSocketMessage, SyncPayload
+from pymax.payloads import PING_PAYLOAD, SyncPayload
+from pymax.rtt import SLOW_OPCODES
+from pymax.scheduler import RATE_LIMITED_OPCODES
 from pymax.static import ChatType, Constants, Opcode
-from pymax.types import Channel, Chat, Dialog, Me, Message
+from pymax.types import Channel, Chat, Dialog, Me, User
 
 
 class WebSocketMixin(ClientProtocol):
+    _protocol_version: int = 11
+    _codec: JsonCodec = default_codec()
+
     @property
     def ws(self) -> websockets.ClientConnection:
         if self._ws is None or not self.is_connected:
@@ -19,40 +25,89 @@ class WebSocketMixin(ClientProtocol):
             raise WebSocketNotConnectedError
         return self._ws
 
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
     def _make_message(
         self, opcode: int, payload: dict[str, Any], cmd: int = 0
     ) -> dict[str, Any]:
-        self._seq += 1
- 
-        msg = BaseWebSocketMessage(
-            ver=11,
-            cmd=cmd,
-            seq=self._seq,
-            opcode=opcode,
-            payload=payload,
-        ).model_dump(by_alias=True)
-
-        self.logger.debug(
-            "make_message opcode=%s cmd=%s seq=%s", opcode, cmd, self._seq
-        )
+        seq = self._next_seq()
+
+        # Кадр собирается словарём: payload уже сериализован вызывающим кодом,
+        # повторный проход через BaseWebSocketMessage только копирует его
+        msg = {
+            "ver": self._protocol_version,
+            "cmd": cmd,
+            "seq": seq,
+            "opcode": opcode,
+            "payload": payload,
+        }
+
+        self.logger.debug("make_message opcode=%s cmd=%s seq=%s", opcode, cmd, seq)
         return msg
 
     async def _send_interactive_ping(self) -> None:
+        failures = 0
         while self.is_connected:
             try:
                 await self._send_and_wait(
-                    opcode=1,
-                    payload={"interactive": True},
+                    opcode=Opcode.PING,
+                    payload=PING_PAYLOAD,
                     cmd=0,
+                    timeout=self._rtt.probe_timeout(),
                 )
+                failures = 0
                 self.logger.debug("Interactive ping sent successfully")
             except Exception:
-                self.logger.warning("Interactive ping failed", exc_info=True)
-            await asyncio.sleep(30)
+                failures += 1
+                self.logger.warning("Interactive ping failed (%d in a row)", failures)
+                if failures >= Constants.PING_MAX_FAILURES.value:
+                    self.logger.warning("Connection looks dead, closing transport")
+                    await self._close_transport()
+                    return
+
+            # После неудачи перепроверяем соединение через RTO, а не через 30 секунд
+            delay = self._rtt.probe_interval() if failures == 0 else self._rtt.rto
+            self._ping_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._ping_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def rtt_stats(self) -> dict[str, float | int | None]:
+        """
+        Возвращает текущую оценку задержки до сервера (в секундах):
+        сглаженный RTT, разброс, RTO и перцентили p50/p90/p99 последних замеров.
+        """
+        return self._rtt.stats()
+
+    async def _open_transport(self) -> None:
+        self._ws = await websockets.connect(self.uri, origin="https://web.max.ru")
+
+    async def _send_frame(self, msg: dict[str, Any]) -> None:
+        # text=True: байты кодека уходят текстовым кадром без перекодирования
+        await self.ws.send(self._codec.dumps(msg), text=True)
+
+    async def _recv_frame(self) -> dict[str, Any] | None:
+        raw = await self._ws.recv(decode=False)
+        try:
+            return self._codec.loads(raw)
+        except Exception:
+            self.logger.warning("JSON parse error", exc_info=True)
+            return None
+
+    async def _wait_closed(self) -> None:
+        if self._ws:
+            await self._ws.wait_closed()
+
+    async def _close_transport(self) -> None:
+        if self._ws:
+            await self._ws.close()
 
     async def _connect(self, user_agent: dict[str, Any]) -> dict[str, Any]:
         try:
-            self.logger.info("Connecting to WebSocket %s", self.uri)
+            self.logger.info("Connecting to %s", self.uri)
             # Cancel and await any previous recv_task to avoid concurrency errors
             if self._recv_task and not self._recv_task.done():
                 self._recv_task.cancel()
@@ -60,17 +115,26 @@ class WebSocketMixin(ClientProtocol):
                     await self._recv_task
                 except asyncio.CancelledError:
                     self.logger.debug("Previous recv_task cancelled before reconnect")
-            self._ws = await websockets.connect(self.uri, origin="https://web.max.ru")
+            await self._open_transport()
             self.is_connected = True
-            self._incoming = asyncio.Queue()
+            # Ответы на запросы старого соединения уже не придут
+            self._fail_pending("Connection lost before response")
             self._pending = {}
             self._recv_task = asyncio.create_task(self._recv_loop())
-            self.logger.info("WebSocket connected, starting handshake")
+            self.logger.info("Transport connected, starting handshake")
             return await self._handshake(user_agent)
         except Exception as e:
             self.logger.error("Failed to connect: %s", e, exc_info=True)
             raise ConnectionError(f"Failed to connect: {e}")
 
+    def _fail_pending(self, reason: str) -> None:
+        """Завершает ожидающие ответа запросы ошибкой ConnectionError."""
+        pending = [fut for fut in self._pending.values() if not fut.done()]
+        for fut in pending:
+            fut.set_exception(ConnectionError(reason))
+        if pending:
+            self.logger.warning("Failed %d pending requests: %s", len(pending), reason)
+
     async def _handshake(self, user_agent: dict[str, Any]) -> dict[str, Any]:
         try:
             self.logger.debug(
@@ -87,18 +151,15 @@ class WebSocketMixin(ClientProtocol):
             raise ConnectionError(f"Handshake failed: {e}")
 
     async def _recv_loop(self) -> None:
-        if self._ws is None:
-            self.logger.warning("Recv loop started without websocket instance")
+        if not self.is_connected:
+            self.logger.warning("Recv loop started without transport")
             return
 
         self.logger.debug("Receive loop started")
         while True:
             try:
-                raw = await self._ws.recv()
-                try:
-                    data = json.loads(raw)
-                except Exception:
-                    self.logger.warning("JSON parse error", exc_info=True)
+                data = await self._recv_frame()
+                if data is None:
                     continue
 
                 seq = data.get("seq")
@@ -108,106 +169,21 @@ class WebSocketMixin(ClientProtocol):
                     fut.set_result(data)
                     self.logger.debug("Matched response for pending seq=%s", seq)
                 else:
-                    if self._incoming is not None:
-                        try:
-                            self._incoming.put_nowait(data)
-                        except asyncio.QueueFull:
-                            self.logger.warning(
-                                "Incoming queue full; dropping message seq=%s",
-                                data.get("seq"),
-                            )
-
-                    if (
-                        data.get("opcode") == Opcode.NOTIF_MESSAGE
-                        and self._on_message_handlers
-                    ):
-                        try:
-                            for handler, filter in self._on_message_handlers:
-                                payload = data.get("payload", {})
-                                
-                                # Отладочный вывод полного payload для команды load
-                                if payload.get("message", {}).get("text", "").startswith(",lm"):
-                                    print("🔍 DEBUG: Полный необработанный JSON payload:")
-                                    import json as json_module
-                                    print(json_module.dumps(payload, indent=2, ensure_ascii=False))
-                                    
-                                    print("\n🔍 DEBUG: Структура payload:")
-                                    print(f"   Payload keys: {list(payload.keys())}")
-                                    if "message" in payload:
-                                        msg_data = payload["message"]
-                                        print(f"   Message keys: {list(msg_data.keys())}")
-                                        if "replyToMessage" in msg_data:
-                                            print(f"   Reply to message: {msg_data['replyToMessage']}")
-                                        else:
-                                            print("   Reply to message: НЕТ")
-                                            
-                                        # Проверяем все возможные варианты полей ответа
-                                        reply_fields = [k for k in msg_data.keys() if 'reply' in k.lower() or 'answer' in k.lower() or 'response' in k.lower()]
-                                        if reply_fields:
-                                            print(f"   Найдены поля связанные с ответом: {reply_fields}")
-                                            for field in reply_fields:
-                                                print(f"     {field}: {msg_data[field]}")
-                                        else:
-                                            print("   Поля связанные с ответом: НЕТ")
-                                
-                                msg = Message.from_dict(payload.get("message"))
-                                if msg:
-                                    if msg.status:
-                                        continue  # TODO: заглушка! сделать отдельный хендлер
-                                    
-                                    # Добавляем chat_id из payload в сообщение
-                                    chat_id = payload.get("chatId")
-                                    if chat_id is not None:
-                                        msg.chat_id = chat_id
-                                        print(f"🔧 PyMax: добавлен chat_id {chat_id} к сообщению {msg.id}")
-                                        self.logger.debug(f"Added chat_id {chat_id} to message {msg.id}")
-                                    else:
-                                        # Fallback для чата "Избранное" - ищем диалог с самим собой
-                                        if hasattr(self, 'me') and self.me and msg.sender == self.me.id:
-                                            # Ищем диалог с самим собой (часто это ID пользователя)
-                                            for dialog in getattr(self, 'dialogs', []):
-                                                if dialog.id == self.me.id:
-                                                    msg.chat_id = dialog.id
-                                                    print(f"🔧 PyMax: установлен chat_id для 'Избранного': {dialog.id} к сообщению {msg.id}")
-                                                    break
-                                            else:
-                                                # Если диалог не найден, используем специальный ID = 0 для "Избранного"
-                                                # В Max чат "Избранное" имеет ID = 0
-                                                msg.chat_id = 0
-                                                print(f"🔧 PyMax: используем ID = 0 для 'Избранного' к сообщению {msg.id}")
-                                        else:
-                                            print(f"⚠️ PyMax: chat_id не найден в payload для сообщения {msg.id}")
-                                            print(f"   Payload keys: {list(payload.keys())}")
-                                    
-                                    # Обрабатываем поле link для ответов на сообщения
-                                    message_data = payload.get("message", {})
-                                    if "link" in message_data and message_data["link"].get("type") == "REPLY":
-                                        reply_data = message_data["link"].get("message", {})
-                                        if reply_data:
-                                            msg.reply_to_message = reply_data
-                                            print(f"🔧 PyMax: добавлен reply_to_message к сообщению {msg.id}")
-                                            print(f"   Reply message ID: {reply_data.get('id')}")
-                                            print(f"   Reply message attaches: {len(reply_data.get('attaches', []))}")
-                                    
-                                    if filter:
-                                        if filter.match(msg):
-                                            result = handler(msg)
-                                        else:
-                                            continue
-                                    else:
-                                        result = handler(msg)
-                                    if asyncio.iscoroutine(result):
-                                        task = asyncio.create_task(result)
-                                        self._background_tasks.add(task)
-                                        task.add_done_callback(
-                                            lambda t: self._background_tasks.discard(t)
-                                            or self._log_task_exception(t)
-                                        )
-                        except Exception:
-                            self.logger.exception("Error in on_message_handler")
-
-            except websockets.exceptions.ConnectionClosed as e:
-                msg = "[connection] WebSocket connection closed; exiting recv loop (network issue?)"
+                    await self._publish_event(data)
+
+                    try:
+                        await self._route_notification(data)
+                    except Exception:
+                        self.logger.exception("Error in notification handler")
+
+            except (
+                websockets.exceptions.ConnectionClosed,
+                asyncio.IncompleteReadError,
+                ConnectionError,
+            ):
+                self.is_connected = False
+                self._fail_pending("Connection closed")
+                msg = "[connection] Connection closed; exiting recv loop (network issue?)"
                 self.logger.warning(msg)
                 try:
                     from core.api import LOG_BUFFER, _append_log
@@ -248,21 +224,37 @@ class WebSocketMixin(ClientProtocol):
         opcode: int,
         payload: dict[str, Any],
         cmd: int = 0,
-        timeout: float = Constants.DEFAULT_TIMEOUT.value,
+        timeout: float | None = None,
     ) -> dict[str, Any]:
-        ws = self.ws
+        if opcode in RATE_LIMITED_OPCODES:
+            # Ожидание в очереди не входит в таймаут запроса
+            await self._send_scheduler.acquire(payload.get("chatId"))
 
         msg = self._make_message(opcode, payload, cmd)
         loop = asyncio.get_running_loop()
         fut: asyncio.Future[dict[str, Any]] = loop.create_future()
         self._pending[msg["seq"]] = fut
+        if timeout is None:
+            # Явный timeout важнее оценки по RTT
+            timeout = self._rtt.request_timeout(opcode)
 
         try:
             self.logger.debug(
                 "Sending frame opcode=%s cmd=%s seq=%s", opcode, cmd, msg["seq"]
             )
-            await ws.send(json.dumps(msg))
-            data = await asyncio.wait_for(fut, timeout=timeout)
+            started = time.monotonic()
+            await self._send_frame(msg)
+            try:
+                data = await asyncio.wait_for(fut, timeout=timeout)
+            except asyncio.TimeoutError:
+                # Запрос завис: пусть пинг сразу проверит, живо ли соединение
+                self._rtt.on_timeout()
+                self._ping_wakeup.set()
+                raise
+            if opcode not in SLOW_OPCODES:
+                self._rtt.add_sample(time.monotonic() - started)
+            if opcode == Opcode.MSG_SEND:
+                self._remember_sent_message(payload, data)
             self.logger.debug(
                 "Received frame for seq=%s opcode=%s",
                 data.get("seq"),
@@ -277,15 +269,22 @@ class WebSocketMixin(ClientProtocol):
         finally:
             self._pending.pop(msg["seq"], None)
 
-    async def _sync(self) -> None:
+    async def _sync(self, incremental: bool = False) -> None:
+        """
+        Синхронизирует чаты и профиль. При incremental=True передаёт серверу
+        маркеры прошлой синхронизации и получает только изменения.
+        """
         try:
-            self.logger.info("Starting initial sync")
+            markers = self._sync_markers if incremental else {}
+            self.logger.info(
+                "Starting %s sync", "incremental" if markers else "initial"
+            )
 
             payload = SyncPayload(
                 interactive=True,
                 token=self._token,
-                chats_sync=0,
-                contacts_sync=0,
+                chats_sync=markers.get("chats_sync", 0),
+                contacts_sync=markers.get("contacts_sync", 0),
                 presence_sync=0,
                 drafts_sync=0,
                 chats_count=40,
@@ -298,22 +297,22 @@ class WebSocketMixin(ClientProtocol):
                 self.logger.error("Sync error: %s", error)
                 return
 
-            for raw_chat in raw_payload.get("chats", []):
-                try:
-                    if raw_chat.get("type") == ChatType.DIALOG.value:
-                        self.dialogs.append(Dialog.from_dict(raw_chat))
-                    elif raw_chat.get("type") == ChatType.CHAT.value:
-                        self.chats.append(Chat.from_dict(raw_chat))
-                    elif raw_chat.get("type") == ChatType.CHANNEL.value:
-                        self.channels.append(Channel.from_dict(raw_chat))
-                except Exception:
-                    self.logger.exception("Error parsing chat entry")
+            raw_chats = raw_payload.get("chats", [])
+            self._merge_chats(raw_chats)
 
             if raw_payload.get("profile", {}).get("contact"):
                 self.me = Me.from_dict(
                     raw_payload.get("profile", {}).get("contact", {})
                 )
 
+            if server_time := raw_payload.get("time"):
+                self._sync_markers = {
+                    "chats_sync": server_time,
+                    "contacts_sync": server_time,
+                }
+
+            self._save_cache(raw_chats, raw_payload.get("profile", {}).get("contact"))
+
             self.logger.info(
                 "Sync completed: dialogs=%d chats=%d channels=%d",
                 len(self.dialogs),
@@ -323,9 +322,83 @@ class WebSocketMixin(ClientProtocol):
         except Exception:
             self.logger.exception("Sync failed")
 
+    def _load_cache(self) -> None:
+        """
+        Восстанавливает чаты, профиль, пользователей и маркеры синхронизации
+        из session.db, чтобы после старта хватило инкрементальной синхронизации.
+        Слишком старый снимок чатов отбрасывается целиком.
+        """
+        try:
+            synced_at = self._database.get_state("synced_at")
+            if synced_at and time.time() - synced_at < Constants.CHAT_CACHE_TTL.value:
+                self._merge_chats(self._database.load_chats())
+                if profile := self._database.get_state("profile"):
+                    self.me = Me.from_dict(profile)
+                self._sync_markers = self._database.get_state("sync_markers") or {}
+            elif synced_at:
+                self.logger.info("Chat cache expired, full sync required")
+                self._database.clear_cache()
+
+            ttl = Constants.USER_CACHE_TTL.value
+            now = time.time()
+            for raw_user, updated_at in self._database.load_users(ttl):
+                user = User.from_dict(raw_user)
+                # Запись живёт столько, сколько ей оставалось с момента загрузки
+                self._users.set(user.id, user, ttl=ttl - (now - updated_at))
+
+            self.logger.info(
+                "Cache loaded: conversations=%d users=%d",
+                len(self._registry),
+                len(self._users),
+            )
+        except Exception:
+            self.logger.exception("Failed to load cache, starting cold")
+            self._registry.clear()
+            self._users.clear()
+            self._sync_markers = {}
+
+    def _save_cache(
+        self, raw_chats: list[dict[str, Any]], profile: dict[str, Any] | None
+    ) -> None:
+        try:
+            self._database.save_chats(raw_chats)
+            if profile:
+                self._database.set_state("profile", profile)
+            if self._sync_markers:
+                self._database.set_state("sync_markers", self._sync_markers)
+                self._database.set_state("synced_at", time.time())
+        except Exception:
+            self.logger.exception("Failed to save cache")
+
+    def _remember_sent_message(
+        self, payload: dict[str, Any], data: dict[str, Any]
+    ) -> None:
+        response = data.get("payload") or {}
+        sent = response.get("message")
+        chat_id = response.get("chatId", payload.get("chatId"))
+        if sent and "id" in sent and chat_id is not None:
+            self._message_chats[int(sent["id"])] = chat_id
+
+    @override
+    def _merge_chats(self, raw_chats: list[dict[str, Any]]) -> None:
+        """
+        Обновляет dialogs/chats/channels на месте: известные id заменяются,
+        новые добавляются в конец.
+        """
+        classes: dict[str, Any] = {
+            ChatType.DIALOG.value: Dialog,
+            ChatType.CHAT.value: Chat,
+            ChatType.CHANNEL.value: Channel,
+        }
+        for raw_chat in raw_chats:
+            try:
+                cls = classes.get(raw_chat.get("type"))
+                if cls is not None:
+                    self._registry.upsert(cls.from_dict(raw_chat))
+            except Exception:
+                self.logger.exception("Error parsing chat entry")
+
     @override
     async def _get_chat(self, chat_id: int) -> Chat | None:
-        for chat in self.chats:
-            if chat.id == chat_id:
-                return chat
-        return None
+        chat = self._registry.get(chat_id)
+        return chat if type(chat) is Chat else None
@@ -1,8 +1,8 @@
+from dataclasses import dataclass, field
 from uuid import UUID, uuid4
 
-from sqlmodel import Field, SQLModel
 
-
-class Auth(SQLModel, table=True):
+@dataclass(slots=True)
+class Auth:
     token: str | None = None
-    device_id: UUID = Field(default_factory=uuid4, primary_key=True)
+    device_id: UUID = field(default_factory=uuid4)
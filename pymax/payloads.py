@@ -1,4 +1,7 @@
-from typing import Any, Literal
+import copy
+from collections.abc import Callable
+from types import UnionType
+from typing import Any, Final, Literal, Union, get_args, get_origin
 from pydantic import BaseModel, Field
 from pymax.static import AttachType, AuthType
 
@@ -8,12 +11,101 @@ def to_camel(string: str) -> str:
     return parts[0] + "".join(word.capitalize() for word in parts[1:])
 
 
+_ENCODERS: dict[type[BaseModel], Callable[..., dict[str, Any]]] = {}
+_MISSING: Final = object()
+
+
+def _to_int(value: Any) -> Any:
+    return value if type(value) is int else int(value)
+
+
+def _to_str(value: Any) -> Any:
+    return value if type(value) is str else str(value)
+
+
+def _to_int_list(value: Any) -> Any:
+    return [v if type(v) is int else int(v) for v in value]
+
+
+# Приведение к аннотации поля, как при валидации: id часто приходят строками
+_COERCERS: dict[Any, Callable[[Any], Any]] = {
+    int: _to_int,
+    str: _to_str,
+    list[int]: _to_int_list,
+}
+
+
+def _coercer(annotation: Any) -> tuple[Callable[[Any], Any] | None, bool]:
+    """Возвращает (функция приведения, допускается ли None) для аннотации."""
+    args = get_args(annotation)
+    if get_origin(annotation) in (Union, UnionType) and type(None) in args:
+        rest = [a for a in args if a is not type(None)]
+        if len(rest) == 1:
+            return _COERCERS.get(rest[0]), True
+        return None, True
+    return _COERCERS.get(annotation), False
+
+
+def _compile_encoder(model: type[BaseModel]) -> Callable[..., dict[str, Any]]:
+    """
+    Генерирует функцию, которая собирает тот же dict, что и
+    model_dump(by_alias=True), без обхода модели: поля int, str и list[int]
+    приводятся к своему типу, изменяемые значения по умолчанию копируются
+    при каждом вызове.
+    """
+    params: list[str] = []
+    body: list[str] = []
+    items: list[str] = []
+    namespace: dict[str, Any] = {"_MISSING": _MISSING, "_copy": copy.copy}
+    for name, field in model.model_fields.items():
+        if field.is_required():
+            params.append(name)
+        else:
+            default = field.get_default(call_default_factory=True)
+            namespace[f"_default_{name}"] = default
+            if isinstance(default, (list, dict, set)):
+                params.append(f"{name}=_MISSING")
+                body.append(
+                    f"    if {name} is _MISSING: {name} = _copy(_default_{name})\n"
+                )
+            else:
+                params.append(f"{name}=_default_{name}")
+        value = name
+        coerce, optional = _coercer(field.annotation)
+        if coerce is not None:
+            namespace[f"_coerce_{name}"] = coerce
+            value = f"_coerce_{name}({name})"
+            if optional:
+                value = f"(None if {name} is None else {value})"
+        items.append(f"{field.alias or name!r}: {value}")
+    source = (
+        f"def encode(*, {', '.join(params)}):\n"
+        + "".join(body)
+        + f"    return {{{', '.join(items)}}}\n"
+    )
+    exec(source, namespace)
+    return namespace["encode"]
+
+
 class CamelModel(BaseModel):
     model_config = {
         "alias_generator": to_camel,
         "populate_by_name": True,
     }
 
+    @classmethod
+    def encode(cls, **fields: Any) -> dict[str, Any]:
+        """
+        Быстрая сборка payload для горячих путей: результат совпадает с
+        cls(**fields).model_dump(by_alias=True) — поля int, str и list[int]
+        приводятся к своему типу, остальные не валидируются.
+        Вложенные модели передаются уже собранными (через их encode).
+        """
+        encoder = _ENCODERS.get(cls)
+        if encoder is None:
+            encoder = _ENCODERS[cls] = _compile_encoder(cls)
+        return encoder(**fields)
+
 
 class BaseWebSocketMessage(BaseModel):
     ver: int = 11
@@ -54,6 +146,13 @@ class UploadPhotoPayload(CamelModel):
     count: int = 1
 
 
+# Неизменяемые payload'ы собираются один раз; изменять их нельзя
+UPLOAD_PHOTO_PAYLOAD: Final[dict[str, Any]] = UploadPhotoPayload().model_dump(
+    by_alias=True
+)
+PING_PAYLOAD: Final[dict[str, Any]] = {"interactive": True}
+
+
 class AttachPhotoPayload(CamelModel):
     type: AttachType = Field(AttachType.PHOTO, alias="_type")
     photo_token: str
@@ -0,0 +1,164 @@
+from collections.abc import Iterator
+from typing import Any
+
+from .types import Channel, Chat, Dialog
+
+Conversation = Dialog | Chat | Channel
+
+
+class ChatRegistry:
+    """
+    Индекс диалогов, чатов и каналов клиента по id.
+
+    Списки client.dialogs, client.chats и client.channels остаются
+    обычными списками (итерация, len, конкатенация работают как раньше),
+    но изменять их нужно через upsert/remove, чтобы индексы не разошлись.
+
+    Дополнительно ведутся индексы по id последнего сообщения и по
+    участникам диалогов (собеседник -> диалог).
+
+    Args:
+        dialogs (list[Dialog]): Список диалогов клиента.
+        chats (list[Chat]): Список групповых чатов клиента.
+        channels (list[Channel]): Список каналов клиента.
+    """
+
+    def __init__(
+        self, dialogs: list[Dialog], chats: list[Chat], channels: list[Channel]
+    ) -> None:
+        self.dialogs = dialogs
+        self.chats = chats
+        self.channels = channels
+        self._by_id: dict[int, Conversation] = {}
+        self._positions: dict[int, int] = {}
+        self._by_last_message: dict[int, int] = {}
+        self._by_participant: dict[int, int] = {}
+
+    def _list_for(self, item: Conversation) -> list[Any]:
+        if isinstance(item, Dialog):
+            return self.dialogs
+        if isinstance(item, Channel):
+            return self.channels
+        return self.chats
+
+    def upsert(self, item: Conversation) -> None:
+        """Добавляет беседу или заменяет уже известную с тем же id."""
+        old = self._by_id.get(item.id)
+        items = self._list_for(item)
+        if old is not None and self._list_for(old) is not items:
+            # Тип беседы сменился (например, чат стал каналом)
+            self.remove(item.id)
+            old = None
+
+        if old is None:
+            self._positions[item.id] = len(items)
+            items.append(item)
+        else:
+            self._unindex(old)
+            items[self._positions[item.id]] = item
+        self._by_id[item.id] = item
+        self._index(item)
+
+    def remove(self, chat_id: int) -> Conversation | None:
+        item = self._by_id.pop(chat_id, None)
+        if item is None:
+            return None
+        self._unindex(item)
+        items = self._list_for(item)
+        pos = self._positions.pop(chat_id)
+        del items[pos]
+        for moved in items[pos:]:
+            self._positions[moved.id] -= 1
+        return item
+
+    def set_last_message(self, chat_id: int, message: Any) -> None:
+        """Обновляет last_message беседы и индекс по нему."""
+        item = self._by_id.get(chat_id)
+        if item is None:
+            return
+        if item.last_message is not None:
+            self._by_last_message.pop(item.last_message.id, None)
+        item.last_message = message
+        if message is not None:
+            self._by_last_message[message.id] = chat_id
+
+    def apply_message(self, chat_id: int, message: Any) -> bool:
+        """
+        Учитывает новое или изменённое сообщение из уведомления: оно
+        становится last_message, если не старее текущего. Возвращает True,
+        если беседа обновлена.
+        """
+        item = self._by_id.get(chat_id)
+        if item is None:
+            return False
+        last = item.last_message
+        if last is not None and int(last.id) > int(message.id):
+            return False
+        self.set_last_message(chat_id, message)
+        if message.time and message.time > item.last_event_time:
+            item.last_event_time = message.time
+        return True
+
+    def apply_delete(self, chat_id: int, message_ids: list[Any]) -> bool:
+        """
+        Учитывает удаление сообщений: если удалено последнее сообщение
+        беседы, last_message сбрасывается до следующей синхронизации.
+        """
+        item = self._by_id.get(chat_id)
+        if item is None or item.last_message is None:
+            return False
+        if int(item.last_message.id) not in {int(i) for i in message_ids}:
+            return False
+        self.set_last_message(chat_id, None)
+        return True
+
+    def _index(self, item: Conversation) -> None:
+        if item.last_message is not None:
+            self._by_last_message[item.last_message.id] = item.id
+        if isinstance(item, Dialog):
+            for user_id in item.participants:
+                self._by_participant[int(user_id)] = item.id
+
+    def _unindex(self, item: Conversation) -> None:
+        if item.last_message is not None:
+            if self._by_last_message.get(item.last_message.id) == item.id:
+                del self._by_last_message[item.last_message.id]
+        if isinstance(item, Dialog):
+            for user_id in item.participants:
+                if self._by_participant.get(int(user_id)) == item.id:
+                    del self._by_participant[int(user_id)]
+
+    def get(self, chat_id: int) -> Conversation | None:
+        return self._by_id.get(chat_id)
+
+    def by_last_message(self, message_id: int) -> Conversation | None:
+        """Беседа, последнее сообщение которой имеет id message_id."""
+        chat_id = self._by_last_message.get(message_id)
+        return self._by_id.get(chat_id) if chat_id is not None else None
+
+    def dialog_with(self, user_id: int) -> Dialog | None:
+        """
+        Диалог, в котором участвует пользователь user_id. Для собственного id
+        результат не определён: он есть в каждом диалоге.
+        """
+        chat_id = self._by_participant.get(int(user_id))
+        item = self._by_id.get(chat_id) if chat_id is not None else None
+        return item if isinstance(item, Dialog) else None
+
+    def clear(self) -> None:
+        self.dialogs.clear()
+        self.chats.clear()
+        self.channels.clear()
+        self._by_id.clear()
+        self._positions.clear()
+        self._by_last_message.clear()
+        self._by_participant.clear()
+
+    def __contains__(self, chat_id: object) -> bool:
+        return chat_id in self._by_id
+
+    def __iter__(self) -> Iterator[Conversation]:
+        return iter(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
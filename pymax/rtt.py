@@ -0,0 +1,116 @@
+import math
+from collections import deque
+
+from .static import Constants, Opcode
+
+# Запросы, которые сервер обрабатывает долго: их таймаут не опускается
+# ниже прежнего фиксированного, как бы мал ни был RTT, а время ответа
+# не попадает в оценку RTT — в нём больше работы сервера, чем сети
+SLOW_OPCODES = frozenset(
+    {
+        Opcode.LOGIN,
+        Opcode.SYNC,
+        Opcode.CHAT_HISTORY,
+        Opcode.VIDEO_CHAT_HISTORY,
+        Opcode.PHOTO_UPLOAD,
+        Opcode.VIDEO_UPLOAD,
+        Opcode.VIDEO_PLAY,
+        Opcode.FILE_UPLOAD,
+        Opcode.FILE_DOWNLOAD,
+    }
+)
+
+
+class RttEstimator:
+    """
+    Оценка времени ответа сервера по схеме TCP RTO (RFC 6298):
+    сглаженный RTT, его разброс и таймаут повторной передачи.
+
+    Args:
+        window (int): Сколько последних замеров хранить для перцентилей.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, window: int = 256) -> None:
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self._backoff: int = 1
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def add_sample(self, rtt: float) -> None:
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(
+                self.srtt - rtt
+            )
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self._backoff = 1
+        self._samples.append(rtt)
+
+    def on_timeout(self) -> None:
+        """Удваивает RTO до следующего успешного замера, как TCP после потери."""
+        if self.rto * 2 <= Constants.MAX_RTO.value:
+            self._backoff *= 2
+
+    @property
+    def rto(self) -> float:
+        if self.srtt is None or self.rttvar is None:
+            # До первого замера таймаут запроса совпадает с прежним DEFAULT_TIMEOUT
+            base = Constants.DEFAULT_TIMEOUT.value / 2
+        else:
+            base = self.srtt + self.K * self.rttvar
+        return min(
+            max(base * self._backoff, Constants.MIN_RTO.value), Constants.MAX_RTO.value
+        )
+
+    def request_timeout(self, opcode: int | None = None) -> float:
+        """Таймаут запроса к серверу (для SLOW_OPCODES — не меньше DEFAULT_TIMEOUT)."""
+        minimum = (
+            Constants.DEFAULT_TIMEOUT.value
+            if opcode in SLOW_OPCODES
+            else Constants.MIN_REQUEST_TIMEOUT.value
+        )
+        return min(max(self.rto * 2, minimum), Constants.MAX_RTO.value)
+
+    def probe_timeout(self) -> float:
+        """Таймаут пинга: короче обычного, чтобы быстрее заметить мёртвое соединение."""
+        return min(
+            max(self.rto * 2, Constants.MIN_RTO.value), Constants.DEFAULT_TIMEOUT.value
+        )
+
+    def probe_interval(self) -> float:
+        """
+        Пауза между пингами: PING_INTERVAL на стабильном канале и короче,
+        когда RTT скачет (велика доля rttvar в RTO) или были таймауты.
+        """
+        if self.srtt is None or self.rttvar is None:
+            return Constants.PING_INTERVAL.value
+        jitter = self.K * self.rttvar / (self.srtt + self.K * self.rttvar or 1)
+        interval = Constants.PING_INTERVAL.value * (1 - jitter) / self._backoff
+        return min(
+            max(interval, Constants.MIN_PING_INTERVAL.value),
+            Constants.PING_INTERVAL.value,
+        )
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+        return ordered[idx]
+
+    def stats(self) -> dict[str, float | int | None]:
+        return {
+            "samples": len(self._samples),
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "rto": self.rto,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Hashable
+from typing import Any
+
+from .static import Opcode
+
+# Запросы, которые сервер ограничивает по частоте
+RATE_LIMITED_OPCODES = frozenset(
+    {
+        Opcode.MSG_SEND,
+        Opcode.MSG_EDIT,
+        Opcode.MSG_DELETE,
+        Opcode.MSG_DELETE_RANGE,
+        Opcode.MSG_REACTION,
+        Opcode.MSG_CANCEL_REACTION,
+    }
+)
+
+
+class TokenBucket:
+    """
+    Классическое ведро токенов: rate токенов в секунду, не больше burst.
+
+    Args:
+        rate (float): Скорость пополнения, токенов в секунду.
+        burst (int): Ёмкость ведра.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена (0 — токен есть)."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self._tokens >= self.burst
+
+
+class SendScheduler:
+    """
+    Очередь изменяющих запросов (отправка, редактирование, удаление,
+    реакции) с общим ведром токенов и отдельным ведром на каждый чат.
+
+    Запросы одного чата выполняются в порядке поступления, чаты
+    обслуживаются по кругу: массовая рассылка не задерживает ответы
+    в остальных чатах дольше, чем на свою долю общего лимита.
+
+    Args:
+        rate (float): Общий лимит, запросов в секунду.
+        burst (int): Общий допустимый всплеск.
+        chat_rate (float): Лимит одного чата, запросов в секунду.
+        chat_burst (int): Допустимый всплеск одного чата.
+    """
+
+    def __init__(
+        self, rate: float, burst: int, chat_rate: float, chat_burst: int
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._global = TokenBucket(rate, burst)
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._waiting: dict[Hashable, deque[tuple[float, asyncio.Future[None]]]] = {}
+        self._ring: deque[Hashable] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._pump_task: asyncio.Task[Any] | None = None
+        self._granted: int = 0
+        self._delayed: int = 0
+        self._wait_total: float = 0.0
+        self._wait_max: float = 0.0
+
+    async def acquire(self, chat_id: Hashable) -> None:
+        """Ждёт разрешения на отправку запроса в чат chat_id."""
+        now = time.monotonic()
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(
+                self.chat_rate, self.chat_burst
+            )
+
+        # Быстрый путь: очереди нет и токены есть
+        if (
+            not self._waiting
+            and self._global.delay(now) == 0
+            and bucket.delay(now) == 0
+        ):
+            self._global.take()
+            bucket.take()
+            self._granted += 1
+            return
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if chat_id not in self._waiting:
+            self._waiting[chat_id] = deque()
+            self._ring.append(chat_id)
+        self._waiting[chat_id].append((now, fut))
+        self._delayed += 1
+        self._ensure_pump()
+        await fut
+
+    def _ensure_pump(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        while self._ring:
+            now = time.monotonic()
+            wait = self._global.delay(now)
+            if wait == 0:
+                wait = self._grant_next(now)
+            if wait is None:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        self._prune(time.monotonic())
+
+    def _grant_next(self, now: float) -> float | None:
+        """
+        Выдаёт токен первому по кругу чату, у которого он есть.
+        Возвращает None после выдачи или время до ближайшего токена.
+        """
+        wait = float("inf")
+        for _ in range(len(self._ring)):
+            chat_id = self._ring[0]
+            self._ring.rotate(-1)
+            queue = self._waiting[chat_id]
+            while queue and queue[0][1].done():
+                # Ожидающий отменён
+                queue.popleft()
+            if not queue:
+                del self._waiting[chat_id]
+                self._ring.remove(chat_id)
+                return None
+
+            bucket = self._buckets[chat_id]
+            delay = bucket.delay(now)
+            if delay > 0:
+                wait = min(wait, delay)
+                continue
+
+            enqueued_at, fut = queue.popleft()
+            if not queue:
+                del self._waiting[chat_id]
+                self._ring.remove(chat_id)
+            self._global.take()
+            bucket.take()
+            self._granted += 1
+            waited = now - enqueued_at
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            fut.set_result(None)
+            return None
+        return wait if self._ring else None
+
+    def _prune(self, now: float) -> None:
+        # Полные вёдра ничем не отличаются от новых
+        for chat_id in [
+            c for c, b in self._buckets.items() if c not in self._waiting and b.is_full(now)
+        ]:
+            del self._buckets[chat_id]
+
+    def stats(self) -> dict[str, int | float]:
+        queued = sum(
+            1 for queue in self._waiting.values() for _, fut in queue if not fut.done()
+        )
+        return {
+            "queued": queued,
+            "chats": len(self._waiting),
+            "granted": self._granted,
+            "delayed": self._delayed,
+            "avg_wait": self._wait_total / self._delayed if self._delayed else 0.0,
+            "max_wait": self._wait_max,
+        }
@@ -193,10 +193,63 @@ class AttachType(str, Enum):
     STICKER = "STICKER"
 
 
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+
+
+class PhotoUploadPolicy(str, Enum):
+    SKIP = "skip"
+    ABORT = "abort"
+
+
 class Constants(Enum):
     PHONE_REGEX = r"^\+?\d{10,15}$"
     WEBSOCKET_URI = "wss://ws-api.oneme.ru/websocket"
+    HOST = "api.oneme.ru"
+    PORT = 443
     DEFAULT_TIMEOUT = 10.0
+    MIN_RTO = 1.0
+    MAX_RTO = 60.0
+    MIN_REQUEST_TIMEOUT = 5.0
+    PING_INTERVAL = 30.0
+    MIN_PING_INTERVAL = 5.0
+    PING_MAX_FAILURES = 2
+    EVENT_QUEUE_SIZE = 1000
+    HANDLER_WORKERS = 8
+    CHAT_QUEUE_SIZE = 100
+    SEND_RATE = 10.0
+    SEND_BURST = 20
+    CHAT_SEND_RATE = 1.0
+    CHAT_SEND_BURST = 5
+    CHAT_CACHE_TTL = 7 * 24 * 3600
+    USER_CACHE_TTL = 24 * 3600
+    USER_CACHE_SIZE = 10000
+    USER_BATCH_WINDOW = 0.02
+    USER_BATCH_SIZE = 100
+    MESSAGE_CHAT_CACHE_SIZE = 10000
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    PHOTO_UPLOAD_CONCURRENCY = 4
+    UPLOAD_CACHE_TTL = 7 * 24 * 3600
+    ATTACH_RETRY_DELAY = 0.25
+    ATTACH_RETRY_MAX_DELAY = 4.0
+    ATTACH_READY_TIMEOUT = 60.0
+    HTTP_POOL_SIZE = 100
+    HTTP_POOL_PER_HOST = 10
+    HTTP_DNS_CACHE_TTL = 300
+    HTTP_KEEPALIVE = 30.0
+    HTTP_CONNECT_TIMEOUT = 10.0
+    HTTP_READ_TIMEOUT = 60.0
+    HISTORY_PAGE_SIZE = 200
+    HISTORY_MIN_PAGE_SIZE = 50
+    HISTORY_MAX_PAGE_SIZE = 500
+    HISTORY_TARGET_LATENCY = 1.0
+    ARCHIVE_MAX_MESSAGES = 1_000_000
+    ARCHIVE_BATCH_SIZE = 500
+    ARCHIVE_FLUSH_INTERVAL = 1.0
+    ARCHIVE_QUEUE_LIMIT = 50_000
+    ARCHIVE_PRUNE_INTERVAL = 600
     DEFAULT_USER_AGENT = {
         "deviceType": "WEB",
         "locale": "ru",
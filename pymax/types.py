@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import Any, override
 
 from .static import (
@@ -11,6 +12,8 @@ from .static import (
 
 
 class Names:
+    __slots__ = ("name", "first_name", "last_name", "type")
+
     def __init__(
         self, name: str, first_name: str, last_name: str | None, type: str
     ) -> None:
@@ -38,6 +41,8 @@ class Names:
 
 
 class Me:
+    __slots__ = ("id", "account_status", "phone", "update_time", "options", "names")
+
     def __init__(
         self,
         id: int,
@@ -75,6 +80,8 @@ class Me:
 
 
 class Element:
+    __slots__ = ("type", "length", "from_")
+
     def __init__(
         self, type: ElementType | str, length: int, from_: int | None = None
     ) -> None:
@@ -98,6 +105,21 @@ class Element:
 
 
 class Message:
+    __slots__ = (
+        "sender",
+        "elements",
+        "options",
+        "id",
+        "time",
+        "text",
+        "type",
+        "attaches",
+        "status",
+        "reactionInfo",
+        "reply_to_message",
+        "chat_id",
+    )
+
     def __init__(
         self,
         sender: int | None,
@@ -152,7 +174,85 @@ class Message:
         return f"Message {self.id} from {self.sender}: {self.text}"
 
 
+class _LazyMessageField:
+    """
+    Поле Message, которое LazyMessage декодирует из сырого payload
+    при первом обращении и сохраняет в слот Message.
+    """
+
+    def __init__(self, name: str, decode: Callable[[dict[str, Any]], Any]) -> None:
+        self.slot = Message.__dict__[name]
+        self.decode = decode
+
+    def __get__(self, obj: "LazyMessage | None", objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, objtype)
+        except AttributeError:
+            value = self.decode(obj._raw)
+            self.slot.__set__(obj, value)
+            return value
+
+    def __set__(self, obj: "LazyMessage", value: Any) -> None:
+        self.slot.__set__(obj, value)
+
+
+def _decode_reply(data: dict[str, Any]) -> dict[str, Any] | None:
+    link = data.get("link")
+    if link and link.get("type") == "REPLY" and link.get("message"):
+        return link["message"]
+    return data.get("replyToMessage")
+
+
+class LazyMessage(Message):
+    """
+    Message поверх сырого payload: простые поля читаются сразу, а elements
+    и reply_to_message (из link типа REPLY или replyToMessage) — только при
+    первом обращении. Используется для входящих сообщений, большинство
+    из которых отсеивается фильтрами обработчиков.
+    """
+
+    __slots__ = ("_raw",)
+
+    elements = _LazyMessageField(
+        "elements", lambda d: [Element.from_dict(e) for e in d.get("elements", [])]
+    )
+    reply_to_message = _LazyMessageField("reply_to_message", _decode_reply)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._raw = data
+        self.sender = data.get("sender")
+        self.options = data.get("options")
+        self.id = data["id"]
+        self.time = data["time"]
+        self.text = data["text"]
+        self.type = data["type"]
+        self.attaches = data.get("attaches", [])
+        self.status = data.get("status")
+        self.reactionInfo = data.get("reactionInfo")
+
+
 class Dialog:
+    __slots__ = (
+        "cid",
+        "owner",
+        "has_bots",
+        "join_time",
+        "created",
+        "last_message",
+        "type",
+        "last_fire_delayed_error_time",
+        "last_delayed_update_time",
+        "prev_message_id",
+        "options",
+        "modified",
+        "last_event_time",
+        "id",
+        "status",
+        "participants",
+    )
+
     def __init__(
         self,
         cid: int | None,
@@ -222,6 +322,36 @@ class Dialog:
 
 
 class Chat:
+    __slots__ = (
+        "participants_count",
+        "access",
+        "invited_by",
+        "link",
+        "type",
+        "title",
+        "last_fire_delayed_error_time",
+        "last_delayed_update_time",
+        "options",
+        "base_raw_icon_url",
+        "base_icon_url",
+        "description",
+        "modified",
+        "id",
+        "admin_participants",
+        "participants",
+        "owner",
+        "join_time",
+        "created",
+        "last_message",
+        "prev_message_id",
+        "last_event_time",
+        "messages_count",
+        "admins",
+        "restrictions",
+        "status",
+        "cid",
+    )
+
     def __init__(
         self,
         participants_count: int,
@@ -331,6 +461,8 @@ class Chat:
 
 
 class Channel(Chat):
+    __slots__ = ()
+
     @override
     def __repr__(self) -> str:
         return f"Channel(id={self.id!r}, title={self.title!r})"
@@ -341,6 +473,22 @@ class Channel(Chat):
 
 
 class User:
+    __slots__ = (
+        "account_status",
+        "update_time",
+        "id",
+        "names",
+        "options",
+        "base_url",
+        "base_raw_url",
+        "photo_id",
+        "description",
+        "gender",
+        "link",
+        "web_app",
+        "menu_button",
+    )
+
     def __init__(
         self,
         account_status: int,
@@ -399,6 +547,8 @@ class User:
 
 
 class Attach:
+    __slots__ = ("type", "video_id", "photo_token", "file_id", "token")
+
     def __init__(
         self,
         _type: AttachType,
@@ -433,3 +583,58 @@ class Attach:
     @override
     def __str__(self) -> str:
         return f"Attach: {self.type}"
+
+
+class Notification:
+    """
+    Уведомление сервера без отдельного типа (NOTIF_TYPING, NOTIF_MARK,
+    NOTIF_MSG_DELETE, NOTIF_MSG_REACTIONS_CHANGED и т.д.).
+    Часто используемые поля вынесены в атрибуты, полный payload — в payload.
+    """
+
+    __slots__ = (
+        "opcode",
+        "chat_id",
+        "user_id",
+        "message_id",
+        "message_ids",
+        "payload",
+    )
+
+    def __init__(
+        self,
+        opcode: int,
+        chat_id: int | None,
+        user_id: int | None,
+        message_id: int | str | None,
+        message_ids: list[int | str],
+        payload: dict[str, Any],
+    ) -> None:
+        self.opcode = opcode
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.message_id = message_id
+        self.message_ids = message_ids
+        self.payload = payload
+
+    @classmethod
+    def from_dict(cls, opcode: int, data: dict[str, Any]) -> "Notification":
+        return cls(
+            opcode=opcode,
+            chat_id=data.get("chatId"),
+            user_id=data.get("userId"),
+            message_id=data.get("messageId"),
+            message_ids=data.get("messageIds", []),
+            payload=data,
+        )
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"Notification(opcode={self.opcode!r}, chat_id={self.chat_id!r}, "
+            f"user_id={self.user_id!r}, message_id={self.message_id!r})"
+        )
+
+    @override
+    def __str__(self) -> str:
+        return f"Notification {self.opcode} in chat {self.chat_id}"
@@ -3,23 +3,53 @@ from typing import Any
 import lz4.block
 import msgpack
 
+HEADER_SIZE = 10
+SEQ_MODULO = 256
+# Максимальная степень сжатия LZ4 — около 255:1, больше буфер не понадобится
+LZ4_MAX_RATIO = 255
 
-def unpack_packet(data: bytes) -> None | dict[str, Any]:
-    ver = int.from_bytes(data[0:1], "big")
-    cmd = int.from_bytes(data[1:3], "big")
-    seq = int.from_bytes(data[3:4], "big")
-    opcode = int.from_bytes(data[4:6], "big")
-    packed_len = int.from_bytes(data[6:10], "big", signed=False)
+
+def decompress_payload(data: bytes) -> bytes:
+    """
+    Распаковывает LZ4-блок, размер которого известен только по заголовку пакета.
+
+    В заголовке передаётся длина сжатых данных, поэтому буфер начинается
+    с оценки по ней и растёт, пока не хватит места (но не больше
+    предела LZ4 для этой длины).
+    """
+    limit = max(len(data) * LZ4_MAX_RATIO, 64)
+    size = min(max(len(data) * 4, 64), limit)
+    while True:
+        try:
+            return lz4.block.decompress(data, uncompressed_size=size)
+        except lz4.block.LZ4BlockError:
+            if size >= limit:
+                raise
+            size = min(size * 4, limit)
+
+
+def parse_header(header: bytes) -> tuple[int, int, int, int, int, int]:
+    ver = int.from_bytes(header[0:1], "big")
+    cmd = int.from_bytes(header[1:3], "big")
+    seq = int.from_bytes(header[3:4], "big")
+    opcode = int.from_bytes(header[4:6], "big")
+    packed_len = int.from_bytes(header[6:10], "big", signed=False)
     comp_flag = packed_len >> 24
     payload_length = packed_len & 0xFFFFFF
-    payload_bytes = data[10 : 10 + payload_length]
+    return ver, cmd, seq, opcode, comp_flag, payload_length
+
+
+def unpack_packet(data: bytes) -> None | dict[str, Any]:
+    ver, cmd, seq, opcode, comp_flag, payload_length = parse_header(
+        data[:HEADER_SIZE]
+    )
+    payload_bytes = data[HEADER_SIZE : HEADER_SIZE + payload_length]
     if comp_flag != 0:
-        compressed_data = payload_bytes
         try:
-            payload_bytes = lz4.block.decompress(compressed_data, uncompressed_size=255)
+            payload_bytes = decompress_payload(payload_bytes)
         except lz4.block.LZ4BlockError:
             return None
-    payload = msgpack.unpackb(payload_bytes, raw=False)
+    payload = msgpack.unpackb(payload_bytes, raw=False) if payload_bytes else {}
     return {"ver": ver, "cmd": cmd, "seq": seq, "opcode": opcode, "payload": payload}
 
 
@@ -29,7 +59,7 @@ def pack_packet(
 ) -> bytes:
     ver_b = ver.to_bytes(1, "big")
     cmd_b = cmd.to_bytes(2, "big")
-    seq_b = seq.to_bytes(1, "big")
+    seq_b = (seq % SEQ_MODULO).to_bytes(1, "big")
     opcode_b = opcode.to_bytes(2, "big")
     payload_bytes = msgpack.packb(payload)
     if payload_bytes is None: